@@ -0,0 +1,323 @@
+"""
+Microbenchmarks do caminho de dados com conjuntos sintéticos grandes.
+
+Uso:
+    python benchmarks/data_path.py [--tamanhos 1k 10k 100k] [--benchmarks sheets_dedup ...]
+                                   [--repeticoes 3] [--salvar-baseline]
+
+Cada benchmark gera seus dados (exportações do eproc no formato de benchmarks/mock_eproc.py e
+históricos da planilha do Sheets) no tamanho pedido e mede apenas a etapa de interesse:
+- normalizar_data_br:        normalização de datas em formatos mistos;
+- sheets_dedup:              salvar_processos_no_sheets com histórico de N linhas (Sheets falso);
+- leitura_excel_localizador: pd.read_excel da exportação do localizador e extração por regex;
+- conclusos_registros:       processar_relatorio_conclusos (leitura, hash e registros);
+- alvaras_mesclagem:         mesclar_alvaras com um dataset anterior de N linhas;
+- legalmind_relatorio:       enviar_relatorio_concluso de N registros (LegalMind falso, sem rede).
+
+A mediana das repetições é comparada com benchmarks/baselines/data_path.json; um benchmark
+mais lento que a baseline além da tolerância (BENCH_TOLERANCIA, padrão 50%, mais BENCH_FOLGA_S)
+encerra com código 1. O tamanho 1M é opcional: gerar as planilhas leva alguns minutos.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from benchmarks.mock_eproc import (  # noqa: E402
+    MockConfig,
+    numero_processo,
+    planilha_alvaras,
+    planilha_conclusos,
+    planilha_localizador,
+)
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'data_path.json'
+TAMANHOS = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1M': 1_000_000}
+TAMANHOS_PADRAO = ('1k', '10k', '100k')
+
+# Tolerância relativa sobre a baseline e folga absoluta (s) para medições muito curtas
+TOLERANCIA = float(os.environ.get('BENCH_TOLERANCIA', '0.5'))
+FOLGA_S = float(os.environ.get('BENCH_FOLGA_S', '0.005'))
+
+# Processos enviados a cada sincronização com o Sheets (metade já existe no histórico)
+LOTE_SHEETS = 1000
+
+REGEX_PROCESSO = re.compile(r'\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}')
+
+BENCHMARKS = {}
+
+
+def benchmark(nome: str):
+    """
+    Registra um benchmark. A função recebe (n, pasta, pilha), prepara os dados fora da
+    medição e devolve a chamada sem argumentos que será cronometrada. Patches que precisam
+    ficar ativos durante a medição são registrados na pilha (contextlib.ExitStack).
+    """
+
+    def registrar(func):
+        BENCHMARKS[nome] = func
+        return func
+
+    return registrar
+
+
+def tamanho(valor: str) -> int:
+    return TAMANHOS.get(valor) or int(valor)
+
+
+# --- Geradores de dados sintéticos ---
+
+FORMATOS_DATA = (
+    '{d:%d/%m/%Y} - {d:%H:%M:%S}',  # gravado pelo robô
+    '{d:%d/%m/%Y} {d:%H:%M:%S}',  # exportação do eproc
+    '{d:%Y-%m-%d %H:%M:%S}',  # ISO, editado à mão ou via API
+    '{d:%d/%m/%Y}',  # sem hora
+)
+
+
+def datas_mistas(n: int, seed: int = 42) -> list[str]:
+    """Datas nos formatos encontrados no histórico do Sheets e nas exportações do eproc."""
+    from datetime import datetime, timedelta
+
+    rng = random.Random(seed)
+    inicio = datetime(2024, 1, 1)
+    return [
+        FORMATOS_DATA[i % len(FORMATOS_DATA)].format(d=inicio + timedelta(seconds=rng.randrange(80_000_000)))
+        for i in range(n)
+    ]
+
+
+def historico_sheets(n: int, seed: int = 42) -> list[list[str]]:
+    """Linhas (Processo, Data) de uma planilha do Sheets com N registros acumulados."""
+    rng = random.Random(seed)
+    return [[numero_processo(rng), data] for data in datas_mistas(n, seed)]
+
+
+def lote_localizador(historico: list[list[str]], tamanho_lote: int, seed: int = 7) -> list[dict]:
+    """Lote no formato de dados_processos: metade já presente no histórico, metade inédita."""
+    from src.utils.google_sheets import normalizar_data_br
+
+    rng = random.Random(seed)
+    existentes = rng.sample(historico, min(len(historico), tamanho_lote // 2))
+    lote = [{'processo': p, 'data_inclusao': normalizar_data_br(d)} for p, d in existentes]
+    lote += [
+        {'processo': numero_processo(rng), 'data_inclusao': d}
+        for d in datas_mistas(tamanho_lote - len(lote), seed)
+    ]
+    return lote
+
+
+def _gravar(pasta: str, nome: str, conteudo: bytes) -> str:
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'wb') as f:
+        f.write(conteudo)
+    return caminho
+
+
+# --- Substitutos das integrações ---
+
+
+class _Chamada:
+    def __init__(self, resposta: dict):
+        self.resposta = resposta
+
+    def execute(self):
+        return self.resposta
+
+
+class FakeSheets:
+    """Serviço do Google Sheets em memória (apenas spreadsheets().values() get/update/append)."""
+
+    def __init__(self, linhas: list[list[str]]):
+        self.linhas = linhas
+        self.inseridas = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, range):
+        return _Chamada({'values': [['Processo', 'Data']] if range == 'A1:Z1' else self.linhas})
+
+    def update(self, **kwargs):
+        return _Chamada({})
+
+    def append(self, body, **kwargs):
+        self.inseridas += body['values']
+        return _Chamada({'updates': {'updatedRows': len(body['values'])}})
+
+
+def legalmind_falso(pilha: contextlib.ExitStack):
+    """Direciona o cliente HTTP da integração do LegalMind para um transporte em memória."""
+    import httpx
+
+    from src.config import settings
+    from src.utils import integracao_legalmind
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        itens = json.loads(request.content)
+        return httpx.Response(200, json={'importados': len(itens)})
+
+    async def legalmind_ativo(verbose: bool = False) -> bool:
+        return True
+
+    cliente = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(responder))
+    pilha.enter_context(mock.patch.object(integracao_legalmind.httpx, 'AsyncClient', cliente))
+    pilha.enter_context(mock.patch.object(integracao_legalmind, 'ensure_legalmind_running_async', legalmind_ativo))
+    pilha.enter_context(mock.patch.object(settings, 'LEGALMIND_API_URL', 'http://legalmind.local'))
+    pilha.enter_context(mock.patch.object(settings, 'LEGALMIND_API_KEY', 'benchmark'))
+
+
+# --- Benchmarks ---
+
+
+@benchmark('normalizar_data_br')
+def _normalizar_data_br(n: int, pasta: str, pilha: contextlib.ExitStack):
+    from src.utils.google_sheets import normalizar_data_br
+
+    datas = datas_mistas(n)
+    return lambda: [normalizar_data_br(d) for d in datas]
+
+
+@benchmark('sheets_dedup')
+def _sheets_dedup(n: int, pasta: str, pilha: contextlib.ExitStack):
+    from src.utils import google_sheets
+
+    historico = historico_sheets(n)
+    lote = lote_localizador(historico, LOTE_SHEETS)
+    pilha.enter_context(mock.patch.object(google_sheets, 'get_sheets_service', lambda: FakeSheets(historico)))
+    return lambda: google_sheets.salvar_processos_no_sheets('benchmark', lote, propagar_erros=True)
+
+
+@benchmark('leitura_excel_localizador')
+def _leitura_excel_localizador(n: int, pasta: str, pilha: contextlib.ExitStack):
+    import pandas as pd
+
+    config = MockConfig(localizadores={'URGENTE': n})
+    caminho = _gravar(pasta, f'localizador_{n}.xlsx', planilha_localizador(config, 'URGENTE'))
+
+    def executar():
+        # Mesmo caminho de LocBaseScraper.run: header=1, dtype=str e regex linha a linha
+        df = pd.read_excel(caminho, header=1, dtype=str)
+        df.columns = [c.strip() for c in df.columns]
+        dados = []
+        for _, linha in df.iterrows():
+            match = REGEX_PROCESSO.search(str(linha['Número Processo']).strip())
+            if match:
+                dados.append({'processo': match.group(0), 'data_inclusao': str(linha['Inclusão no Localizador']).strip()})
+        return dados
+
+    return executar
+
+
+@benchmark('conclusos_registros')
+def _conclusos_registros(n: int, pasta: str, pilha: contextlib.ExitStack):
+    from src.utils.report_processing import processar_relatorio_conclusos
+
+    caminho = _gravar(pasta, f'conclusos_{n}.xlsx', planilha_conclusos(MockConfig(linhas_conclusos=n)))
+    return lambda: processar_relatorio_conclusos(caminho)
+
+
+@benchmark('alvaras_mesclagem')
+def _alvaras_mesclagem(n: int, pasta: str, pilha: contextlib.ExitStack):
+    from src.utils.report_processing import mesclar_alvaras
+
+    # O dataset anterior é o resultado de uma mesclagem anterior (cabeçalho na primeira linha)
+    historico = _gravar(pasta, f'alvaras_historico_{n}.xlsx', planilha_alvaras(MockConfig(linhas_alvaras=n)))
+    antigo = os.path.join(pasta, f'alvaras_antigo_{n}.xlsx')
+    mesclar_alvaras(historico, None, antigo)
+    novo = _gravar(pasta, 'alvaras_novo.xlsx', planilha_alvaras(MockConfig(seed=7)))
+    return lambda: mesclar_alvaras(novo, antigo, os.path.join(pasta, f'alvaras_final_{n}.xlsx'))
+
+
+@benchmark('legalmind_relatorio')
+def _legalmind_relatorio(n: int, pasta: str, pilha: contextlib.ExitStack):
+    import pandas as pd
+
+    from src.utils.integracao_legalmind import enviar_relatorio_concluso
+    from src.utils.report_processing import montar_registros
+
+    caminho = _gravar(pasta, f'conclusos_{n}.xlsx', planilha_conclusos(MockConfig(linhas_conclusos=n)))
+    registros = montar_registros(pd.read_excel(caminho, dtype=str))
+    legalmind_falso(pilha)
+    return lambda: asyncio.run(enviar_relatorio_concluso(registros))
+
+
+# --- Execução ---
+
+
+def medir(nome: str, n: int, repeticoes: int) -> float:
+    """Mediana (s) de `repeticoes` execuções do benchmark, sem contar a preparação dos dados."""
+    with tempfile.TemporaryDirectory(prefix='bench-eproc-') as pasta, contextlib.ExitStack() as pilha:
+        executar = BENCHMARKS[nome](n, pasta, pilha)
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            executar()
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def regressoes(atual: dict, baseline: dict) -> list[str]:
+    """Benchmarks (nome[tamanho]) mais lentos que a baseline além da tolerância."""
+    lentos = []
+    for nome, tempos in atual.items():
+        for rotulo, duracao in tempos.items():
+            referencia = baseline.get(nome, {}).get(rotulo)
+            if referencia is not None and duracao > referencia * (1 + TOLERANCIA) + FOLGA_S:
+                lentos.append(f'{nome}[{rotulo}]: {duracao * 1000:.1f} ms (baseline {referencia * 1000:.1f} ms)')
+    return lentos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', nargs='+', default=list(TAMANHOS_PADRAO), help='1k, 10k, 100k, 1M ou um número.')
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--salvar-baseline', action='store_true', help='Grava as medições como nova baseline.')
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    # Os logs de cada chamada distorceriam as medições
+    logger.disable('src')
+
+    atual = {}
+    for nome in args.benchmarks:
+        for rotulo in args.tamanhos:
+            duracao = medir(nome, tamanho(rotulo), args.repeticoes)
+            atual.setdefault(nome, {})[rotulo] = round(duracao, 4)
+            print(f'{nome}[{rotulo}]: {duracao * 1000:10.1f} ms', flush=True)
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding='utf-8')) if BASELINE_PATH.exists() else {}
+    if args.salvar_baseline:
+        for nome, tempos in atual.items():
+            baseline.setdefault(nome, {}).update(tempos)
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f'Baseline gravada em {BASELINE_PATH.relative_to(RAIZ)}')
+        return
+
+    lentos = regressoes(atual, baseline)
+    for linha in lentos:
+        print(f'REGRESSÃO {linha}')
+    sys.exit(1 if lentos else 0)
+
+
+if __name__ == '__main__':
+    main()
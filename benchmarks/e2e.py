@@ -0,0 +1,176 @@
+"""
+Benchmark ponta a ponta dos scripts contra o eproc simulado (benchmarks/mock_eproc.py).
+
+Uso:
+    python benchmarks/e2e.py [--scripts loc_urgente relatorio_conclusos] [--execucoes 3]
+                             [--latencia-integracoes-ms 50] [--salvar-baseline]
+
+Sobe o mock em uma porta local, aponta EPROC_URL para ele, substitui Google Sheets, Drive e
+LegalMind por versões falsas com latência simulada e executa cada script N vezes pelo mesmo
+caminho da CLI (execute_script, com navegador headless). Exibe a mediana de cada fase da
+árvore de tempos (ScraperResult.timings) e compara com benchmarks/baselines/e2e.json: uma
+fase mais lenta que a baseline além da tolerância encerra com código 1.
+
+Requer o navegador de BROWSER_CHANNEL instalado para o Playwright (ex.: `playwright install chrome`).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from benchmarks.mock_eproc import MockConfig, servidor_mock  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'e2e.json'
+SCRIPTS_PADRAO = ('loc_urgente', 'relatorio_conclusos', 'alvaras_eletronicos')
+
+# Tolerância relativa sobre a baseline e folga absoluta (s) para fases muito curtas
+TOLERANCIA = float(os.environ.get('E2E_TOLERANCIA', '0.25'))
+FOLGA_S = float(os.environ.get('E2E_FOLGA_S', '0.5'))
+
+
+def _integracoes_falsas(latencia_s: float) -> list:
+    """Patches de Sheets, Drive e LegalMind que apenas esperam a latência configurada."""
+    import time
+
+    def sheets(spreadsheet_id, dados_processos, propagar_erros=False):
+        time.sleep(latencia_s)
+        return [p['processo'] for p in dados_processos]
+
+    def drive(*args, **kwargs):
+        time.sleep(latencia_s)
+        return 'mock-file-id'
+
+    async def legalmind(*args, **kwargs):
+        await asyncio.sleep(latencia_s)
+        return True
+
+    return [
+        mock.patch('src.scripts.loc_base.salvar_processos_no_sheets', sheets),
+        mock.patch('src.utils.integracao_legalmind.enviar_para_legalmind', legalmind),
+        mock.patch('src.scripts.relatorio_conclusos.upload_to_drive', drive),
+        mock.patch('src.scripts.relatorio_conclusos.enviar_relatorio_concluso', legalmind),
+        mock.patch('src.scripts.relatorio_conclusos.enviar_delta_relatorio_concluso', legalmind),
+        mock.patch('src.scripts.alvaras_eletronicos.search_file_in_drive', lambda *a: None),
+        mock.patch('src.scripts.alvaras_eletronicos.upload_to_drive', drive),
+    ]
+
+
+def _configurar(url: str, config: MockConfig, pasta: str) -> list:
+    """Aponta as configurações para o mock e isola o estado local em uma pasta temporária."""
+    from src.config import settings
+
+    valores = {
+        'EPROC_URL': url,
+        'EPROC_LOGIN': config.login,
+        'EPROC_SENHA': config.senha,
+        'EPROC_2FA_SECRET': config.segredo_2fa,
+        'EPROC_PERFIL': config.perfil,
+        'DAEMON_ATTACH': False,
+        'CAPTURE_MODE': 'off',
+        'TRACE_EXPORT_FILE': None,
+        'GOOGLE_DRIVE_FOLDER_ID': 'mock',
+        'GOOGLE_SHEETS_SPREADSHEET_ID': 'mock',
+    }
+    for nome in ('STATE_DIR', 'SESSION_DIR', 'ARTIFACTS_DIR', 'TEMP_DOWNLOAD_DIR'):
+        valores[nome] = os.path.join(pasta, nome.lower())
+    return [mock.patch.object(settings, nome, valor) for nome, valor in valores.items()]
+
+
+def fases(timings: dict) -> dict[str, float]:
+    """Duração de cada fase de primeiro nível da árvore de tempos, mais o total da execução."""
+    resultado = {'total': timings['duracao_s']}
+    for filho in timings.get('filhos', []):
+        resultado[filho['nome']] = resultado.get(filho['nome'], 0.0) + filho['duracao_s']
+    return resultado
+
+
+def medianas(execucoes: list[dict[str, float]]) -> dict[str, float]:
+    nomes = {nome for execucao in execucoes for nome in execucao}
+    return {
+        nome: round(statistics.median(e.get(nome, 0.0) for e in execucoes), 3)
+        for nome in sorted(nomes)
+    }
+
+
+def regressoes(atual: dict, baseline: dict) -> list[str]:
+    """Fases (script/fase) mais lentas que a baseline além da tolerância."""
+    lentas = []
+    for script, tempos in atual.items():
+        for fase, duracao in tempos.items():
+            referencia = baseline.get(script, {}).get(fase)
+            if referencia is not None and duracao > referencia * (1 + TOLERANCIA) + FOLGA_S:
+                lentas.append(f'{script}/{fase}: {duracao:.2f}s (baseline {referencia:.2f}s)')
+    return lentas
+
+
+async def executar(scripts: list[str], execucoes: int) -> dict[str, dict[str, float]]:
+    from src.main import execute_script
+
+    resultados = {}
+    for script in scripts:
+        tempos = []
+        for i in range(execucoes):
+            result = await execute_script(script, headless=True)
+            if not result.success or not result.timings:
+                raise RuntimeError(f'{script} falhou na execução {i + 1}: {result.message}')
+            tempos.append(fases(result.timings))
+        resultados[script] = medianas(tempos)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scripts', nargs='+', default=list(SCRIPTS_PADRAO))
+    parser.add_argument('--execucoes', type=int, default=3, help='Execuções por script (usa a mediana).')
+    parser.add_argument('--linhas-conclusos', type=int, default=2000)
+    parser.add_argument('--latencia-ms', type=float, default=0, help='Latência de cada resposta do mock.')
+    parser.add_argument('--latencia-integracoes-ms', type=float, default=50)
+    parser.add_argument('--2fa', dest='com_2fa', action='store_true', help='Exige TOTP no login.')
+    parser.add_argument('--salvar-baseline', action='store_true', help='Grava as medianas como nova baseline.')
+    args = parser.parse_args()
+
+    import pyotp
+
+    config = MockConfig(
+        segredo_2fa=pyotp.random_base32() if args.com_2fa else None,
+        linhas_conclusos=args.linhas_conclusos,
+        latencia_s=args.latencia_ms / 1000,
+    )
+
+    with contextlib.ExitStack() as pilha:
+        pasta = pilha.enter_context(tempfile.TemporaryDirectory(prefix='e2e-eproc-'))
+        url, _ = pilha.enter_context(servidor_mock(config))
+        for patch in _configurar(url, config, pasta) + _integracoes_falsas(args.latencia_integracoes_ms / 1000):
+            pilha.enter_context(patch)
+        atual = asyncio.run(executar(args.scripts, args.execucoes))
+
+    for script, tempos in atual.items():
+        print(script)
+        for fase, duracao in tempos.items():
+            print(f'  {duracao:8.2f} s  {fase}')
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding='utf-8')) if BASELINE_PATH.exists() else {}
+    if args.salvar_baseline:
+        baseline.update(atual)
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f'Baseline gravada em {BASELINE_PATH.relative_to(RAIZ)}')
+        return
+
+    lentas = regressoes(atual, baseline)
+    for linha in lentas:
+        print(f'REGRESSÃO {linha}')
+    sys.exit(1 if lentas else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Teste de carga da API: N clientes simultâneos chamando POST /run/{script}.
+
+Uso:
+    python benchmarks/load_test.py [--concorrencia 20] [--requisicoes 200] [--scripts loc_urgente]
+                                   [--alvo simulado|mock] [--url http://127.0.0.1:8000]
+                                   [--slots 2] [--duracao-ms 500] [--json relatorio.json]
+
+Alvos:
+- simulado (padrão): a app FastAPI roda no mesmo processo (httpx ASGITransport) e a execução
+  no navegador é substituída por uma espera de --duracao-ms. Mede a fila de execução, o event
+  loop e a API sem depender do Playwright;
+- mock: execute_script de verdade contra benchmarks/mock_eproc.py (requer o navegador de
+  BROWSER_CHANNEL), com Sheets, Drive e LegalMind falsos como em benchmarks/e2e.py;
+- --url: um servidor já em execução (ex: `uvicorn src.main:app`); a API Key vem de API_KEY.
+
+Relata percentis de latência, vazão, erros por status, atraso máximo do event loop e o pico
+de memória/CPU (ResourceMonitor) do processo e dos filhos (navegadores e workers). Com --url,
+os recursos e o atraso do loop são os do processo do teste, não os do servidor.
+Use --slots/--slots-urgentes para comparar valores de EXECUTION_SLOTS a partir dos dados.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+PERCENTIS = (50, 90, 95, 99)
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por interpolação linear entre as amostras ordenadas."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+async def _medir_atraso_loop(atrasos: list[float], intervalo_s: float = 0.05):
+    """Diferença entre o tempo esperado e o real de cada tique: indica o event loop bloqueado."""
+    while True:
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo_s)
+        atrasos.append(time.perf_counter() - inicio - intervalo_s)
+
+
+def execucao_simulada(duracao_s: float, variacao: float = 0.2):
+    """Substitui _executar_no_navegador por uma espera de duracao_s (± variacao)."""
+    from src.scripts.base import ScraperResult
+
+    async def executar(scraper, script_name, headless, capturar=None):
+        tempo = duracao_s * random.uniform(1 - variacao, 1 + variacao)
+        await asyncio.sleep(tempo)
+        return ScraperResult(success=True, message='Execução simulada.', execution_time=tempo)
+
+    return executar
+
+
+async def disparar(client, scripts: list[str], requisicoes: int, concorrencia: int, headers: dict) -> list[tuple]:
+    """Dispara as requisições com no máximo `concorrencia` em andamento. Retorna (script, status, s)."""
+    fila = itertools.islice(itertools.cycle(scripts), requisicoes)
+    resultados = []
+
+    async def cliente():
+        for script in fila:
+            inicio = time.perf_counter()
+            try:
+                resposta = await client.post(f'/run/{script}', headers=headers)
+                status = resposta.status_code
+            except Exception as e:
+                status = type(e).__name__
+            resultados.append((script, status, time.perf_counter() - inicio))
+
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    return resultados
+
+
+def relatorio(resultados: list[tuple], duracao_s: float, concorrencia: int, atrasos: list[float], recursos: dict) -> dict:
+    latencias = [s for _, status, s in resultados if status == 200]
+    erros = Counter(str(status) for _, status, _ in resultados if status != 200)
+    return {
+        'requisicoes': len(resultados),
+        'concorrencia': concorrencia,
+        'duracao_s': round(duracao_s, 3),
+        'vazao_rps': round(len(resultados) / duracao_s, 2) if duracao_s else 0.0,
+        'latencia_ms': {
+            **{f'p{p}': round(percentil(latencias, p) * 1000, 1) for p in PERCENTIS},
+            'max': round(max(latencias, default=0.0) * 1000, 1),
+        },
+        'erros': dict(erros),
+        'taxa_erro': round(sum(erros.values()) / len(resultados), 4) if resultados else 0.0,
+        'atraso_loop_ms_max': round(max(atrasos, default=0.0) * 1000, 1),
+        'recursos': recursos,
+    }
+
+
+async def executar_carga(
+    scripts: list[str], requisicoes: int, concorrencia: int, url: str | None = None, api_key: str | None = None
+) -> dict:
+    """Executa a carga contra a app local (ASGITransport) ou contra `url` e devolve o relatório."""
+    import httpx
+
+    from src.config import settings
+    from src.utils.resources import ResourceMonitor
+
+    if url:
+        transporte = None
+    else:
+        from src.api import app
+
+        transporte = httpx.ASGITransport(app=app)
+        url = 'http://api.local'
+    headers = {'X-API-Key': api_key or settings.API_KEY or ''}
+
+    atrasos = []
+    monitor = ResourceMonitor(intervalo_s=0.25)
+    monitor.start()
+    medidor = asyncio.create_task(_medir_atraso_loop(atrasos))
+    inicio = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(transport=transporte, base_url=url, timeout=None) as client:
+            resultados = await disparar(client, scripts, requisicoes, concorrencia, headers)
+    finally:
+        duracao = time.perf_counter() - inicio
+        medidor.cancel()
+        recursos = await monitor.stop()
+    dados = relatorio(resultados, duracao, concorrencia, atrasos, recursos)
+    if transporte is not None:
+        from src.execution import execution_queue
+
+        # Espera na fila x execução por script: mostra se faltam vagas (EXECUTION_SLOTS)
+        dados['fila'] = {
+            'slots': settings.EXECUTION_SLOTS,
+            'slots_urgentes': settings.EXECUTION_URGENT_SLOTS,
+            'scripts': execution_queue.status()['scripts'],
+        }
+    return dados
+
+
+def _imprimir(dados: dict):
+    lat = dados['latencia_ms']
+    print(f'{dados["requisicoes"]} requisições, {dados["concorrencia"]} clientes, {dados["duracao_s"]:.1f}s')
+    print(f'Vazão: {dados["vazao_rps"]:.2f} req/s   Erros: {dados["taxa_erro"]:.1%} {dados["erros"] or ""}')
+    print('Latência: ' + '  '.join(f'{k}={v:.0f}ms' for k, v in lat.items()))
+    print(f'Atraso máximo do event loop: {dados["atraso_loop_ms_max"]:.0f} ms')
+    recursos = dados['recursos']
+    print(f'Pico de memória: {recursos["rss_pico_total_mb"]:.0f} MB')
+    for componente in ('python', 'navegador', 'workers'):
+        r = recursos[componente]
+        print(
+            f'  {componente:<10} {r["rss_pico_mb"]:8.0f} MB  {r["cpu_s"]:7.1f}s CPU'
+            + (f'  {r["processos"]} processos' if 'processos' in r else '')
+        )
+    if dados.get('fila'):
+        fila = dados['fila']
+        print(f'Fila de execução ({fila["slots"]} vagas + {fila["slots_urgentes"]} urgentes):')
+        for script, m in fila['scripts'].items():
+            espera, execucao = m['espera_fila'], m['execucao']
+            print(
+                f'  {script:<24} espera média {espera["media_s"]}s (p95 {espera["p95_s"]}s)  '
+                f'execução média {execucao["media_s"]}s (p95 {execucao["p95_s"]}s)'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concorrencia', type=int, default=20, help='Clientes simultâneos.')
+    parser.add_argument('--requisicoes', type=int, default=200, help='Total de requisições.')
+    parser.add_argument('--scripts', nargs='+', default=['loc_urgente'], help='Scripts chamados em rodízio.')
+    parser.add_argument('--alvo', choices=('simulado', 'mock'), default='simulado')
+    parser.add_argument('--url', default=None, help='URL de um servidor em execução (ignora --alvo).')
+    parser.add_argument('--duracao-ms', type=float, default=500, help='Duração da execução simulada.')
+    parser.add_argument('--slots', type=int, default=None, help='Sobrescreve EXECUTION_SLOTS.')
+    parser.add_argument('--slots-urgentes', type=int, default=None, help='Sobrescreve EXECUTION_URGENT_SLOTS.')
+    parser.add_argument('--json', default=None, help='Grava o relatório neste arquivo.')
+    args = parser.parse_args()
+
+    from loguru import logger
+
+    from src import main as cli
+    from src.config import settings
+
+    # O log de cada execução distorceria a medição do event loop
+    logger.disable('src')
+
+    with contextlib.ExitStack() as pilha:
+        if args.slots is not None:
+            pilha.enter_context(mock.patch.object(settings, 'EXECUTION_SLOTS', args.slots))
+        if args.slots_urgentes is not None:
+            pilha.enter_context(mock.patch.object(settings, 'EXECUTION_URGENT_SLOTS', args.slots_urgentes))
+
+        if args.url is None and args.alvo == 'simulado':
+            simulada = execucao_simulada(args.duracao_ms / 1000)
+            pilha.enter_context(mock.patch.object(cli, '_executar_no_navegador', simulada))
+        elif args.url is None:
+            from benchmarks.e2e import _configurar, _integracoes_falsas
+            from benchmarks.mock_eproc import MockConfig, servidor_mock
+
+            config = MockConfig()
+            pasta = pilha.enter_context(tempfile.TemporaryDirectory(prefix='carga-eproc-'))
+            url_mock, _ = pilha.enter_context(servidor_mock(config))
+            for patch in _configurar(url_mock, config, pasta) + _integracoes_falsas(0.05):
+                pilha.enter_context(patch)
+
+        dados = asyncio.run(
+            executar_carga(args.scripts, args.requisicoes, args.concorrencia, args.url, os.environ.get('API_KEY'))
+        )
+
+    _imprimir(dados)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,505 @@
+"""
+Servidor local que imita as telas do eproc usadas pelos scripts, para benchmarks e testes
+de ponta a ponta sem acessar o sistema de produção do TJTO.
+
+Telas simuladas (mesmos seletores do eproc):
+- login (#txtUsuario/#pwdSenha), 2FA (#txtAcessoCodigo, TOTP) e seleção de perfil;
+- painel com #sidebar-searchbox e menu filtrável;
+- "Localizadores do Órgão" (#txtSiglaDescricaoLocalizador, #btnFiltro e tabela com o total);
+- listagem de processos do localizador com #sbmExcel (planilha com N linhas configuráveis);
+- "Relatório Alvará Eletrônico" (#selOrgao, datas, #sbmBuscar, "Gerar Excel Analítico");
+- "Relatórios Estatísticos" com "Processos Conclusos no 1º Grau - Vara" ("Pesquisar", "Gerar Excel").
+
+Uso:
+    python benchmarks/mock_eproc.py --port 8765 --linhas 5000 [--2fa] [--latencia-ms 50]
+
+Depois aponte EPROC_URL para http://127.0.0.1:8765/eproc/ (login/senha: os de MockConfig).
+"""
+import argparse
+import asyncio
+import contextlib
+import html
+import io
+import random
+import secrets
+import socket
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+import pyotp
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+
+PREFIXO = '/eproc'
+COOKIE_SESSAO = 'PHPSESSID'
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+RELATORIO_CONCLUSOS = 'Processos Conclusos no 1º Grau - Vara'
+
+LOCALIZADORES_PADRAO = {
+    'MANDADOS - CITAÇÃO/INTIMAÇÃO ELETRÔNICA': 300,
+    'PETIÇÃO': 500,
+    'PETIÇÃO INICIAL': 200,
+    'URGENTE': 100,
+}
+
+
+@dataclass
+class MockConfig:
+    login: str = 'mock'
+    senha: str = 'mock'
+    # Segredo TOTP do 2FA (None = sem 2FA)
+    segredo_2fa: str | None = None
+    # Perfil a selecionar após o login (None = sem tela de perfil)
+    perfil: str | None = None
+    # Quantidade de processos por localizador
+    localizadores: dict[str, int] = field(default_factory=lambda: dict(LOCALIZADORES_PADRAO))
+    linhas_conclusos: int = 2000
+    linhas_alvaras: int = 200
+    # Linhas por página na listagem HTML dos localizadores (paginação "infra" do eproc)
+    itens_por_pagina: int = 100
+    # Latência adicionada a cada requisição e tempo de geração dos relatórios (segundos)
+    latencia_s: float = 0.0
+    atraso_relatorio_s: float = 0.0
+    seed: int = 42
+
+
+def numero_processo(rng: random.Random) -> str:
+    """Número no padrão CNJ do TJTO (J.TR = 8.27)."""
+    return f'{rng.randrange(10**7):07d}-{rng.randrange(100):02d}.{rng.randint(2015, 2026)}.8.27.{rng.randrange(10**4):04d}'
+
+
+def _data_hora(rng: random.Random) -> str:
+    dia = date(2026, 1, 1) + timedelta(days=rng.randrange(180))
+    return f'{dia:%d/%m/%Y} {rng.randrange(8, 19):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}'
+
+
+def processos_localizador(config: MockConfig, nome: str) -> list[dict]:
+    """Processos determinísticos de um localizador (mesma seed = mesmos processos)."""
+    rng = random.Random(f'{config.seed}-{nome}')
+    return [
+        {'processo': numero_processo(rng), 'inclusao': _data_hora(rng), 'classe': 'PROCEDIMENTO COMUM CÍVEL'}
+        for _ in range(config.localizadores.get(nome, 0))
+    ]
+
+
+def _xlsx(cabecalho: list[str], linhas: list[list], titulo: str | None = None) -> bytes:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    if titulo is not None:
+        # O eproc gera uma linha de título antes do cabeçalho (lida com header=1)
+        ws.append([titulo])
+    ws.append(cabecalho)
+    for linha in linhas:
+        ws.append(linha)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def planilha_localizador(config: MockConfig, nome: str) -> bytes:
+    processos = processos_localizador(config, nome)
+    return _xlsx(
+        ['Número Processo', 'Classe', 'Inclusão no Localizador'],
+        [[p['processo'], p['classe'], p['inclusao']] for p in processos],
+        titulo=f'Processos do localizador {nome} - {len(processos)} registros',
+    )
+
+
+DESCRICOES_EVENTOS = [
+    'Conclusos para decisão', 'Juntada de petição', 'Expedida/certificada a intimação eletrônica',
+    'Decorrido prazo', 'Despacho', 'Distribuído por sorteio',
+]  # fmt: skip
+
+
+def detalhe_processo(config: MockConfig, numero: str) -> dict:
+    """Classe, partes e eventos (do mais recente ao mais antigo) de um processo, pelo número."""
+    digitos = ''.join(c for c in numero if c.isdigit())
+    rng = random.Random(f'{config.seed}-{digitos}')
+    total_eventos = rng.randint(3, 12)
+    return {
+        'classe': 'PROCEDIMENTO COMUM CÍVEL',
+        'partes': [
+            {'polo': 'AUTOR', 'nome': f'AUTOR {digitos[:7]}'},
+            {'polo': 'RÉU', 'nome': f'RÉU {digitos[:7]}'},
+        ],
+        'eventos': [
+            {'evento': str(i), 'data': _data_hora(rng), 'descricao': rng.choice(DESCRICOES_EVENTOS)}
+            for i in range(total_eventos, 0, -1)
+        ],
+    }
+
+
+COLUNAS_CONCLUSOS = [
+    'LOCALIDADE', 'VARA', 'COMPETENCIA', 'PROCESSO', 'DATA_AUTUACAO', 'CLASSE', 'CODIGO_CLASSE',
+    'SITUACAO_CLASSE', 'ASSUNTO', 'CODIGO_ASSUNTO', 'MOVIMENTO', 'CODIGO_MOVIMENTO', 'DATA_MOVIMENTO',
+    'DIAS', 'PARTE_AUTORA', 'PARTE_REU', 'ULTIMO LOCALIZADOR', 'PESSOA EM SITUACAO DE RUA', 'MAGISTRADO',
+]  # fmt: skip
+
+
+def planilha_conclusos(config: MockConfig) -> bytes:
+    rng = random.Random(f'{config.seed}-conclusos')
+    linhas = [
+        [
+            'PALMAS', '1ª VARA CÍVEL', 'CÍVEL', numero_processo(rng), _data_hora(rng), 'PROCEDIMENTO COMUM CÍVEL',
+            '7', 'ATIVO', 'Indenização por Dano Moral', '10433', 'Conclusos para decisão', '11010',
+            _data_hora(rng), str(rng.randrange(1, 120)), f'AUTOR {i}', f'RÉU {i}', 'URGENTE', 'NÃO',
+            'JUIZ SUBSTITUTO',
+        ]  # fmt: skip
+        for i in range(config.linhas_conclusos)
+    ]
+    return _xlsx(COLUNAS_CONCLUSOS, linhas)
+
+
+def planilha_alvaras(config: MockConfig) -> bytes:
+    rng = random.Random(f'{config.seed}-alvaras')
+    linhas = [
+        [numero_processo(rng), f'BENEFICIÁRIO {i}', f'{rng.randrange(100, 100000)},00', _data_hora(rng)]
+        for i in range(config.linhas_alvaras)
+    ]
+    return _xlsx(['Processo', 'Beneficiário', 'Valor', 'Data'], linhas, titulo='Relatório Alvará Eletrônico')
+
+
+async def _form(request: Request) -> dict:
+    """Campos de um formulário urlencoded (sem depender do python-multipart)."""
+    corpo = (await request.body()).decode('utf-8')
+    return dict(urllib.parse.parse_qsl(corpo, keep_blank_values=True))
+
+
+def _pagina(titulo: str, corpo: str) -> HTMLResponse:
+    return HTMLResponse(
+        f'<!DOCTYPE html><html lang="pt-br"><head><meta charset="utf-8"><title>{titulo}</title></head>'
+        f'<body>{corpo}</body></html>'
+    )
+
+
+def _controlador(acao: str, **params) -> str:
+    extras = ''.join(f'&{k}={v}' for k, v in params.items())
+    return f'{PREFIXO}/controlador.php?acao={acao}{extras}'
+
+
+MENU = [
+    ('Localizadores do Órgão', 'localizador_orgao_listar'),
+    ('Relatório Alvará Eletrônico', 'relatorio_alvara'),
+    ('Relatórios Estatísticos', 'relatorio_estatistico'),
+    ('Citações e Intimações', 'citacao_listar'),
+]
+
+SCRIPT_FILTRO_MENU = '''
+<script>
+  const busca = document.getElementById('sidebar-searchbox');
+  const normalizar = (t) => t.toLowerCase();
+  busca.addEventListener('input', () => {
+    document.querySelectorAll('#menu li').forEach((li) => {
+      li.style.display = normalizar(li.textContent).includes(normalizar(busca.value)) ? '' : 'none';
+    });
+  });
+</script>
+'''
+
+
+def _layout(titulo: str, conteudo: str) -> HTMLResponse:
+    itens = ''.join(
+        f'<li><a href="{_controlador(acao)}" aria-label="{nome}">{nome}</a></li>' for nome, acao in MENU
+    )
+    return _pagina(
+        titulo,
+        f'<nav id="sidebar"><input id="sidebar-searchbox" type="search" placeholder="Pesquisar no menu">'
+        f'<ul id="menu">{itens}</ul></nav><main><h1>{titulo}</h1>{conteudo}</main>{SCRIPT_FILTRO_MENU}',
+    )
+
+
+def _formulario_login(erro: str | None = None) -> HTMLResponse:
+    aviso = f'<div id="divInfraExcecao" class="infraExcecao">{html.escape(erro)}</div>' if erro else ''
+    return _pagina(
+        'eproc - Login',
+        f'{aviso}<form method="post" action="{PREFIXO}/">'
+        '<label for="txtUsuario">Usuário</label><input id="txtUsuario" name="txtUsuario" type="text">'
+        '<label for="pwdSenha">Senha</label><input id="pwdSenha" name="pwdSenha" type="password">'
+        '<button type="submit" id="sbmEntrar">Entrar</button></form>',
+    )
+
+
+def criar_app(config: MockConfig | None = None) -> FastAPI:
+    config = config or MockConfig()
+    # Sessões: id -> etapa ('2fa', 'perfil' ou 'ok')
+    sessoes: dict[str, str] = {}
+    app = FastAPI(title='Mock eproc')
+    app.state.config = config
+    app.state.requisicoes = 0
+
+    @app.middleware('http')
+    async def latencia(request: Request, call_next):
+        app.state.requisicoes += 1
+        if config.latencia_s:
+            await asyncio.sleep(config.latencia_s)
+        return await call_next(request)
+
+    def etapa(request: Request) -> str | None:
+        return sessoes.get(request.cookies.get(COOKIE_SESSAO, ''))
+
+    def proxima_etapa(request: Request, atual: str) -> Response:
+        ordem = ['2fa'] if config.segredo_2fa else []
+        ordem += ['perfil'] if config.perfil else []
+        ordem += ['ok']
+        seguinte = ordem[ordem.index(atual) + 1] if atual in ordem else ordem[0]
+        sessao = request.cookies.get(COOKIE_SESSAO) or secrets.token_hex(16)
+        sessoes[sessao] = seguinte
+        resposta = RedirectResponse(f'{PREFIXO}/', status_code=303)
+        resposta.set_cookie(COOKIE_SESSAO, sessao, httponly=True)
+        return resposta
+
+    @app.get(f'{PREFIXO}/')
+    async def inicio(request: Request):
+        estado = etapa(request)
+        if estado == '2fa':
+            return _pagina(
+                'eproc - Autenticação em dois fatores',
+                f'<form method="post" action="{PREFIXO}/2fa"><label for="txtAcessoCodigo">Código</label>'
+                '<input id="txtAcessoCodigo" name="txtAcessoCodigo" placeholder="Código de acesso"></form>',
+            )
+        if estado == 'perfil':
+            return _pagina(
+                'eproc - Perfil',
+                f'<form method="post" action="{PREFIXO}/perfil"><p>Selecione o perfil:</p>'
+                f'<button type="submit" name="perfil" value="{html.escape(config.perfil)}">'
+                f'{html.escape(config.perfil)}</button></form>',
+            )
+        if estado == 'ok':
+            return _layout('Painel do Usuário', '<p>Bem-vindo ao eproc.</p>')
+        return _formulario_login()
+
+    @app.post(f'{PREFIXO}/')
+    async def entrar(request: Request):
+        form = await _form(request)
+        if form.get('txtUsuario') != config.login or form.get('pwdSenha') != config.senha:
+            return _formulario_login('Usuário ou senha inválidos.')
+        return proxima_etapa(request, 'login')
+
+    @app.post(f'{PREFIXO}/2fa')
+    async def segundo_fator(request: Request):
+        form = await _form(request)
+        if etapa(request) != '2fa' or not pyotp.TOTP(config.segredo_2fa).verify(
+            str(form.get('txtAcessoCodigo', '')), valid_window=1
+        ):
+            return _formulario_login('Código de acesso inválido.')
+        return proxima_etapa(request, '2fa')
+
+    @app.post(f'{PREFIXO}/perfil')
+    async def perfil(request: Request):
+        if etapa(request) != 'perfil':
+            return _formulario_login()
+        return proxima_etapa(request, 'perfil')
+
+    @app.api_route(f'{PREFIXO}/controlador.php', methods=['GET', 'POST'])
+    async def controlador(request: Request, acao: str = ''):
+        if etapa(request) != 'ok':
+            return _formulario_login()
+        form = await _form(request) if request.method == 'POST' else {}
+        parametros = {**request.query_params, **form}
+
+        if acao == 'localizador_orgao_listar':
+            return _localizadores(parametros.get('txtSiglaDescricaoLocalizador', ''))
+        if acao == 'localizador_processos_listar':
+            return await _processos_localizador(parametros)
+        if acao == 'processo_selecionar':
+            return _processo(parametros.get('num_processo', ''))
+        if acao == 'relatorio_alvara':
+            return await _relatorio_alvara(parametros)
+        if acao == 'relatorio_estatistico':
+            return await _relatorio_estatistico(parametros)
+        return _layout('Página não encontrada', f'<p>Ação "{html.escape(acao)}" não simulada.</p>')
+
+    def _localizadores(filtro: str) -> HTMLResponse:
+        linhas = ''
+        for indice, (nome, total) in enumerate(sorted(config.localizadores.items())):
+            if filtro.lower() in nome.lower():
+                link = _controlador('localizador_processos_listar', id=indice)
+                linhas += f'<tr><td>{html.escape(nome)}</td><td>Localizador do órgão</td><td><a href="{link}">{total}</a></td></tr>'
+        return _layout(
+            'Localizadores do Órgão',
+            f'<form method="get" action="{PREFIXO}/controlador.php">'
+            '<input type="hidden" name="acao" value="localizador_orgao_listar">'
+            f'<input id="txtSiglaDescricaoLocalizador" name="txtSiglaDescricaoLocalizador" value="{html.escape(filtro)}">'
+            '<button type="submit" id="btnFiltro">Filtrar</button></form>'
+            '<table class="infraTable"><tr><th>Localizador</th><th>Tipo</th><th>Total de processos</th></tr>'
+            f'{linhas}</table>',
+        )
+
+    def _localizador_por_id(parametros) -> str:
+        nomes = sorted(config.localizadores)
+        return nomes[int(parametros.get('id', 0))]
+
+    async def _processos_localizador(parametros) -> Response:
+        nome = _localizador_por_id(parametros)
+        if parametros.get('sbmExcel') is not None:
+            await asyncio.sleep(config.atraso_relatorio_s)
+            return _download(planilha_localizador(config, nome), 'processos_localizador.xlsx')
+
+        processos = processos_localizador(config, nome)
+        total_paginas = max(1, -(-len(processos) // config.itens_por_pagina))
+        pagina = min(int(parametros.get('hdnInfraPaginaAtual') or 0), total_paginas - 1)
+        inicio = pagina * config.itens_por_pagina
+        linhas = ''.join(
+            f'<tr><td><a href="{_controlador("processo_selecionar", num_processo=p["processo"])}">{p["processo"]}</a></td>'
+            f'<td>{p["classe"]}</td><td>{p["inclusao"]}</td></tr>'
+            for p in processos[inicio : inicio + config.itens_por_pagina]
+        )
+        opcoes = ''.join(
+            f'<option value="{i}"{" selected" if i == pagina else ""}>{i + 1}</option>' for i in range(total_paginas)
+        )
+        paginacao = (
+            f'<input type="hidden" id="hdnInfraPaginaAtual" name="hdnInfraPaginaAtual" value="{pagina}">'
+            f'<select id="selInfraPaginacaoSuperior" name="selInfraPaginacaoSuperior">{opcoes}</select>'
+        )
+        botao = '<button type="submit" id="sbmExcel" name="sbmExcel" value="1">Gerar Planilha</button>'
+        return _layout(
+            f'Processos do localizador {html.escape(nome)}',
+            f'<form method="post" action="{_controlador("localizador_processos_listar", id=parametros.get("id", 0))}">'
+            f'{botao}{paginacao}<table class="infraTable"><tr><th>Processo</th><th>Classe</th><th>Inclusão no Localizador</th></tr>'
+            f'{linhas}</table>{botao}</form>',
+        )
+
+    def _processo(numero: str) -> HTMLResponse:
+        detalhe = detalhe_processo(config, numero)
+        polos = list(dict.fromkeys(p['polo'] for p in detalhe['partes']))
+        partes = ''.join(
+            '<td>'
+            + ''.join(f'<span class="infraNomeParte">{p["nome"]}</span><br>' for p in detalhe['partes'] if p['polo'] == polo)
+            + '</td>'
+            for polo in polos
+        )
+        eventos = ''.join(
+            f'<tr><td>{e["evento"]}</td><td>{e["data"]}</td><td>{e["descricao"]}</td><td>servidor.mock</td></tr>'
+            for e in detalhe['eventos']
+        )
+        return _layout(
+            'Consulta Processual - Detalhes do Processo',
+            f'<fieldset id="fldCapa"><span id="txtNumProcesso">{html.escape(numero)}</span>'
+            f'<span id="txtClasse">{detalhe["classe"]}</span></fieldset>'
+            '<table id="tblPartesERepresentantes" class="infraTable">'
+            f'<tr>{"".join(f"<th>{polo}</th>" for polo in polos)}</tr><tr>{partes}</tr></table>'
+            '<table id="tblEventos" class="infraTable">'
+            '<tr><th>Evento</th><th>Data/Hora</th><th>Descrição</th><th>Usuário</th></tr>'
+            f'{eventos}</table>',
+        )
+
+    async def _relatorio_alvara(parametros) -> Response:
+        if parametros.get('btnexcel') == 'analitico':
+            await asyncio.sleep(config.atraso_relatorio_s)
+            return _download(planilha_alvaras(config), 'relatorio_alvara.xlsx')
+        if parametros.get('sbmBuscar') is not None:
+            return _layout(
+                'Relatório Alvará Eletrônico',
+                f'<form method="post" action="{_controlador("relatorio_alvara")}">'
+                f'<p>{config.linhas_alvaras} alvarás encontrados.</p>'
+                '<button type="submit" id="btnexcel" name="btnexcel" value="sintetico">Gerar Excel Sintético</button>'
+                '<button type="submit" id="btnexcel" name="btnexcel" value="analitico">Gerar Excel Analítico</button>'
+                '</form>',
+            )
+        return _layout(
+            'Relatório Alvará Eletrônico',
+            f'<form method="post" action="{_controlador("relatorio_alvara")}">'
+            '<select id="selOrgao" name="selOrgao"><option value="">Selecione</option>'
+            '<option value="270000100">TODIA1ECIV</option></select>'
+            '<input type="date" id="txtDataInicio" name="txtDataInicio">'
+            '<input type="date" id="txtDataFim" name="txtDataFim">'
+            '<button type="submit" id="sbmBuscar" name="sbmBuscar" value="1">Buscar Alvarás</button></form>',
+        )
+
+    async def _relatorio_estatistico(parametros) -> Response:
+        if parametros.get('sbmExcel') is not None:
+            await asyncio.sleep(config.atraso_relatorio_s)
+            return _download(planilha_conclusos(config), 'relatorio_conclusos.xlsx')
+        resultado = ''
+        if parametros.get('sbmPesquisar') is not None:
+            await asyncio.sleep(config.atraso_relatorio_s)
+            resultado = f'<p>{config.linhas_conclusos} processos encontrados.</p>'
+        return _layout(
+            'Relatórios Estatísticos',
+            f'<form method="post" action="{_controlador("relatorio_estatistico")}">'
+            '<div id="divInfraBarraComandosSuperior">'
+            '<button type="submit" name="sbmPesquisar" value="1">Pesquisar</button>'
+            '<button type="submit" name="sbmExcel" value="1">Gerar Excel</button></div>'
+            '<label for="selRelatorio">Selecione o Relatório:</label>'
+            f'<select id="selRelatorio" name="selRelatorio"><option value="">Selecione</option>'
+            f'<option value="conclusos">{RELATORIO_CONCLUSOS}</option></select>'
+            '<input type="text" id="txtDataInicio" name="txtDataInicio">'
+            '<input type="text" id="txtDataFim" name="txtDataFim">'
+            f'{resultado}</form>',
+        )
+
+    return app
+
+
+def _download(conteudo: bytes, nome: str) -> Response:
+    return Response(
+        conteudo, media_type=MIME_XLSX, headers={'Content-Disposition': f'attachment; filename="{nome}"'}
+    )
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def servidor_mock(config: MockConfig | None = None, porta: int | None = None):
+    """Sobe o mock em uma thread (uvicorn) e devolve a URL base para EPROC_URL."""
+    import uvicorn
+
+    porta = porta or porta_livre()
+    app = criar_app(config)
+    servidor = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=porta, log_level='warning'))
+    thread = threading.Thread(target=servidor.run, name='mock-eproc', daemon=True)
+    thread.start()
+    limite = time.monotonic() + 10
+    while not servidor.started:
+        if time.monotonic() > limite or not thread.is_alive():
+            raise RuntimeError('O servidor mock do eproc não iniciou.')
+        time.sleep(0.05)
+    try:
+        yield f'http://127.0.0.1:{porta}{PREFIXO}/', app
+    finally:
+        servidor.should_exit = True
+        thread.join(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que simula o eproc.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--linhas', type=int, default=None, help='Processos em cada localizador.')
+    parser.add_argument('--linhas-conclusos', type=int, default=2000)
+    parser.add_argument('--2fa', dest='com_2fa', action='store_true', help='Exige código TOTP após a senha.')
+    parser.add_argument('--perfil', default=None, help='Exige a seleção deste perfil após o login.')
+    parser.add_argument('--latencia-ms', type=float, default=0)
+    parser.add_argument('--atraso-relatorio-s', type=float, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        segredo_2fa=pyotp.random_base32() if args.com_2fa else None,
+        perfil=args.perfil,
+        linhas_conclusos=args.linhas_conclusos,
+        latencia_s=args.latencia_ms / 1000,
+        atraso_relatorio_s=args.atraso_relatorio_s,
+    )
+    if args.linhas is not None:
+        config.localizadores = {nome: args.linhas for nome in config.localizadores}
+
+    print(f'EPROC_URL=http://127.0.0.1:{args.port}{PREFIXO}/')
+    print(f'EPROC_LOGIN={config.login}  EPROC_SENHA={config.senha}')
+    if config.segredo_2fa:
+        print(f'EPROC_2FA_SECRET={config.segredo_2fa}')
+
+    import uvicorn
+
+    uvicorn.run(criar_app(config), host='127.0.0.1', port=args.port, log_level='info')
+
+
+if __name__ == '__main__':
+    main()
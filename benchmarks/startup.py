@@ -0,0 +1,72 @@
+"""
+Benchmark do tempo de inicialização da CLI (`python -X importtime -c "import src.main"`).
+
+Uso:
+    python benchmarks/startup.py [--top 15]
+
+Exibe o tempo total de importação de src.main, os módulos mais caros e se algum módulo
+pesado (FastAPI, Playwright, pandas, Google API) foi carregado indevidamente.
+O orçamento é verificado em tests/test_startup.py.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Orçamento de importação de src.main (segundos); pode ser ajustado em máquinas lentas
+STARTUP_BUDGET_S = float(os.environ.get('STARTUP_BUDGET_S', '1.0'))
+
+# Módulos que não devem ser carregados só por importar src.main
+MODULOS_PESADOS = ('fastapi', 'playwright', 'pandas', 'googleapiclient', 'httpx', 'requests')
+
+_LINHA = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def medir_importacao(modulo: str = 'src.main') -> tuple[float, list[tuple[str, float]], list[str]]:
+    """
+    Importa o módulo em um processo novo com -X importtime.
+    Retorna (tempo cumulativo do módulo em s, [(módulo, s)] por custo cumulativo, módulos pesados carregados).
+    """
+    codigo = (
+        f'import sys, {modulo}; '
+        f'print(",".join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))'
+    )
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    custos = {}
+    for linha in proc.stderr.splitlines():
+        m = _LINHA.match(linha)
+        if m:
+            custos[m.group(4)] = int(m.group(2)) / 1_000_000
+
+    pesados = [m for m in proc.stdout.strip().split(',') if m]
+    ranking = sorted(custos.items(), key=lambda item: item[1], reverse=True)
+    return custos.get(modulo, 0.0), ranking, pesados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15, help='Quantidade de módulos mais caros exibidos.')
+    args = parser.parse_args()
+
+    total, ranking, pesados = medir_importacao()
+    print(f'src.main: {total * 1000:.1f} ms (orçamento: {STARTUP_BUDGET_S * 1000:.0f} ms)')
+    for nome, segundos in ranking[: args.top]:
+        print(f'  {segundos * 1000:8.1f} ms  {nome}')
+    print(f'Módulos pesados carregados: {", ".join(pesados) or "nenhum"}')
+
+    sys.exit(0 if total <= STARTUP_BUDGET_S and not pesados else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+API web (FastAPI) do Robô Eproc TJTO.
+
+Separada de src.main para que a CLI não pague a importação do FastAPI.
+O servidor continua podendo ser iniciado com `uvicorn src.main:app`.
+"""
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Security
+from fastapi.responses import Response
+from fastapi.security import APIKeyHeader
+
+from src import main
+from src.config import settings
+from src.logger import logger
+from src.scripts.base import ScraperResult
+from src.utils.async_io import shutdown_executors
+
+# --- MODO API (FastAPI) ---
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Tarefas em segundo plano: login antecipado e manutenção da sessão (SESSION_KEEPALIVE)
+    e agendador interno de scripts (SCHEDULER_ENABLED).
+    """
+    keeper = None
+    if settings.SESSION_KEEPALIVE:
+        from src.utils.session_keeper import SessionKeeper
+
+        keeper = SessionKeeper()
+        keeper.start()
+
+    app.state.scheduler = None
+    if settings.SCHEDULER_ENABLED:
+        from src.scheduler import Scheduler, carregar_jobs
+
+        app.state.scheduler = Scheduler(carregar_jobs())
+        app.state.scheduler.start()
+    try:
+        yield
+    finally:
+        if app.state.scheduler is not None:
+            await app.state.scheduler.stop()
+        if keeper is not None:
+            await keeper.stop()
+        shutdown_executors()
+
+app = FastAPI(
+    title='Robô Eproc TJTO',
+    description='API para automatizar a extração de dados do sistema eproc do TJTO.',
+    version='0.3.0',
+    lifespan=lifespan,
+)
+
+# --- AUTENTICAÇÃO POR API KEY ---
+
+api_key_header = APIKeyHeader(name='X-API-Key', auto_error=False)
+
+async def verify_api_key(api_key: str = Security(api_key_header)):
+    """
+    Dependência de segurança que valida o header X-API-Key.
+    Se API_KEY não estiver configurada no .env, bloqueia todas as requisições.
+    """
+    if not settings.API_KEY:
+        logger.error('API_KEY não configurada no .env. Acesso negado.')
+        raise HTTPException(
+            status_code=500,
+            detail='API_KEY não configurada no servidor. Configure no .env para habilitar o acesso.'
+        )
+    if not api_key or api_key != settings.API_KEY:
+        logger.warning('Tentativa de acesso com API Key inválida.')
+        raise HTTPException(
+            status_code=401,
+            detail='API Key inválida ou não fornecida. Envie o header X-API-Key.'
+        )
+    return api_key
+
+
+@app.get('/', tags=['Root'])
+async def read_root():
+    """Endpoint raiz da API (sem autenticação)."""
+    if not settings.EPROC_LOGIN or not settings.EPROC_SENHA:
+        logger.warning('Credenciais não configuradas no .env')
+
+    return {'message': 'Bem-vindo à API do Robô Eproc TJTO!', 'env': settings.model_dump(include={'LOG_LEVEL', 'HEADLESS'})}
+
+@app.post('/run/{script_name}', response_model=ScraperResult, tags=['Scraper'], dependencies=[Depends(verify_api_key)])
+async def run_script_endpoint(script_name: str, trace: bool | None = None):
+    """
+    Endpoint da API para acionar a execução de um script de extração.
+    Com `?trace=true` grava trace e HAR do Playwright desta execução (ver CAPTURE_MODE).
+    """
+    try:
+        # Na API, usamos a configuração global para headless, mas podemos forçar False para debug se necessário
+        # Aqui vamos respeitar a config ou forçar False se for debug local
+        # Resolvido em tempo de chamada para que src.main.execute_script possa ser substituído (ex: testes)
+        result = await main.execute_script(script_name, headless=settings.HEADLESS, capturar=trace)
+        return result
+    except (FileNotFoundError, ImportError, AttributeError) as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f'Erro inesperado: {e}') from e
+
+
+@app.get('/execution/metrics', tags=['Scraper'], dependencies=[Depends(verify_api_key)])
+async def execution_metrics():
+    """Tempo de espera na fila x tempo de execução por script, prazos perdidos e vagas livres."""
+    from src.execution import execution_queue
+
+    return execution_queue.status()
+
+
+async def verify_metrics_access(api_key: str = Security(api_key_header)):
+    """O /metrics é aberto por padrão (coletores Prometheus); METRICS_REQUIRE_API_KEY exige a API Key."""
+    if settings.METRICS_REQUIRE_API_KEY:
+        await verify_api_key(api_key)
+
+
+@app.get('/metrics', tags=['Scraper'], dependencies=[Depends(verify_metrics_access)])
+async def prometheus_metrics():
+    """Métricas de desempenho no formato de exposição do Prometheus."""
+    from src.utils.metrics import CONTENT_TYPE, registro
+
+    return Response(content=registro.expor(), media_type=CONTENT_TYPE)
+
+
+# --- AGENDADOR ---
+
+@app.get('/scheduler/jobs', tags=['Agendador'], dependencies=[Depends(verify_api_key)])
+async def scheduler_jobs(request: Request):
+    """Tarefas agendadas, com a próxima execução e as execuções em andamento."""
+    scheduler = getattr(request.app.state, 'scheduler', None)
+    return {'ativo': scheduler is not None, 'jobs': scheduler.status() if scheduler else []}
+
+@app.get('/scheduler/history', tags=['Agendador'], dependencies=[Depends(verify_api_key)])
+async def scheduler_history(script: str | None = None, limite: int = 50):
+    """Histórico das execuções do agendador (mais recentes por último)."""
+    from src.scheduler import ler_historico
+
+    return ler_historico(limite=limite, script=script)
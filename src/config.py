@@ -31,6 +31,95 @@ class Settings(BaseSettings):
     N8N_WEBHOOK_PLANILHA: str = 'https://n8n.maicondener.dev.br/webhook/planilha-processos-gabinete'
     TEMP_DOWNLOAD_DIR: str = 'data'
 
+    # Estado entre execuções (ex: última contagem de cada localizador)
+    STATE_DIR: str = 'data/state'
+    # Ignora o atalho "sem alterações" e força a sincronização completa dos localizadores
+    LOCATOR_FORCE_FULL_SYNC: bool = False
+    # Extração dos localizadores: excel (exportação #sbmExcel) ou html (tabela da listagem paginada)
+    LOCATOR_EXTRACTION_MODE: str = 'excel'
+    LOCATOR_EXCEL_TIMEOUT_S: int = 120  # Sem o download neste prazo, recorre à listagem HTML
+    LOCATOR_HTML_CONCURRENCY: int = 4  # Páginas da listagem buscadas simultaneamente
+    # Envia ao LegalMind os inéditos enriquecidos com a página de detalhes (classe, partes e eventos)
+    ENRICH_PROCESSOS: bool = False
+    ENRICH_CONCURRENCY: int = 4  # Páginas de detalhes buscadas simultaneamente
+    ENRICH_CACHE_TTL_HORAS: int = 24  # Validade do cache de detalhes em STATE_DIR/detalhes
+    ENRICH_MAX_EVENTOS: int = 5  # Eventos mais recentes enviados por processo
+    # Reenvia o relatório de conclusos ao Drive/LegalMind mesmo que seja idêntico ao anterior
+    CONCLUSOS_FORCE_SYNC: bool = False
+    # Envia ao LegalMind apenas as linhas novas/alteradas (e os processos removidos) do relatório
+    CONCLUSOS_DELTA_SYNC: bool = True
+    # Extração incremental: solicita apenas o período desde a última execução bem-sucedida
+    CONCLUSOS_INCREMENTAL: bool = False
+    CONCLUSOS_FULL_REFRESH_DIAS: int = 7  # Intervalo máximo entre atualizações completas
+    CONCLUSOS_FILTRO_DATA_INICIO: str = '#txtDataInicio'
+    CONCLUSOS_FILTRO_DATA_FIM: str = '#txtDataFim'
+
+    # Checkpoints de pipelines longos (retomada após falha no Drive/LegalMind)
+    ARTIFACTS_DIR: str = 'data/artifacts'
+    PIPELINE_RETOMADA_MAX_HORAS: int = 12
+    PIPELINE_MAX_TENTATIVAS: int = 3
+    PIPELINE_HISTORICO_MAX: int = 20
+
+    # Pool de threads para chamadas bloqueantes (Google APIs, pandas) fora do event loop
+    IO_THREAD_POOL_SIZE: int = 4
+    # Pool de processos para leitura/transformação de planilhas (0 = usa o pool de threads)
+    CPU_PROCESS_POOL_SIZE: int = 2
+
+    # Sessões do eproc compartilhadas entre execuções, por (login, perfil)
+    SESSION_DIR: str = 'data/sessions'
+    SESSION_LOCK_TIMEOUT: int = 10  # Segundos aguardando a trava (e idade para considerá-la abandonada)
+    # Verifica a sessão salva com uma requisição HTTP antes de abrir a página
+    SESSION_PROBE_ON_START: bool = True
+    # Mantém a sessão aquecida em segundo plano enquanto a API estiver no ar
+    SESSION_KEEPALIVE: bool = False
+    SESSION_KEEPALIVE_INTERVAL_MIN: int = 10
+    SESSION_MAX_IDADE_MIN: int = 120  # Refaz o login antes de a sessão atingir esta idade
+    # Tempo máximo (ms) aguardando cada transição de tela durante o login
+    LOGIN_ESTADO_TIMEOUT: int = 30000
+
+    # Modo daemon: navegador persistente com depuração remota (robo-eproc daemon)
+    DAEMON_PORT: int = 9222
+    DAEMON_USER_DATA_DIR: str = 'data/browser_profile'
+    DAEMON_ENDPOINT_FILE: str = 'data/daemon.json'
+    DAEMON_ATTACH: bool = True  # A CLI/API se conecta ao daemon, se houver um em execução
+    DAEMON_CONNECT_TIMEOUT: int = 3000  # ms
+
+    # Agendador interno (roda junto com a API). Tarefas: {"script": "expressão cron"} e/ou YAML
+    SCHEDULER_ENABLED: bool = False
+    SCHEDULER_JOBS: dict[str, str] = {}
+    SCHEDULER_CONFIG: str = 'schedule.yaml'
+    SCHEDULER_STAGGER_S: int = 30  # Intervalo entre tarefas que vencem no mesmo minuto
+    SCHEDULER_HISTORICO_MAX: int = 500
+
+    # Fila de execução: vagas simultâneas e vagas extras reservadas a scripts urgentes
+    EXECUTION_SLOTS: int = 1
+    EXECUTION_URGENT_SLOTS: int = 1
+    EXECUTION_PRIORIDADE_URGENTE: int = 0  # PRIORITY menor ou igual a este valor é urgente
+    EXECUTION_METRICS_JANELA: int = 200  # Execuções consideradas nas métricas de cada script
+
+    # Tempos por fase: arquivo JSONL opcional (ex: data/traces/fases.jsonl) e exportação OpenTelemetry
+    TRACE_EXPORT_FILE: str | None = None
+    OTEL_ENABLED: bool = False
+
+    # Exige o header X-API-Key também no GET /metrics (Prometheus)
+    METRICS_REQUIRE_API_KEY: bool = False
+
+    # Consumo de recursos por execução (Python, navegador e workers) e top alocações do tracemalloc (0 = desligado)
+    RESOURCE_MONITOR_ENABLED: bool = False
+    RESOURCE_SAMPLE_INTERVAL_S: float = 1.0
+    RESOURCE_TRACEMALLOC_TOP: int = 0
+
+    # Captura de trace/HAR do Playwright: off, always ou auto (mantém só falhas e execuções acima do p95)
+    CAPTURE_MODE: str = 'off'
+    CAPTURE_DIR: str = 'data/captures'
+    CAPTURE_MAX_RUNS: int = 20
+    CAPTURE_AUTO_MIN_AMOSTRAS: int = 5
+    CAPTURE_TOP_REQUESTS: int = 15
+
+    # Gravação/reprodução da rede das execuções (route_from_har): off, record ou replay
+    REPLAY_MODE: str = 'off'
+    REPLAY_DIR: str = 'data/replays'
+
     model_config = SettingsConfigDict(
         env_file='.env',
         env_file_encoding='utf-8',
@@ -0,0 +1,127 @@
+"""
+Modo daemon: mantém um navegador aberto, com depuração remota (CDP) e sessão logada,
+para que as execuções via CLI se conectem a ele em vez de abrir o Chrome e logar a cada vez.
+
+Uso:
+    robo-eproc daemon [--show-browser]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+from datetime import datetime
+
+from playwright.async_api import async_playwright
+
+from src.config import settings
+from src.logger import logger
+from src.utils.metrics import NAVEGADORES_INICIADOS
+from src.utils.session_keeper import USER_AGENT, LoginScraper
+from src.utils.session_store import probe_session, session_store
+
+
+def _endpoint_path() -> str:
+    return os.path.join(os.getcwd(), settings.DAEMON_ENDPOINT_FILE)
+
+
+def ler_endpoint() -> str | None:
+    """Retorna o endpoint CDP do daemon em execução (ou None se não houver daemon)."""
+    try:
+        with open(_endpoint_path(), encoding='utf-8') as f:
+            return json.load(f)['endpoint']
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+async def conectar_daemon(playwright):
+    """
+    Conecta ao navegador do daemon via CDP. Retorna o Browser conectado ou None
+    se não houver daemon ativo (o chamador então abre o seu próprio navegador).
+    """
+    endpoint = ler_endpoint()
+    if not endpoint:
+        return None
+    try:
+        browser = await playwright.chromium.connect_over_cdp(endpoint, timeout=settings.DAEMON_CONNECT_TIMEOUT)
+    except Exception as e:
+        logger.warning(f'Daemon não respondeu em {endpoint}. Abrindo navegador próprio: {e}')
+        return None
+    if not browser.contexts:
+        await browser.close()
+        return None
+    NAVEGADORES_INICIADOS.inc('daemon')
+    logger.info(f'Conectado ao navegador do daemon em {endpoint}.')
+    return browser
+
+
+async def _garantir_login(context):
+    """Faz login em uma aba do contexto do daemon se a sessão não estiver válida."""
+    if await probe_session(context):
+        return
+    logger.info('Sessão do daemon inválida. Realizando login...')
+    page = await context.new_page()
+    try:
+        await LoginScraper().run(page)
+    finally:
+        await page.close()
+
+
+async def run_daemon(headless: bool = True):
+    porta = settings.DAEMON_PORT
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            os.path.join(os.getcwd(), settings.DAEMON_USER_DATA_DIR),
+            headless=headless,
+            channel=settings.BROWSER_CHANNEL,
+            args=[f'--remote-debugging-port={porta}', '--remote-debugging-address=127.0.0.1'],
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=USER_AGENT,
+            permissions=['notifications'],
+        )
+
+        # Reaproveita a sessão salva por execuções anteriores, se houver
+        sessao = session_store.load(settings.EPROC_LOGIN, settings.EPROC_PERFIL)
+        if sessao and sessao['storage_state'].get('cookies'):
+            await context.add_cookies(sessao['storage_state']['cookies'])
+
+        await _garantir_login(context)
+
+        os.makedirs(os.path.dirname(_endpoint_path()), exist_ok=True)
+        with open(_endpoint_path(), 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'endpoint': f'http://127.0.0.1:{porta}',
+                    'pid': os.getpid(),
+                    'iniciado_em': datetime.now().isoformat(timespec='seconds'),
+                },
+                f,
+            )
+        logger.info(f'Daemon pronto. Navegador disponível via CDP na porta {porta}.')
+
+        try:
+            while True:
+                await asyncio.sleep(settings.SESSION_KEEPALIVE_INTERVAL_MIN * 60)
+                try:
+                    await _garantir_login(context)
+                except Exception as e:
+                    logger.warning(f'Falha ao renovar a sessão do daemon: {e}')
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(_endpoint_path())
+            await context.close()
+
+
+def daemon_cli(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog='robo-eproc daemon',
+        description='Mantém um navegador logado no eproc para as execuções via CLI.',
+    )
+    parser.add_argument('--show-browser', action='store_true', help='Exibe a janela do navegador.')
+    args = parser.parse_args(argv)
+
+    headless = False if args.show_browser else settings.HEADLESS
+    try:
+        asyncio.run(run_daemon(headless=headless))
+    except KeyboardInterrupt:
+        logger.info('Daemon encerrado.')
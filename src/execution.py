@@ -0,0 +1,156 @@
+"""
+Fila de execução com prioridades e prazos.
+
+Todas as execuções de scripts do processo (API, agendador, CLI) passam por esta fila.
+EXECUTION_SLOTS limita quantas rodam ao mesmo tempo (navegador/sessão compartilhados);
+EXECUTION_URGENT_SLOTS são vagas extras reservadas a scripts urgentes (PRIORITY menor ou
+igual a EXECUTION_PRIORIDADE_URGENTE), de modo que um localizador urgente não espere um
+relatório longo terminar. Na fila, vence a menor prioridade e, em seguida, o prazo mais curto.
+
+Para cada script são medidos o tempo de espera na fila e o tempo de execução, além das
+execuções que iniciaram depois do prazo (DEADLINE_S) — expostos em /execution/metrics.
+"""
+import asyncio
+import heapq
+import itertools
+import statistics
+import time
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import settings
+from src.logger import logger
+
+SLOT_GERAL = 'geral'
+SLOT_URGENTE = 'urgente'
+
+
+@dataclass(order=True)
+class _Entrada:
+    prioridade: int
+    prazo: float
+    seq: int
+    script: str = field(compare=False)
+    urgente: bool = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+def _resumo(amostras) -> dict:
+    if not amostras:
+        return {'media_s': None, 'p95_s': None, 'max_s': None}
+    ordenadas = sorted(amostras)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(round(0.95 * (len(ordenadas) - 1))))]
+    return {
+        'media_s': round(statistics.fmean(ordenadas), 3),
+        'p95_s': round(p95, 3),
+        'max_s': round(ordenadas[-1], 3),
+    }
+
+
+class ExecutionQueue:
+    def __init__(self):
+        self._seq = itertools.count()
+        self._loop = None
+        self._metricas = defaultdict(
+            lambda: {
+                'execucoes': 0,
+                'prazos_perdidos': 0,
+                'espera': deque(maxlen=settings.EXECUTION_METRICS_JANELA),
+                'execucao': deque(maxlen=settings.EXECUTION_METRICS_JANELA),
+            }
+        )
+
+    def _garantir_loop(self):
+        """
+        Os futures pertencem a um event loop. Se a fila for usada em outro loop (ex: asyncio.run
+        na CLI, TestClient), o estado de espera é reiniciado para o novo loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._fila: list[_Entrada] = []
+            self._livres = {SLOT_GERAL: settings.EXECUTION_SLOTS, SLOT_URGENTE: settings.EXECUTION_URGENT_SLOTS}
+
+    def _despachar(self):
+        while self._fila:
+            entrada = self._fila[0]
+            if entrada.future.done():  # Cancelada enquanto aguardava
+                heapq.heappop(self._fila)
+                continue
+            if self._livres[SLOT_GERAL] > 0:
+                slot = SLOT_GERAL
+            elif entrada.urgente and self._livres[SLOT_URGENTE] > 0:
+                slot = SLOT_URGENTE
+            else:
+                # A fila está ordenada por prioridade: se a primeira não cabe, nenhuma outra cabe
+                break
+            heapq.heappop(self._fila)
+            self._livres[slot] -= 1
+            entrada.future.set_result(slot)
+
+    def _liberar(self, slot: str):
+        self._livres[slot] += 1
+        self._despachar()
+
+    def status(self) -> dict:
+        """Situação atual da fila e métricas de espera/execução por script."""
+        fila = sorted(e for e in getattr(self, '_fila', []) if not e.future.done())
+        return {
+            'vagas_livres': dict(getattr(self, '_livres', {})),
+            'aguardando': [{'script': e.script, 'prioridade': e.prioridade} for e in fila],
+            'scripts': {
+                script: {
+                    'execucoes': m['execucoes'],
+                    'prazos_perdidos': m['prazos_perdidos'],
+                    'espera_fila': _resumo(m['espera']),
+                    'execucao': _resumo(m['execucao']),
+                }
+                for script, m in self._metricas.items()
+            },
+        }
+
+    async def executar(
+        self,
+        script: str,
+        func: Callable[[], Awaitable[Any]],
+        prioridade: int = 5,
+        prazo_s: float | None = None,
+    ) -> Any:
+        """Aguarda uma vaga conforme prioridade/prazo e executa func()."""
+        self._garantir_loop()
+        chegada = time.monotonic()
+        urgente = prioridade <= settings.EXECUTION_PRIORIDADE_URGENTE
+        prazo = chegada + prazo_s if prazo_s is not None else float('inf')
+
+        entrada = _Entrada(prioridade, prazo, next(self._seq), script, urgente, self._loop.create_future())
+        heapq.heappush(self._fila, entrada)
+        self._despachar()
+        try:
+            slot = await entrada.future
+        except asyncio.CancelledError:
+            # A vaga pode ter sido concedida no mesmo tique do cancelamento: devolve-a
+            if entrada.future.done() and not entrada.future.cancelled():
+                self._liberar(entrada.future.result())
+            raise
+
+        inicio = time.monotonic()
+        metricas = self._metricas[script]
+        espera = inicio - chegada
+        metricas['espera'].append(espera)
+        if inicio > prazo:
+            metricas['prazos_perdidos'] += 1
+            logger.warning(f'"{script}" iniciou {inicio - prazo:.0f}s após o prazo ({espera:.0f}s na fila).')
+        elif espera >= 1:
+            logger.info(f'"{script}" aguardou {espera:.1f}s na fila (vaga {slot}).')
+
+        try:
+            return await func()
+        finally:
+            metricas['execucoes'] += 1
+            metricas['execucao'].append(time.monotonic() - inicio)
+            self._liberar(slot)
+
+
+execution_queue = ExecutionQueue()
@@ -10,54 +10,34 @@ na pasta `src/scripts`, utilizando o Playwright para automação web.
 """
 import asyncio
 import argparse
-import importlib.util
-import inspect
 import sys
-import os
-from pathlib import Path
-from typing import Type
-
-from fastapi import FastAPI, HTTPException, Security, Depends
-from fastapi.security import APIKeyHeader
-from playwright.async_api import async_playwright
+from typing import TYPE_CHECKING, Type
 
 from src.config import settings
+from src.execution import execution_queue
 from src.logger import logger
-from src.scripts.base import BaseScraper, ScraperResult
-from src.utils.legalmind_startup import ensure_legalmind_running
+from src.registry import available_scripts, get_scraper_class
+from src.utils.async_io import run_blocking, shutdown_executors
+from src.utils.session_store import probe_session, session_store
+
+# Playwright, FastAPI e os módulos dos scripts são importados sob demanda,
+# para que a CLI (ex: --help, listagem de scripts) inicie rapidamente.
+if TYPE_CHECKING:
+    from src.scripts.base import BaseScraper, ScraperResult
 
 # --- LÓGICA CENTRAL DE EXECUÇÃO ---
 
-def load_scraper_class(script_name: str) -> Type[BaseScraper]:
+def load_scraper_class(script_name: str) -> Type["BaseScraper"]:
     """
-    Carrega dinamicamente a classe do scraper a partir do nome do script.
+    Carrega a classe do scraper a partir do nome do script.
+    Apenas scripts do registro (src/registry.py) são aceitos; a classe fica em cache.
     """
-    script_path = Path("src/scripts") / f"{script_name}.py"
+    return get_scraper_class(script_name)
 
-    # Validação de segurança
-    if not script_path.is_file() or not str(script_path.resolve()).startswith(str(Path("src/scripts").resolve())):
-        raise FileNotFoundError(f"Script '{script_name}.py' não encontrado ou acesso negado.")
-
-    # Carregar o módulo
-    spec = importlib.util.spec_from_file_location(script_name, script_path)
-    if spec is None or spec.loader is None:
-        raise ImportError(f"Não foi possível criar a especificação para o script '{script_name}.py'.")
-    
-    script_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(script_module)
-
-    # Encontrar a classe que herda de BaseScraper
-    for name, obj in inspect.getmembers(script_module):
-        if inspect.isclass(obj) and issubclass(obj, BaseScraper) and obj is not BaseScraper:
-            # Garante que a classe foi definida no próprio script e não importada
-            if obj.__module__ == script_module.__name__:
-                return obj
-    
-    raise AttributeError(f"Nenhuma subclasse de BaseScraper encontrada em '{script_name}.py'.")
-
-async def execute_script(script_name: str, headless: bool = True) -> ScraperResult:
+async def execute_script(script_name: str, headless: bool = True, capturar: bool | None = None) -> "ScraperResult":
     """
     Executa o script solicitado.
+    Com capturar=True grava trace e HAR do Playwright desta execução; com None vale CAPTURE_MODE.
     """
     try:
         ScraperClass = load_scraper_class(script_name)
@@ -66,102 +46,150 @@ async def execute_script(script_name: str, headless: bool = True) -> ScraperResu
         logger.error(f"Erro ao carregar script: {e}")
         raise e
 
-    async with async_playwright() as p:
+    # Aguarda vaga na fila de execução conforme a prioridade e o prazo do script
+    return await execution_queue.executar(
+        script_name,
+        lambda: _executar_no_navegador(scraper, script_name, headless, capturar),
+        prioridade=ScraperClass.PRIORITY,
+        prazo_s=ScraperClass.DEADLINE_S,
+    )
+
+async def _executar_no_navegador(
+    scraper: "BaseScraper", script_name: str, headless: bool, capturar: bool | None = None
+) -> "ScraperResult":
+    """Abre (ou conecta ao) navegador e executa o scraper em uma nova página."""
+    from playwright.async_api import async_playwright
+
+    from src.daemon import conectar_daemon
+    from src.utils.capture import RunCapture, modo_captura
+    from src.utils.metrics import NAVEGADORES_INICIADOS
+    from src.utils.replay import NetworkReplay
+
+    captura = RunCapture(script_name, modo_captura(capturar))
+
+    async with NetworkReplay(script_name, settings.REPLAY_MODE) as gravacao, async_playwright() as p:
+        # Modo daemon: usa o navegador já aberto e logado (abre apenas uma nova aba)
+        # Gravação e replay precisam de um contexto próprio, então usam sempre o navegador local
+        if settings.DAEMON_ATTACH and not gravacao.ativo:
+            browser = await conectar_daemon(p)
+            if browser is not None:
+                try:
+                    context = browser.contexts[0]
+                    # Sessão expirada no daemon: usa o navegador local em vez de disputar o login
+                    # no contexto compartilhado (o daemon o refaz na próxima renovação)
+                    if settings.SESSION_PROBE_ON_START and not await probe_session(context):
+                        logger.info("Sessão do daemon expirada. Abrindo navegador próprio.")
+                    else:
+                        page = await context.new_page()
+                        try:
+                            await captura.iniciar(context, page, compartilhado=True)
+                            result = await _run_scraper(scraper, script_name, page)
+                        finally:
+                            await page.close()
+                        result.capture = captura.concluir(result)
+                        return result
+                finally:
+                    # Encerra apenas a conexão CDP; o navegador do daemon continua aberto
+                    await browser.close()
+
         browser = await p.chromium.launch(
             headless=headless,
             channel=settings.BROWSER_CHANNEL
         )
+        NAVEGADORES_INICIADOS.inc("local")
         # Configura o contexto do navegador (cookies, sessão, etc)
         # Tenta carregar o estado da sessão se existir e define User-Agent para evitar erro 403 Forbidden do Nginx/WAF
         # Viewport de 1920x1080 garante que elementos responsivos (como sidebar e formulários) fiquem visíveis no headless
         viewport_config = {'width': 1920, 'height': 1080}
         user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
         
-        storage_state_path = "state.json"
-        
         context_kwargs = {
             "viewport": viewport_config,
             "user_agent": user_agent,
             "permissions": ["notifications"],
+            **captura.context_kwargs(),
         }
         
-        if os.path.exists(storage_state_path):
-            logger.info(f"Carregando sessão existente de '{storage_state_path}'")
-            context = await browser.new_context(storage_state=storage_state_path, **context_kwargs)
+        # No replay a sessão vem da gravação: a sessão salva não é lida
+        sessao = (
+            None
+            if gravacao.modo == "replay"
+            else await run_blocking(session_store.load, settings.EPROC_LOGIN, settings.EPROC_PERFIL)
+        )
+        if sessao:
+            idade_min = session_store.idade_segundos(sessao) / 60
+            logger.info(f"Carregando sessão salva em {sessao['salvo_em']} ({idade_min:.0f} min)")
+            context = await browser.new_context(storage_state=sessao['storage_state'], **context_kwargs)
+
+            # Descarta cookies expirados antes de abrir a página, para o login partir de uma sessão limpa
+            if settings.SESSION_PROBE_ON_START and not await probe_session(context):
+                logger.info("Sessão salva expirada. Iniciando nova sessão.")
+                await context.close()
+                context = await browser.new_context(**context_kwargs)
         else:
             logger.info("Iniciando nova sessão (sem estado salvo)")
             context = await browser.new_context(**context_kwargs)
-            
+
+        await gravacao.aplicar(context)
         page = await context.new_page()
         try:
-            logger.info(f"Iniciando execução do script '{script_name}'...")
-            result = await scraper.run(page)
-            logger.info(f"Execução concluída. Sucesso: {result.success}")
-            return result
-        except Exception as e:
-            logger.exception(f"Erro crítico durante a execução do script '{script_name}': {e}")
-            return ScraperResult(
-                success=False,
-                message=f"Erro crítico: {str(e)}",
-                execution_time=0.0
-            )
+            await captura.iniciar(context, page)
+            result = await _run_scraper(scraper, script_name, page)
+            await captura.parar_trace()
+            # O HAR só é gravado ao fechar o contexto
+            await context.close()
         finally:
             await browser.close()
+        result.capture = captura.concluir(result)
+        return result
 
-# --- MODO API (FastAPI) ---
-
-app = FastAPI(
-    title='Robô Eproc TJTO',
-    description='API para automatizar a extração de dados do sistema eproc do TJTO.',
-    version='0.3.0',
-)
+async def _run_scraper(scraper: "BaseScraper", script_name: str, page) -> "ScraperResult":
+    """Executa o scraper na página informada, convertendo erros críticos em ScraperResult."""
+    from src.scripts.base import ScraperResult
+    from src.utils.metrics import EXECUCOES_EM_ANDAMENTO, registrar_execucao, registrar_recursos
+    from src.utils.resources import ResourceMonitor, resumo_recursos
+    from src.utils.tracing import PhaseTracer, configurar_opentelemetry, exportar_timings
 
-# --- AUTENTICAÇÃO POR API KEY ---
+    configurar_opentelemetry()
+    # A árvore de tempos começa aqui, sem contar a espera na fila de execução
+    scraper.tracer = PhaseTracer(script_name)
+    monitor = ResourceMonitor() if settings.RESOURCE_MONITOR_ENABLED else None
+    if monitor is not None:
+        monitor.start()
+    EXECUCOES_EM_ANDAMENTO.inc(script_name)
+    try:
+        logger.info(f"Iniciando execução do script '{script_name}'...")
+        result = await scraper.run(page)
+        logger.info(f"Execução concluída. Sucesso: {result.success}")
+    except Exception as e:
+        logger.exception(f"Erro crítico durante a execução do script '{script_name}': {e}")
+        result = ScraperResult(
+            success=False,
+            message=f"Erro crítico: {str(e)}",
+            execution_time=0.0
+        )
+    finally:
+        EXECUCOES_EM_ANDAMENTO.dec(script_name)
 
-api_key_header = APIKeyHeader(name='X-API-Key', auto_error=False)
+    result.timings = scraper.tracer.finalizar()
+    exportar_timings(script_name, result.timings)
+    registrar_execucao(script_name, result.success, result.timings["duracao_s"], result.timings)
 
-async def verify_api_key(api_key: str = Security(api_key_header)):
-    """
-    Dependência de segurança que valida o header X-API-Key.
-    Se API_KEY não estiver configurada no .env, bloqueia todas as requisições.
-    """
-    if not settings.API_KEY:
-        logger.error('API_KEY não configurada no .env. Acesso negado.')
-        raise HTTPException(
-            status_code=500,
-            detail='API_KEY não configurada no servidor. Configure no .env para habilitar o acesso.'
-        )
-    if not api_key or api_key != settings.API_KEY:
-        logger.warning('Tentativa de acesso com API Key inválida.')
-        raise HTTPException(
-            status_code=401,
-            detail='API Key inválida ou não fornecida. Envie o header X-API-Key.'
-        )
-    return api_key
+    if monitor is not None:
+        result.resources = await monitor.stop()
+        registrar_recursos(script_name, result.resources)
+        logger.info(f"Recursos de '{script_name}': {resumo_recursos(result.resources)}")
+    return result
 
+# --- MODO API (FastAPI) ---
 
-@app.get('/', tags=['Root'])
-async def read_root():
-    """Endpoint raiz da API (sem autenticação)."""
-    if not settings.EPROC_LOGIN or not settings.EPROC_SENHA:
-        logger.warning('Credenciais não configuradas no .env')
-        
-    return {'message': 'Bem-vindo à API do Robô Eproc TJTO!', 'env': settings.model_dump(include={'LOG_LEVEL', 'HEADLESS'})}
+def __getattr__(name: str):
+    """Importa a API (FastAPI) apenas quando `src.main.app` é acessado (ex: uvicorn src.main:app)."""
+    if name == "app":
+        from src.api import app
 
-@app.post('/run/{script_name}', response_model=ScraperResult, tags=['Scraper'], dependencies=[Depends(verify_api_key)])
-async def run_script_endpoint(script_name: str):
-    """
-    Endpoint da API para acionar a execução de um script de extração.
-    """
-    try:
-        # Na API, usamos a configuração global para headless, mas podemos forçar False para debug se necessário
-        # Aqui vamos respeitar a config ou forçar False se for debug local
-        result = await execute_script(script_name, headless=settings.HEADLESS)
-        return result
-    except (FileNotFoundError, ImportError, AttributeError) as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro inesperado: {e}")
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- MODO LINHA DE COMANDO (CLI) ---
@@ -169,50 +197,90 @@ async def run_script_endpoint(script_name: str):
 def main_cli():
     """
     Ponto de entrada para a execução do robô via linha de comando.
+    `robo-eproc daemon` inicia o navegador persistente (ver src/daemon.py).
     """
+    if sys.argv[1:2] == ["daemon"]:
+        from src.daemon import daemon_cli
+
+        daemon_cli(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Robô Eproc TJTO - Executor de Scripts via Linha de Comando."
     )
     
-    scripts_dir = Path("src/scripts")
-    # Lista scripts disponíveis na pasta (ignorando __init__.py e base.py)
-    available_scripts = [
-        f.stem for f in scripts_dir.glob("*.py")
-        if f.is_file() and not f.name.startswith("__") and f.name != "base.py"
-    ]
+    # Scripts do registro (independe do diretório atual e não importa os módulos)
+    scripts = available_scripts()
     
     parser.add_argument(
         "--script",
         type=str,
         required=True,
-        choices=available_scripts if available_scripts else None,
-        help=f"Nome do script a ser executado. Disponíveis: {', '.join(available_scripts)}",
+        choices=scripts if scripts else None,
+        help=f"Nome do script a ser executado. Disponíveis: {', '.join(scripts)}",
     )
     parser.add_argument(
         "--show-browser",
         action="store_true",
         help="Exibe a janela do navegador durante a execução.",
     )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Grava trace e HAR do Playwright desta execução (ver CAPTURE_DIR).",
+    )
+    modo_replay = parser.add_mutually_exclusive_group()
+    modo_replay.add_argument(
+        "--record",
+        action="store_true",
+        help="Grava a rede desta execução para reproduzi-la depois com --replay (ver REPLAY_DIR).",
+    )
+    modo_replay.add_argument(
+        "--replay",
+        action="store_true",
+        help="Reproduz a última gravação do script, sem acessar o eproc nem as integrações.",
+    )
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help="Força a sincronização completa (localizadores e relatórios), mesmo sem alterações detectadas.",
+    )
     args = parser.parse_args()
 
+    if args.full_sync:
+        settings.LOCATOR_FORCE_FULL_SYNC = True
+        settings.CONCLUSOS_FORCE_SYNC = True
+    if args.record:
+        settings.REPLAY_MODE = "record"
+    elif args.replay:
+        settings.REPLAY_MODE = "replay"
+
     # Prioridade: Argumento CLI > Configuração .env
     is_headless = not args.show_browser if args.show_browser else settings.HEADLESS
 
-    logger.info("Verificando disponibilidade da LegalMind API...")
-    if not ensure_legalmind_running(verbose=True):
-        logger.warning(
-            "LegalMind API indisponível. O script será executado, "
-            "mas a integração com LegalMind pode falhar."
-        )
+    from src.utils.legalmind_startup import ensure_legalmind_running
+
+    # O replay não aciona o LegalMind
+    if settings.REPLAY_MODE != "replay":
+        logger.info("Verificando disponibilidade da LegalMind API...")
+        if not ensure_legalmind_running(verbose=True):
+            logger.warning(
+                "LegalMind API indisponível. O script será executado, "
+                "mas a integração com LegalMind pode falhar."
+            )
 
     try:
-        result = asyncio.run(execute_script(args.script, headless=is_headless))
+        result = asyncio.run(
+            execute_script(args.script, headless=is_headless, capturar=True if args.trace else None)
+        )
         print("\n--- Resultado da Execução ---")
         print(result.model_dump_json(indent=2))
         print("-----------------------------")
     except Exception as e:
         logger.error(f"Erro fatal na CLI: {e}")
         sys.exit(1)
+    finally:
+        shutdown_executors()
 
 if __name__ == "__main__":
     main_cli()
@@ -0,0 +1,90 @@
+"""
+Registro dos scripts disponíveis em src/scripts.
+
+O manifesto (script -> módulo/classe) é gerado a partir da árvore sintática dos arquivos,
+sem importá-los, de modo que listar os scripts na CLI não carrega Playwright, pandas ou
+as bibliotecas do Google. A classe de um script só é importada quando ele é executado,
+e fica em cache para as execuções seguintes do mesmo processo (ex: API).
+"""
+import ast
+import functools
+import importlib
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / 'scripts'
+SCRIPTS_PACKAGE = 'src.scripts'
+BASE_CLASS = 'BaseScraper'
+
+_classes: dict[str, type] = {}
+
+
+def _nome_base(node: ast.expr) -> str | None:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def gerar_manifesto(scripts_dir: Path = SCRIPTS_DIR) -> dict[str, dict]:
+    """
+    Varre os arquivos de scripts e retorna {script: {'modulo', 'classe'}} para cada script que
+    define uma subclasse concreta de BaseScraper. Classes usadas como base de outros scrapers
+    (ex: LocBaseScraper) não são scripts executáveis e ficam de fora.
+    """
+    classes = {}
+    for path in sorted(scripts_dir.glob('*.py')):
+        if path.name.startswith('__'):
+            continue
+        tree = ast.parse(path.read_text(encoding='utf-8'), filename=str(path))
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                classes[node.name] = {'script': path.stem, 'bases': [_nome_base(b) for b in node.bases]}
+
+    # Propaga a herança (inclusive indireta, entre arquivos) a partir de BaseScraper
+    scrapers = {BASE_CLASS}
+    alterado = True
+    while alterado:
+        alterado = False
+        for nome, info in classes.items():
+            if nome not in scrapers and any(b in scrapers for b in info['bases']):
+                scrapers.add(nome)
+                alterado = True
+
+    bases = {b for nome in scrapers for b in classes.get(nome, {}).get('bases', [])}
+    manifesto = {}
+    for nome in sorted(scrapers - bases - {BASE_CLASS}):
+        script = classes[nome]['script']
+        manifesto.setdefault(script, {'modulo': f'{SCRIPTS_PACKAGE}.{script}', 'classe': nome})
+    return manifesto
+
+
+@functools.cache
+def manifesto() -> dict[str, dict]:
+    return gerar_manifesto()
+
+
+def available_scripts() -> list[str]:
+    """Nomes dos scripts executáveis, em ordem alfabética."""
+    return sorted(manifesto())
+
+
+def get_scraper_class(script_name: str) -> type:
+    """
+    Retorna a classe do scraper do script, importando o módulo apenas na primeira vez.
+    Somente scripts presentes no manifesto podem ser carregados.
+    """
+    if script_name in _classes:
+        return _classes[script_name]
+
+    info = manifesto().get(script_name)
+    if info is None:
+        raise FileNotFoundError(f"Script '{script_name}.py' não encontrado ou acesso negado.")
+
+    module = importlib.import_module(info['modulo'])
+    cls = getattr(module, info['classe'], None)
+    if cls is None:
+        raise AttributeError(f"Nenhuma subclasse de BaseScraper encontrada em '{script_name}.py'.")
+
+    _classes[script_name] = cls
+    return cls
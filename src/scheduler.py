@@ -0,0 +1,267 @@
+"""
+Agendador interno de scripts (substitui o cron/n8n externo).
+
+As tarefas são definidas por expressões cron (minuto hora dia mês dia-da-semana), em
+SCHEDULER_JOBS (.env, JSON: {"loc_urgente": "*/30 7-19 * * 1-5"}) e/ou no arquivo YAML
+SCHEDULER_CONFIG:
+
+    jobs:
+      - script: loc_urgente
+        cron: "*/30 7-19 * * 1-5"
+      - script: relatorio_conclusos
+        cron: "0 7 * * 1-5"
+        max_concorrencia: 1
+
+As execuções rodam no mesmo processo da API, compartilhando a sessão mantida pelo
+session_store/SessionKeeper (e o navegador do daemon, se houver). Tarefas que vencem
+no mesmo minuto são escalonadas em SCHEDULER_STAGGER_S segundos e uma tarefa cuja
+execução anterior ainda não terminou é ignorada. A concorrência entre execuções e as
+prioridades são controladas pela fila de execução (src/execution.py).
+Cada execução é registrada no histórico (JSONL).
+"""
+import asyncio
+import contextlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from src.config import settings
+from src.logger import logger
+
+# Limites de cada campo da expressão cron: (mínimo, máximo)
+_CAMPOS_CRON = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_campo(texto: str, minimo: int, maximo: int) -> set[int]:
+    valores = set()
+    for parte in texto.split(','):
+        faixa, _, passo = parte.partition('/')
+        passo = int(passo) if passo else 1
+        if faixa == '*':
+            inicio, fim = minimo, maximo
+        elif '-' in faixa:
+            inicio, fim = (int(v) for v in faixa.split('-', 1))
+        else:
+            inicio = int(faixa)
+            fim = maximo if passo > 1 else inicio
+        if not (minimo <= inicio <= fim <= maximo) or passo < 1:
+            raise ValueError(f'Valor fora do intervalo {minimo}-{maximo}: "{parte}"')
+        valores.update(range(inicio, fim + 1, passo))
+    return valores
+
+
+class CronExpression:
+    """Expressão cron de 5 campos (minuto hora dia mês dia-da-semana; 0 e 7 = domingo)."""
+
+    def __init__(self, expressao: str):
+        campos = expressao.split()
+        if len(campos) != 5:
+            raise ValueError(f'Expressão cron deve ter 5 campos: "{expressao}"')
+        self.expressao = expressao
+        try:
+            conjuntos = [_parse_campo(c, *limites) for c, limites in zip(campos, _CAMPOS_CRON, strict=True)]
+        except ValueError as e:
+            raise ValueError(f'Expressão cron inválida "{expressao}": {e}') from None
+        self.minutos, self.horas, self.dias, self.meses, dias_semana = conjuntos
+        self.dias_semana = {d % 7 for d in dias_semana}
+        # Como no cron: se dia do mês e dia da semana forem restritos, basta um deles coincidir
+        self._dia_restrito = campos[2] != '*'
+        self._semana_restrita = campos[4] != '*'
+
+    def _dia_confere(self, dt: datetime) -> bool:
+        dia_semana = (dt.weekday() + 1) % 7  # cron: 0 = domingo
+        no_mes = dt.day in self.dias
+        na_semana = dia_semana in self.dias_semana
+        if self._dia_restrito and self._semana_restrita:
+            return no_mes or na_semana
+        return no_mes and na_semana
+
+    def confere(self, dt: datetime) -> bool:
+        return (
+            dt.minute in self.minutos
+            and dt.hour in self.horas
+            and dt.month in self.meses
+            and self._dia_confere(dt)
+        )
+
+    def proxima(self, apos: datetime) -> datetime:
+        """Próximo horário (com precisão de minuto) estritamente posterior a `apos`."""
+        dt = apos.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = dt + timedelta(days=366 * 5)
+        while dt < limite:
+            if dt.month not in self.meses or not self._dia_confere(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.horas:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutos:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f'Expressão cron nunca ocorre: "{self.expressao}"')
+
+
+@dataclass
+class Job:
+    script: str
+    cron: CronExpression
+    max_concorrencia: int = 1
+    em_execucao: int = 0
+    proxima_execucao: datetime | None = None
+    tarefas: set = field(default_factory=set)
+
+
+def carregar_jobs() -> list[Job]:
+    """Monta as tarefas a partir de SCHEDULER_JOBS e do YAML (o YAML prevalece para o mesmo script)."""
+    from src.registry import available_scripts
+
+    definicoes = {script: {'script': script, 'cron': cron} for script, cron in settings.SCHEDULER_JOBS.items()}
+
+    if settings.SCHEDULER_CONFIG and os.path.exists(settings.SCHEDULER_CONFIG):
+        import yaml
+
+        with open(settings.SCHEDULER_CONFIG, encoding='utf-8') as f:
+            conteudo = yaml.safe_load(f) or {}
+        for item in conteudo.get('jobs', []):
+            definicoes[item['script']] = item
+
+    disponiveis = set(available_scripts())
+    jobs = []
+    for script, item in definicoes.items():
+        if script not in disponiveis:
+            logger.warning(f'Agendador: script "{script}" não existe. Tarefa ignorada.')
+            continue
+        try:
+            cron = CronExpression(str(item['cron']))
+        except (KeyError, ValueError) as e:
+            logger.warning(f'Agendador: tarefa "{script}" com cron inválido. Ignorada: {e}')
+            continue
+        jobs.append(Job(script=script, cron=cron, max_concorrencia=int(item.get('max_concorrencia', 1))))
+    return jobs
+
+
+def _historico_path() -> str:
+    return os.path.join(os.getcwd(), settings.STATE_DIR, 'scheduler', 'historico.jsonl')
+
+
+def registrar_historico(registro: dict):
+    """Acrescenta uma execução ao histórico, mantendo no máximo SCHEDULER_HISTORICO_MAX linhas."""
+    path = _historico_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    linhas = ler_historico(limite=None)
+    if len(linhas) > settings.SCHEDULER_HISTORICO_MAX * 2:
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for linha in linhas[-settings.SCHEDULER_HISTORICO_MAX :]:
+                f.write(json.dumps(linha, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, path)
+
+
+def ler_historico(limite: int | None = 50, script: str | None = None) -> list[dict]:
+    """Últimas execuções registradas (da mais antiga para a mais recente)."""
+    path = _historico_path()
+    if not os.path.exists(path):
+        return []
+    registros = []
+    with open(path, encoding='utf-8') as f:
+        for linha in f:
+            with contextlib.suppress(ValueError):
+                registro = json.loads(linha)
+                if script is None or registro.get('script') == script:
+                    registros.append(registro)
+    return registros[-limite:] if limite else registros
+
+
+class Scheduler:
+    def __init__(self, jobs: list[Job], executar=None):
+        self.jobs = jobs
+        self._executar = executar
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name='scheduler')
+            logger.info(f'Agendador iniciado com {len(self.jobs)} tarefa(s).')
+
+    async def stop(self):
+        tarefas = [t for job in self.jobs for t in job.tarefas]
+        if self._task is not None:
+            tarefas.append(self._task)
+            self._task = None
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                'script': job.script,
+                'cron': job.cron.expressao,
+                'max_concorrencia': job.max_concorrencia,
+                'em_execucao': job.em_execucao,
+                'proxima_execucao': job.proxima_execucao.isoformat() if job.proxima_execucao else None,
+            }
+            for job in self.jobs
+        ]
+
+    async def _loop(self):
+        agora = datetime.now()
+        for job in self.jobs:
+            job.proxima_execucao = job.cron.proxima(agora)
+
+        while self.jobs:
+            proxima = min(job.proxima_execucao for job in self.jobs)
+            espera = (proxima - datetime.now()).total_seconds()
+            if espera > 0:
+                # Acorda ao menos a cada minuto para tolerar ajustes no relógio do sistema
+                await asyncio.sleep(min(espera, 60))
+                continue
+
+            vencidas = [job for job in self.jobs if job.proxima_execucao <= proxima]
+            for indice, job in enumerate(vencidas):
+                self.disparar(job, agendado_para=proxima, atraso=indice * settings.SCHEDULER_STAGGER_S)
+                job.proxima_execucao = job.cron.proxima(max(proxima, datetime.now()))
+
+    def disparar(self, job: Job, agendado_para: datetime, atraso: float = 0) -> bool:
+        """Inicia uma execução da tarefa, a menos que ela já esteja no limite de concorrência."""
+        if job.em_execucao >= job.max_concorrencia:
+            logger.warning(f'Agendador: "{job.script}" ainda em execução. Execução de {agendado_para:%H:%M} ignorada.')
+            registrar_historico(
+                {'script': job.script, 'agendado_para': agendado_para.isoformat(timespec='seconds'), 'status': 'ignorado'}
+            )
+            return False
+
+        job.em_execucao += 1
+        tarefa = asyncio.create_task(self._executar_job(job, agendado_para, atraso), name=f'job-{job.script}')
+        job.tarefas.add(tarefa)
+        tarefa.add_done_callback(job.tarefas.discard)
+        return True
+
+    async def _executar_job(self, job: Job, agendado_para: datetime, atraso: float):
+        registro = {'script': job.script, 'agendado_para': agendado_para.isoformat(timespec='seconds')}
+        try:
+            if atraso:
+                await asyncio.sleep(atraso)
+            inicio = datetime.now()
+            registro['inicio'] = inicio.isoformat(timespec='seconds')
+            logger.info(f'Agendador: iniciando "{job.script}".')
+            try:
+                executar = self._executar
+                if executar is None:
+                    from src import main
+
+                    executar = main.execute_script
+                result = await executar(job.script, headless=settings.HEADLESS)
+                registro['status'] = 'sucesso' if result.success else 'falha'
+                registro['mensagem'] = result.message
+            except Exception as e:
+                logger.exception(f'Agendador: erro ao executar "{job.script}": {e}')
+                registro['status'] = 'erro'
+                registro['mensagem'] = str(e)
+            registro['duracao_s'] = round((datetime.now() - inicio).total_seconds(), 2)
+            registrar_historico(registro)
+        finally:
+            job.em_execucao -= 1
@@ -1,11 +1,14 @@
 import time
 import os
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 from playwright.async_api import Page
 from src.scripts.base import BaseScraper, ScraperResult
 from src.config import settings
+from src.utils.async_io import run_blocking, run_cpu_bound
 from src.utils.google_drive import search_file_in_drive, download_from_drive, update_file_in_drive, upload_to_drive
+from src.utils.metrics import LINHAS_EXTRAIDAS
+from src.utils.replay import agora, reproduzindo
+from src.utils.report_processing import mesclar_alvaras
 
 class AlvarasEletronicos(BaseScraper):
     def __init__(self):
@@ -22,6 +25,7 @@ class AlvarasEletronicos(BaseScraper):
             await self.login(page)
 
             # 2. Navegar para a tela de Relatório Alvará Eletrônico via Sidebar
+            self.fase('navegacao')
             self.logger.info("Pesquisando 'Relatório Alvará Eletrônico' na sidebar...")
             
             # Aguarda carregamento após login
@@ -47,6 +51,7 @@ class AlvarasEletronicos(BaseScraper):
             await relatorio_link.click()
             
             # 3. Preencher Filtros do Formulário
+            self.fase('filtros')
             self.logger.info('Aguardando formulário de relatório...')
             
             # Espera explícita pelo seletor do órgão (elemento chave do formulário)
@@ -60,7 +65,7 @@ class AlvarasEletronicos(BaseScraper):
             
             # Calcular a data de ontem (ontem é feriado ou final de semana, o eproc aceita qualquer data válida)
             # O input type="date" espera o formato yyyy-mm-dd
-            ontem_dt = datetime.now() - timedelta(days=1)
+            ontem_dt = agora() - timedelta(days=1)
             data_str = ontem_dt.strftime('%Y-%m-%d')
             self.logger.info(f'Preenchendo datas com: {data_str}')
             
@@ -76,6 +81,7 @@ class AlvarasEletronicos(BaseScraper):
             await page.wait_for_load_state('networkidle')
             
             # 5. Gerar Excel Analítico (Download)
+            self.fase('download_excel')
             # A página possui 2 botões com id="btnexcel" (Sintético e Analítico),
             # por isso usamos get_by_role com o texto exato para evitar ambiguidade
             self.logger.info('Iniciando download do Excel Analítico...')
@@ -94,49 +100,50 @@ class AlvarasEletronicos(BaseScraper):
             self.log_success(f'Relatório baixado em: {novo_arquivo_path}')
 
             # 6. Processar Dados e Sincronizar com Google Drive
-            self.logger.info('Processando arquivo Excel...')
-            # O eproc costuma gerar arquivos com título na primeira linha.
-            # Segundo o usuário, as linhas 1 e 2 são o cabeçalho, então usamos header=1
-            # para que a segunda linha seja considerada o nome das colunas.
-            # Forçamos dtype=str para não perder zeros à esquerda em nrs de processo.
-            df_novo = pd.read_excel(novo_arquivo_path, header=1, dtype=str)
-            
-            if df_novo.empty:
-                self.logger.warning('O relatório baixado está vazio.')
-            
-            self.logger.info(f"Verificando existência de '{self.file_name}' no Drive...")
-            file_id = search_file_in_drive(self.file_name)
+            self.fase('google_drive')
+            if reproduzindo():
+                # O relatório gravado é processado normalmente, mas o Drive não é consultado nem alterado
+                self.logger.info('Modo replay: Google Drive não será acionado.')
+                file_id = None
+            else:
+                self.logger.info(f"Verificando existência de '{self.file_name}' no Drive...")
+                file_id = await run_blocking(search_file_in_drive, self.file_name)
             
             temp_final_path = os.path.join(temp_dir, self.file_name)
+            arquivo_antigo_path = None
             
             if file_id:
                 self.logger.info(f'Arquivo existente encontrado (ID: {file_id}). Baixando para mesclar...')
                 arquivo_antigo_path = os.path.join(temp_dir, 'old_alvara.xlsx')
                 
-                if download_from_drive(file_id, arquivo_antigo_path):
-                    df_antigo = pd.read_excel(arquivo_antigo_path, dtype=str)
-                    
-                    # Alinhar colunas do novo ao antigo para evitar duplicação de cabeçalho
-                    # Usa as colunas do arquivo existente como referência
-                    df_novo_alinhado = pd.DataFrame(df_novo.values, columns=df_antigo.columns[:len(df_novo.columns)])
-                    
-                    # Adicionar dados novos ao final dos dados antigos
-                    df_final = pd.concat([df_antigo, df_novo_alinhado], ignore_index=True)
-                    df_final.to_excel(temp_final_path, index=False)
-                    self.logger.info(f'Dados mesclados. Total de linhas: {len(df_final)}')
-                    
-                    self.logger.info('Atualizando arquivo no Google Drive...')
-                    update_file_in_drive(file_id, temp_final_path)
-                    self.log_success('Planilha atualizada no Google Drive com sucesso!')
-                else:
+                if not await run_blocking(download_from_drive, file_id, arquivo_antigo_path):
                     self.logger.error('Falha ao baixar arquivo antigo do Drive.')
                     # Tenta apenas salvar o novo se falhar download mas já existir no Drive? 
                     # Melhor não sobrescrever um arquivo grande se a conexão falhou.
                     raise Exception('Não foi possível baixar o arquivo base para atualização.')
+            
+            # Leitura, alinhamento de colunas e gravação da planilha em processo separado (CPU intensivo).
+            # O eproc gera o título na primeira linha (header=1) e as colunas são lidas como string
+            # para não perder zeros à esquerda nos números de processo.
+            self.logger.info('Processando arquivo Excel...')
+            contagens = await run_cpu_bound(
+                mesclar_alvaras, novo_arquivo_path, arquivo_antigo_path, temp_final_path
+            )
+            LINHAS_EXTRAIDAS.inc(self.script_name, valor=contagens['novas'])
+            
+            if contagens['novas'] == 0:
+                self.logger.warning('O relatório baixado está vazio.')
+            
+            if reproduzindo():
+                self.logger.info(f"Modo replay: {contagens['total']} linhas processadas, sem upload.")
+            elif file_id:
+                self.logger.info(f"Dados mesclados. Total de linhas: {contagens['total']}")
+                self.logger.info('Atualizando arquivo no Google Drive...')
+                await run_blocking(update_file_in_drive, file_id, temp_final_path)
+                self.log_success('Planilha atualizada no Google Drive com sucesso!')
             else:
                 self.logger.info('Criando novo arquivo no Drive...')
-                df_novo.to_excel(temp_final_path, index=False)
-                upload_to_drive(temp_final_path, self.file_name)
+                await run_blocking(upload_to_drive, temp_final_path, self.file_name)
                 self.log_success('Novo dataset criado no Google Drive!')
 
             # 7. Limpeza e Finalização
@@ -147,8 +154,8 @@ class AlvarasEletronicos(BaseScraper):
             execution_time = time.time() - start_time
             return ScraperResult(
                 success=True,
-                data={'rows_added': len(df_novo)},
-                message=f'Alvarás processados: {len(df_novo)} registros adicionados em {self.file_name}.',
+                data={'rows_added': contagens['novas']},
+                message=f"Alvarás processados: {contagens['novas']} registros adicionados em {self.file_name}.",
                 execution_time=execution_time
             )
 
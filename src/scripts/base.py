@@ -1,20 +1,54 @@
+import time
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import Any, Optional
 from pydantic import BaseModel
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page
 from src.logger import logger
 from src.config import settings
+from src.utils.async_io import run_blocking
+from src.utils.selector_cache import aguardar_primeiro, selector_registry
+from src.utils.session_store import session_store
+from src.utils.metrics import DESAFIOS_2FA, LOGINS
+from src.utils.replay import agora, reproduzindo
+from src.utils.tracing import PhaseTracer, medido
 import pyotp
 
+# Seletores que identificam cada estado da tela durante o login
+SELETOR_FORMULARIO_LOGIN = "#txtUsuario"
+SELETOR_SENHA = "#pwdSenha"
+SELETOR_2FA = "#txtAcessoCodigo, input[placeholder*='Código' i], input[name*='token' i]"
+SELETOR_PAINEL = "#sidebar-searchbox"
+SELETOR_ERRO_LOGIN = "#divInfraExcecao, .infraExcecao, .alert-danger"
+
 class ScraperResult(BaseModel):
     success: bool
     data: Optional[Any] = None
     message: str
     execution_time: float = 0.0
+    timings: Optional[dict] = None  # Árvore de tempos por fase (ver src/utils/tracing.py)
+    resources: Optional[dict] = None  # Pico de memória e CPU por componente (ver src/utils/resources.py)
+    capture: Optional[dict] = None  # Resumo da captura de trace/HAR, se mantida (ver src/utils/capture.py)
 
 class BaseScraper(ABC):
+    # Prioridade na fila de execução (menor = mais urgente) e prazo para iniciar, em segundos
+    PRIORITY: int = 5
+    DEADLINE_S: float | None = None
+
     def __init__(self):
         self.logger = logger
+        self.login_timings: list[dict] = []
+        # Nome do script (arquivo em src/scripts), usado como rótulo das métricas
+        self.script_name = type(self).__module__.rsplit(".", 1)[-1]
+        self.tracer = PhaseTracer(type(self).__name__)
+
+    def span(self, nome: str, **atributos):
+        """Context manager que mede uma fase da execução (pode ser aninhado)."""
+        return self.tracer.span(nome, **atributos)
+
+    def fase(self, nome: str, **atributos):
+        """Inicia uma fase sequencial, que termina quando a próxima fase começar."""
+        return self.tracer.fase(nome, **atributos)
 
     @abstractmethod
     async def run(self, page: Page) -> ScraperResult:
@@ -53,6 +87,7 @@ class BaseScraper(ABC):
             self.log_error(f"Não foi possível clicar em '{selector}'", e)
             raise e
 
+    @medido("home")
     async def navigate_to_home(self, page: Page):
         """
         Navega para a URL base configurada no sistema.
@@ -61,139 +96,123 @@ class BaseScraper(ABC):
         self.logger.info(f"Navegando para a página inicial: {url}")
         await page.goto(url)
 
+    async def _aguardar_proximo_estado(self, page: Page, estados: dict, timeout: int) -> str:
+        """
+        Aguarda em paralelo todos os estados possíveis da tela e retorna o nome do primeiro
+        que ficar visível. Se mais de um aparecer ao mesmo tempo, vale a ordem do dicionário.
+        """
+        alvos = {
+            nome: page.locator(alvo) if isinstance(alvo, str) else alvo for nome, alvo in estados.items()
+        }
+        return await aguardar_primeiro(alvos, timeout)
+
+    async def _transicao(self, page: Page, origem: str, estados: dict) -> str:
+        """Aguarda o próximo estado do login e registra o tempo da transição."""
+        inicio = time.perf_counter()
+        destino = await self._aguardar_proximo_estado(page, estados, settings.LOGIN_ESTADO_TIMEOUT)
+        duracao = time.perf_counter() - inicio
+        self.login_timings.append({"de": origem, "para": destino, "segundos": round(duracao, 3)})
+        self.tracer.registrar(f"{origem}->{destino}", duracao)
+        self.logger.debug(f"Login: {origem} -> {destino} em {duracao:.2f}s")
+        return destino
+
+    @medido("login")
     async def login(self, page: Page):
         """
         Método auxiliar para realizar login no Eproc.
         Pode ser reutilizado pelos scripts que precisam de autenticação.
+
+        Funciona como uma máquina de estados: após cada ação, aguarda o primeiro estado
+        que aparecer entre os possíveis (painel, 2FA, seleção de perfil, erro) em vez de
+        esperar sequencialmente por telas que podem nunca ser exibidas.
         """
         self.logger.info("Iniciando processo de login...")
-        
+        self.login_timings = []
+        inicio = time.perf_counter()
+
         # Garante que estamos na página correta antes de logar
         if page.url == "about:blank":
-             await self.navigate_to_home(page)
+            await self.navigate_to_home(page)
 
-        # TODO: Implementar a lógica real de login do Eproc aqui
-        # Por enquanto, apenas simula o uso das credenciais
-        
         if not settings.EPROC_LOGIN or not settings.EPROC_SENHA:
             self.logger.warning("Credenciais de login não configuradas corretamente.")
             return
 
-        # Aguarda o carregamento da página
-        try:
-            await page.wait_for_load_state("networkidle", timeout=5000)
-        except Exception:
-            pass
-
-        # Verifica se já estamos logados
         try:
-            if "eprocV2_prod_1grau" in page.url and "txtUsuario" not in await page.content():
-                 self.logger.info("Sessão válida detectada. Pulando login.")
-                 return
-        except Exception:
-            pass
+            # Sessão reaproveitada cai direto no painel; caso contrário, aparece o formulário
+            campos_usuario = {
+                "id": page.locator(SELETOR_FORMULARIO_LOGIN),
+                "role": page.get_by_role("textbox", name="Usuário"),
+            }
+            campos_senha = {
+                "id": page.locator(SELETOR_SENHA),
+                "role": page.get_by_role("textbox", name="Senha"),
+            }
+            estado = await self._transicao(
+                page,
+                "inicio",
+                {"painel": SELETOR_PAINEL, "formulario": campos_usuario["id"].or_(campos_usuario["role"])},
+            )
+            if estado == "painel":
+                self.logger.info("Sessão válida detectada. Pulando login.")
+                LOGINS.inc("sessao_valida")
+                return
 
-        try:
             self.logger.info("Tentando realizar login...")
-            # Preenche usuário e senha usando seletores por ID (mais robustos)
-            # Fallback para get_by_role se ID falhar
-            try:
-                await page.locator("#txtUsuario").fill(settings.EPROC_LOGIN)
-            except Exception:
-                self.logger.warning("ID #txtUsuario não encontrado, tentando get_by_role...")
-                await page.get_by_role("textbox", name="Usuário").fill(settings.EPROC_LOGIN)
-
-            try:
-                pwd_field = page.locator("#pwdSenha")
-                await pwd_field.fill(settings.EPROC_SENHA)
-            except Exception:
-                pwd_field = page.get_by_role("textbox", name="Senha")
-                await pwd_field.fill(settings.EPROC_SENHA)
-            
-            # Tenta submeter o formulário pressionando Enter no campo de senha
-            self.logger.info("Submetendo formulário via Enter...")
+            user_field = await selector_registry.localizar("login_usuario", campos_usuario, timeout=5000)
+            await user_field.fill(settings.EPROC_LOGIN)
+            pwd_field = await selector_registry.localizar("login_senha", campos_senha, timeout=5000)
+            await pwd_field.fill(settings.EPROC_SENHA)
             await pwd_field.press("Enter")
-            
-            # --- TRATAMENTO DE 2FA (TOTP) ---
-            # Verifica se apareceu o campo de 2FA
-            try:
-                if settings.EPROC_2FA_SECRET:
-                    self.logger.info("Verificando a necessidade de autenticação de dois fatores (2FA)...")
-
-                    # Seletor combinado que tenta encontrar o campo 2FA de várias maneiras
-                    combined_selector = (
-                        "#txtAcessoCodigo, "
-                        "input[placeholder*='Código' i], "
-                        "input[name*='token' i]"
-                    )
-                    
-                    two_fa_field = page.locator(combined_selector)
-                    
-                    try:
-                        # Espera pelo campo aparecer com um timeout razoável
-                        self.logger.info("Aguardando campo de 2FA...")
-                        await two_fa_field.wait_for(state="visible", timeout=7000)
-                    except PlaywrightTimeoutError:
-                        # Se o campo não aparecer, provavelmente o login ocorreu sem 2FA ou falhou antes
-                        self.logger.debug("Campo de 2FA não foi exibido em 7s. Prosseguindo...")
-                        # A verificação de login ocorrerá naturalmente depois
-
-                    if await two_fa_field.is_visible():
-                        self.logger.info("Campo de 2FA encontrado. Preenchendo código...")
-                        totp = pyotp.TOTP(settings.EPROC_2FA_SECRET)
-                        code = totp.now()
-                        self.logger.debug('Código 2FA gerado com sucesso.')
-                        
-                        await two_fa_field.fill(code)
-                        await two_fa_field.press("Enter")
-                    else:
-                        self.logger.warning("Campo de 2FA não foi encontrado. O login pode ter falhado ou não foi necessário 2FA.")
-
-            except Exception as e:
-                self.logger.debug(f"Nenhum desafio 2FA detectado ou erro ao processar: {e}")
-
-            # --- SELEÇÃO DE PERFIL (Opcional) ---
+            estado = "formulario"
+
+            proximos = {"painel": SELETOR_PAINEL, "erro": SELETOR_ERRO_LOGIN, "2fa": SELETOR_2FA}
             if settings.EPROC_PERFIL:
-                self.logger.info(f"Verificando seleção de perfil: '{settings.EPROC_PERFIL}'...")
-                try:
-                    # Tenta encontrar o perfil em um botão ou link (conforme relato do usuário)
-                    # Usa um seletor combinado para achar qualquer um dos dois
-                    perfil_selector = f"button:has-text('{settings.EPROC_PERFIL}'), a:has-text('{settings.EPROC_PERFIL}')"
-                    
-                    # Aguarda um pouco para ver se a tela de perfil aparece
-                    try:
-                        # Timeout curto para detecção
-                        await page.wait_for_selector(perfil_selector, timeout=1000)
-                        self.logger.info(f"Perfil '{settings.EPROC_PERFIL}' encontrado. Clicando...")
-                        
-                        # Clica e aguarda a navegação acontecer
-                        await page.click(perfil_selector)
-                        await page.wait_for_load_state("networkidle")
-                        
-                    except PlaywrightTimeoutError:
-                        self.logger.debug(f"Perfil '{settings.EPROC_PERFIL}' não encontrado como botão/link ou não foi necessário selecionar.")
-                        # Tenta fallback genérico se não achou
-                        try:
-                             await page.click(f"text={settings.EPROC_PERFIL}", timeout=1000)
-                             await page.wait_for_load_state("networkidle")
-                        except PlaywrightTimeoutError:
-                             pass
-                        
-                except Exception as e:
-                    self.logger.warning(f"Erro ao tentar selecionar perfil: {e}")
-
-            self.logger.info(f"Login realizado para usuário: {settings.EPROC_LOGIN}")
-            
-            # Aguarda a página principal carregar completamente após o fluxo de login/redirecionamento
-            try:
-                await page.wait_for_load_state("networkidle", timeout=15000)
-            except PlaywrightTimeoutError:
-                self.logger.debug("Timeout aguardando networkidle após login. Prosseguindo...")
-
-            # Salva o estado da sessão (cookies, storage) para próximas execuções
-            await page.context.storage_state(path="state.json")
-            self.logger.info("Sessão salva em 'state.json'")
-            
+                perfil = settings.EPROC_PERFIL
+                proximos["perfil"] = page.locator(
+                    f"button:has-text('{perfil}'), a:has-text('{perfil}')"
+                ).or_(page.get_by_text(perfil, exact=True))
+
+            while estado != "painel":
+                estado = await self._transicao(page, estado, proximos)
+
+                if estado == "erro":
+                    mensagem = (await page.locator(SELETOR_ERRO_LOGIN).first.inner_text()).strip()
+                    raise RuntimeError(f"O eproc recusou o login: {mensagem}")
+
+                if estado == "2fa":
+                    if not settings.EPROC_2FA_SECRET:
+                        raise RuntimeError("O eproc solicitou 2FA, mas EPROC_2FA_SECRET não está configurado.")
+                    self.logger.info("Campo de 2FA encontrado. Preenchendo código...")
+                    DESAFIOS_2FA.inc()
+                    two_fa_field = page.locator(SELETOR_2FA).first
+                    # No replay, o código do horário da gravação (mesma requisição gravada)
+                    await two_fa_field.fill(pyotp.TOTP(settings.EPROC_2FA_SECRET).at(agora()))
+                    await two_fa_field.press("Enter")
+                    # O campo continua visível até a navegação; não deve ser detectado de novo
+                    del proximos["2fa"]
+
+                elif estado == "perfil":
+                    self.logger.info(f"Perfil '{settings.EPROC_PERFIL}' encontrado. Clicando...")
+                    await proximos.pop("perfil").first.click()
+
+            LOGINS.inc("sucesso")
+            self.logger.info(
+                f"Login realizado para usuário: {settings.EPROC_LOGIN} "
+                f"em {time.perf_counter() - inicio:.2f}s"
+            )
+
+            # Salva o estado da sessão (cookies, storage) para próximas execuções.
+            # O horário do login evita sobrescrever uma sessão mais recente de outra execução.
+            # No replay os cookies são os da gravação e não substituem a sessão real.
+            if not reproduzindo():
+                obtido_em = datetime.now()
+                storage_state = await page.context.storage_state()
+                await run_blocking(
+                    session_store.save, settings.EPROC_LOGIN, settings.EPROC_PERFIL, storage_state, obtido_em=obtido_em
+                )
+
         except Exception as e:
+            LOGINS.inc("erro")
             self.logger.error(f"Erro ao realizar login: {e}")
             raise e
@@ -1,13 +1,46 @@
 import os
 import re
 import time
+from urllib.parse import urljoin
 
-import pandas as pd
 from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from src.config import settings
 from src.scripts.base import BaseScraper, ScraperResult
+from src.utils.async_io import run_blocking
 from src.utils.google_sheets import salvar_processos_no_sheets
+from src.utils.listing_parser import (
+    CAMPO_PAGINA,
+    REGEX_PROCESSO,
+    encontrar_colunas,
+    extrair_listagem,
+)
+from src.utils.metrics import LINHAS_EXTRAIDAS, LINHAS_SHEETS, REGISTROS_LEGALMIND
+from src.utils.process_detail import buscar_detalhes
+from src.utils.replay import reproduzindo
+from src.utils.selector_cache import selector_registry
+from src.utils.state_store import fingerprint, load_state, save_state
+
+# Busca as páginas da listagem com no máximo `limite` requisições simultâneas. O fetch() da
+# própria página usa os cookies da sessão e passa pelas rotas do contexto (gravação/replay).
+SCRIPT_BUSCAR_PAGINAS = '''
+async ({url, campos, campoPagina, paginas, limite}) => {
+  const htmls = new Array(paginas.length);
+  let proxima = 0;
+  const trabalhador = async () => {
+    while (proxima < paginas.length) {
+      const i = proxima++;
+      const corpo = new URLSearchParams({...campos, [campoPagina]: String(paginas[i])});
+      const resposta = await fetch(url, {method: 'POST', body: corpo, credentials: 'same-origin'});
+      if (!resposta.ok) throw new Error(`HTTP ${resposta.status} na página ${paginas[i] + 1}`);
+      htmls[i] = await resposta.text();
+    }
+  };
+  await Promise.all(Array.from({length: Math.min(limite, paginas.length)}, trabalhador));
+  return htmls;
+}
+'''
 
 
 class LocBaseScraper(BaseScraper):
@@ -23,6 +56,143 @@ class LocBaseScraper(BaseScraper):
         """Retorna o ID da planilha do Google Sheets a partir das configurações."""
         return settings.GOOGLE_SHEETS_SPREADSHEET_ID
 
+    @property
+    def STATE_NAME(self) -> str:
+        """Nome do arquivo de estado (última contagem e impressão digital) deste localizador."""
+        return f'localizador_{self.LOCATOR_NAME}'
+
+    @staticmethod
+    def fingerprint_listagem(processos: list[dict] | None, total_txt: str) -> str | None:
+        """
+        Calcula a impressão digital da listagem completa do localizador (todas as páginas) a
+        partir dos pares (processo, data de inclusão), sem precisar exportar o Excel.
+        Retorna None se a listagem não pôde ser lida por inteiro (quantidade diferente do total
+        exibido), caso em que o atalho "sem alterações" não deve ser usado.
+        """
+        if processos is None or not total_txt.isdigit() or len(processos) != int(total_txt):
+            return None
+        return fingerprint({f'{p["processo"]}|{p["data_inclusao"]}' for p in processos})
+
+    async def ler_listagem_completa(self, page: Page) -> list[dict] | None:
+        """Lê todas as páginas da listagem HTML, ou None se a listagem não puder ser lida."""
+        try:
+            return await self.extrair_listagem_html(page)
+        except Exception as e:
+            self.logger.warning(f'Não foi possível ler a listagem HTML do localizador: {e}')
+            return None
+
+    async def baixar_excel(self, page: Page) -> str:
+        """
+        Baixa a planilha do localizador pelo botão #sbmExcel e devolve o caminho do arquivo.
+        Lança PlaywrightTimeoutError se o download não terminar em LOCATOR_EXCEL_TIMEOUT_S.
+        """
+        self.logger.info('Iniciando o download do arquivo Excel com o relatório de processos...')
+        # O eproc costuma duplicar o botão sbmExcel na barra superior e inferior da página, usamos .first para evitar strict mode
+        btn_excel = page.locator('#sbmExcel').first
+        await btn_excel.wait_for(state='visible', timeout=20000)
+
+        async with page.expect_download(timeout=settings.LOCATOR_EXCEL_TIMEOUT_S * 1000) as download_info:
+            await btn_excel.click(no_wait_after=True)
+
+        download = await download_info.value
+        temp_dir = os.path.join(os.getcwd(), settings.TEMP_DOWNLOAD_DIR)
+        os.makedirs(temp_dir, exist_ok=True)
+        # Remove caracteres especiais inválidos para nomes de arquivos
+        clean_locator_filename = re.sub(r'[\\/*?:"<>|]', '_', self.LOCATOR_NAME)
+        excel_filename = f'temp_{clean_locator_filename.replace(" ", "_")}.xlsx'
+        excel_path = os.path.join(temp_dir, excel_filename)
+        await download.save_as(excel_path)
+        self.logger.info(f'Arquivo Excel baixado com sucesso em: {excel_path}')
+        return excel_path
+
+    async def ler_excel(self, excel_path: str) -> list[dict]:
+        """Lê a planilha exportada e devolve [{'processo', 'data_inclusao'}] (vazia se não houver linhas)."""
+        self.logger.info('Lendo arquivo Excel e processando colunas...')
+
+        import pandas as pd  # Importação tardia: só é necessário após o download
+
+        # Tenta ler com header=1 primeiro, que é o padrão do eproc com linha de sumário informativa
+        df = await run_blocking(pd.read_excel, excel_path, header=1, dtype=str)
+        if df.empty:
+            return []
+
+        # Limpa espaços no nome das colunas
+        df.columns = [c.strip() for c in df.columns]
+
+        # Identifica as colunas necessárias de forma flexível e tolerante a falhas
+        col_processo, col_data = encontrar_colunas(df.columns)
+
+        # Fallback caso a planilha não tenha o sumário no topo (lendo com header=0)
+        if not col_processo or not col_data:
+            self.logger.info(
+                'Colunas esperadas não encontradas com header=1. Tentando com header=0...'
+            )
+            df_fallback = await run_blocking(pd.read_excel, excel_path, header=0, dtype=str)
+            df_fallback.columns = [c.strip() for c in df_fallback.columns]
+            p_fallback, d_fallback = encontrar_colunas(df_fallback.columns)
+            if p_fallback and d_fallback:
+                df = df_fallback
+                col_processo = p_fallback
+                col_data = d_fallback
+                self.logger.info('Colunas encontradas com header=0!')
+
+        if not col_processo:
+            raise KeyError(
+                f'Coluna de "Número Processo" não encontrada nas colunas da planilha: {df.columns.tolist()}'
+            )
+        if not col_data:
+            raise KeyError(
+                f'Coluna de "Inclusão no localizador" não encontrada nas colunas da planilha: {df.columns.tolist()}'
+            )
+
+        self.logger.info(
+            f'Mapeamento das colunas do Excel: Processo -> "{col_processo}", Data Inclusão -> "{col_data}"'
+        )
+
+        # Prepara a lista de dicionários com chaves normalizadas
+        dados_brutos = []
+
+        for _, row_df in df.iterrows():
+            proc_val = str(row_df[col_processo]).strip()
+            data_val = str(row_df[col_data]).strip()
+
+            # Extrai apenas o número do processo limpo por regex
+            match = REGEX_PROCESSO.search(proc_val)
+            if match:
+                dados_brutos.append({'processo': match.group(0), 'data_inclusao': data_val})
+        return dados_brutos
+
+    async def extrair_listagem_html(self, page: Page) -> list[dict]:
+        """
+        Extrai os processos da tabela da listagem já aberta, sem exportar o Excel. Se o
+        localizador tiver várias páginas, as demais são buscadas em paralelo (até
+        LOCATOR_HTML_CONCURRENCY) com fetch() na própria página, reaproveitando a sessão.
+        """
+        self.fase('listagem_html')
+        primeira = await run_blocking(extrair_listagem, await page.content())
+        paginas = [p for p in range(primeira.total_paginas) if p != primeira.pagina_atual]
+        if not paginas:
+            return primeira.processos
+        if primeira.formulario is None:
+            raise RuntimeError('Listagem paginada sem o formulário de paginação do eproc.')
+
+        self.logger.info(f'Listagem com {primeira.total_paginas} páginas. Buscando as demais em paralelo...')
+        with self.span('paginas_html', paginas=len(paginas)):
+            htmls = await page.evaluate(
+                SCRIPT_BUSCAR_PAGINAS,
+                {
+                    'url': urljoin(page.url, primeira.formulario['action']),
+                    'campos': primeira.formulario['campos'],
+                    'campoPagina': CAMPO_PAGINA,
+                    'paginas': paginas,
+                    'limite': settings.LOCATOR_HTML_CONCURRENCY,
+                },
+            )
+        processos = {primeira.pagina_atual: primeira.processos}
+        for pagina, html in zip(paginas, htmls, strict=True):
+            processos[pagina] = (await run_blocking(extrair_listagem, html)).processos
+        return [p for pagina in sorted(processos) for p in processos[pagina]]
+
     async def run(self, page: Page) -> ScraperResult:
         if not self.LOCATOR_NAME:
             raise ValueError('As subclasses de LocBaseScraper devem definir LOCATOR_NAME.')
@@ -46,6 +216,7 @@ class LocBaseScraper(BaseScraper):
                 await page.wait_for_load_state('networkidle')
 
             # 2. Navegação via Sidebar para "Localizadores do órgão"
+            self.fase('navegacao')
             self.logger.info('Pesquisando "Localizadores do órgão" na sidebar...')
             sidebar_search = page.locator('#sidebar-searchbox')
             await sidebar_search.wait_for(state='visible', timeout=30000)
@@ -70,6 +241,7 @@ class LocBaseScraper(BaseScraper):
             await page.wait_for_load_state('networkidle')
 
             # 4. Clicar no link de "Total de processos" correspondente ao localizador de forma resiliente
+            self.fase('total_processos')
             self.logger.info('Localizando o link "Total de processos" na tabela de resultados...')
 
             # Busca todas as linhas da tabela de resultados
@@ -91,29 +263,22 @@ class LocBaseScraper(BaseScraper):
                     f'Linha correspondente ao localizador "{self.LOCATOR_NAME}" não foi encontrada na tabela.'
                 )
 
-            # Busca a âncora de processos de forma ultra resiliente
-            # Prioridade 1: Link que aponte para a ação de listagem de processos do localizador no eproc
-            total_processos_link = target_row.locator(
-                'a[href*="localizador_processos_listar"]'
-            ).first
-
-            # Prioridade 2 (Fallback): Qualquer link cujo texto contenha apenas números (Total de Processos)
-            if not await total_processos_link.is_visible():
-                self.logger.info(
-                    'Link por href de listagem não está visível, tentando fallback por conteúdo numérico...'
+            # Busca a âncora de processos de forma resiliente: link para a ação de listagem do
+            # localizador ou qualquer link cujo texto contenha apenas números (Total de Processos).
+            # As alternativas são disputadas em paralelo; a que funcionou antes tem prioridade.
+            try:
+                total_processos_link = await selector_registry.localizar(
+                    'localizador_total_processos',
+                    {
+                        'href': target_row.locator('a[href*="localizador_processos_listar"]'),
+                        'texto_numerico': target_row.locator('a').filter(has_text=re.compile(r'^\s*\d+\s*$')),
+                    },
+                    timeout=5000,
                 )
-                anchors = await target_row.locator('a').all()
-                for a in anchors:
-                    a_text = (await a.inner_text()).strip()
-                    if a_text.isdigit() and int(a_text) >= 0:
-                        total_processos_link = a
-                        break
-
-            # Verifica se o link foi finalmente encontrado e se é visível
-            if not await total_processos_link.is_visible():
+            except PlaywrightTimeoutError as e:
                 raise Exception(
                     f'Link "Total de processos" não encontrado ou indisponível na linha do localizador "{self.LOCATOR_NAME}".'
-                )
+                ) from e
 
             total_txt = (await total_processos_link.inner_text()).strip()
             self.logger.info(
@@ -122,126 +287,115 @@ class LocBaseScraper(BaseScraper):
             await total_processos_link.click()
             await page.wait_for_load_state('networkidle')
 
-            # 5. Baixar a planilha Excel clicando no botão #sbmExcel de forma resiliente
-            self.logger.info(
-                'Iniciando o download do arquivo Excel com o relatório de processos...'
-            )
-            # O eproc costuma duplicar o botão sbmExcel na barra superior e inferior da página, usamos .first para evitar strict mode
-            btn_excel = page.locator('#sbmExcel').first
-            await btn_excel.wait_for(state='visible', timeout=20000)
-
-            async with page.expect_download(timeout=120000) as download_info:
-                await btn_excel.click(no_wait_after=True)
-
-            download = await download_info.value
-            temp_dir = os.path.join(os.getcwd(), settings.TEMP_DOWNLOAD_DIR)
-            os.makedirs(temp_dir, exist_ok=True)
-            # Remove caracteres especiais inválidos para nomes de arquivos
-            clean_locator_filename = re.sub(r'[\\/*?:"<>|]', '_', self.LOCATOR_NAME)
-            excel_filename = f'temp_{clean_locator_filename.replace(" ", "_")}.xlsx'
-            excel_path = os.path.join(temp_dir, excel_filename)
-            await download.save_as(excel_path)
-            self.logger.info(f'Arquivo Excel baixado com sucesso em: {excel_path}')
+            # 4.1 Atalho "sem alterações": compara a contagem e a impressão digital da listagem
+            # completa (todas as páginas) com a última sincronização completa e pula o Excel e a
+            # leitura do Sheets. Com LOCATOR_FORCE_FULL_SYNC a listagem não é lida aqui.
+            listagem = None
+            fingerprint_atual = None
+            if not settings.LOCATOR_FORCE_FULL_SYNC:
+                listagem = await self.ler_listagem_completa(page)
+                fingerprint_atual = self.fingerprint_listagem(listagem, total_txt)
+                estado_anterior = await run_blocking(load_state, self.STATE_NAME)
+                if (
+                    fingerprint_atual is not None
+                    and estado_anterior.get('total') == total_txt
+                    and estado_anterior.get('fingerprint') == fingerprint_atual
+                ):
+                    self.logger.info(
+                        f'Localizador "{self.LOCATOR_NAME}" sem alterações desde '
+                        f'{estado_anterior.get("atualizado_em")} ({total_txt} processos). Pulando sincronização.'
+                    )
+                    return ScraperResult(
+                        success=True,
+                        data={
+                            'processos_adicionados': 0,
+                            'total_original': int(total_txt) if total_txt.isdigit() else None,
+                            'sem_alteracoes': True,
+                        },
+                        message='Localizador sem alterações desde a última sincronização. Nada a fazer.',
+                        execution_time=time.time() - start_time,
+                    )
+
+            # 5. Extrair os processos: a listagem completa já lida dispensa o Excel; senão, tabela
+            # HTML da listagem ou exportação para Excel (#sbmExcel)
+            dados_brutos = listagem if fingerprint_atual is not None else None
+            if dados_brutos is None and settings.LOCATOR_EXTRACTION_MODE == 'html':
+                dados_brutos = listagem if listagem is not None else await self.extrair_listagem_html(page)
+            elif dados_brutos is None:
+                self.fase('download_excel')
+                try:
+                    excel_path = await self.baixar_excel(page)
+                except PlaywrightTimeoutError:
+                    self.logger.warning(
+                        f'A exportação para Excel não terminou em {settings.LOCATOR_EXCEL_TIMEOUT_S}s. '
+                        'Extraindo os processos da listagem HTML...'
+                    )
+                    dados_brutos = listagem if listagem is not None else await self.extrair_listagem_html(page)
 
             # 6. Ler a planilha Excel baixada usando pandas
-            self.logger.info('Lendo arquivo Excel e processando colunas...')
+            if dados_brutos is None:
+                self.fase('leitura_excel')
+                dados_brutos = await self.ler_excel(excel_path)
 
-            # Tenta ler com header=1 primeiro, que é o padrão do eproc com linha de sumário informativa
-            df = pd.read_excel(excel_path, header=1, dtype=str)
+            # Sem a listagem lida no passo 4.1, a impressão digital vem dos dados extraídos
+            if fingerprint_atual is None:
+                fingerprint_atual = self.fingerprint_listagem(dados_brutos, total_txt)
 
-            if df.empty:
+            if not dados_brutos:
                 self.logger.warning('O relatório baixado está vazio.')
+                await run_blocking(
+                    save_state,
+                    self.STATE_NAME,
+                    {
+                        'localizador': self.LOCATOR_NAME,
+                        'total': total_txt,
+                        'fingerprint': fingerprint_atual,
+                    },
+                )
                 return ScraperResult(
                     success=True,
                     data={'processos_adicionados': 0, 'total_original': 0},
                     message='O relatório do localizador está vazio no eproc.',
                     execution_time=time.time() - start_time,
                 )
-
-            # Limpa espaços no nome das colunas
-            df.columns = [c.strip() for c in df.columns]
-
-            # Identifica as colunas necessárias de forma flexível e tolerante a falhas
-            col_processo = None
-            col_data = None
-
-            def encontrar_colunas(columns):
-                p_col = None
-                d_col = None
-                for c in columns:
-                    c_lower = c.lower()
-                    if (
-                        'número processo' in c_lower
-                        or 'numero processo' in c_lower
-                        or 'processo' in c_lower
-                        or 'pocesso' in c_lower
-                    ):
-                        p_col = c
-                        break
-                for c in columns:
-                    c_lower = c.lower()
-                    if (
-                        'inclusão no localizador' in c_lower
-                        or 'inclusao no localizador' in c_lower
-                        or 'inclusão' in c_lower
-                        or 'inclusao' in c_lower
-                        or 'data' in c_lower
-                    ):
-                        d_col = c
-                        break
-                return p_col, d_col
-
-            col_processo, col_data = encontrar_colunas(df.columns)
-
-            # Fallback caso a planilha não tenha o sumário no topo (lendo com header=0)
-            if not col_processo or not col_data:
-                self.logger.info(
-                    'Colunas esperadas não encontradas com header=1. Tentando com header=0...'
-                )
-                df_fallback = pd.read_excel(excel_path, header=0, dtype=str)
-                df_fallback.columns = [c.strip() for c in df_fallback.columns]
-                p_fallback, d_fallback = encontrar_colunas(df_fallback.columns)
-                if p_fallback and d_fallback:
-                    df = df_fallback
-                    col_processo = p_fallback
-                    col_data = d_fallback
-                    self.logger.info('Colunas encontradas com header=0!')
-
-            if not col_processo:
-                raise KeyError(
-                    f'Coluna de "Número Processo" não encontrada nas colunas da planilha: {df.columns.tolist()}'
-                )
-            if not col_data:
-                raise KeyError(
-                    f'Coluna de "Inclusão no localizador" não encontrada nas colunas da planilha: {df.columns.tolist()}'
-                )
-
-            self.logger.info(
-                f'Mapeamento das colunas do Excel: Processo -> "{col_processo}", Data Inclusão -> "{col_data}"'
-            )
-
-            # Prepara a lista de dicionários com chaves normalizadas
-            dados_brutos = []
-            regex_processo = re.compile(r'\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}')
-
-            for _, row_df in df.iterrows():
-                proc_val = str(row_df[col_processo]).strip()
-                data_val = str(row_df[col_data]).strip()
-
-                # Extrai apenas o número do processo limpo por regex
-                match = regex_processo.search(proc_val)
-                if match:
-                    dados_brutos.append({'processo': match.group(0), 'data_inclusao': data_val})
-
-            self.logger.info(f'Total de processos capturados do Excel: {len(dados_brutos)}')
+            self.logger.info(f'Total de processos capturados: {len(dados_brutos)}')
+            LINHAS_EXTRAIDAS.inc(self.script_name, valor=len(dados_brutos))
 
             # 7. Sincronizar com o Google Sheets aplicando a lógica de unicidade (Processo, Data)
+            self.fase('google_sheets')
             self.logger.info('Iniciando sincronização com a planilha do Google Sheets...')
-            processos_ineditos = salvar_processos_no_sheets(
-                spreadsheet_id=self.SPREADSHEET_ID, dados_processos=dados_brutos
-            )
+            sheets_sincronizado = True
+            if reproduzindo():
+                # Sem inéditos, o LegalMind também não é acionado
+                self.logger.info('Modo replay: Google Sheets e LegalMind não serão acionados.')
+                processos_ineditos = []
+            else:
+                try:
+                    processos_ineditos = await run_blocking(
+                        salvar_processos_no_sheets,
+                        spreadsheet_id=self.SPREADSHEET_ID,
+                        dados_processos=dados_brutos,
+                        propagar_erros=True,
+                    )
+                    LINHAS_SHEETS.inc(self.script_name, valor=len(processos_ineditos))
+                except Exception as se:
+                    # Mantém o comportamento anterior (nada é enviado ao LegalMind),
+                    # mas não registra o estado para que a próxima execução tente de novo
+                    self.logger.error(f'Falha na sincronização com o Google Sheets: {se}')
+                    sheets_sincronizado = False
+                    processos_ineditos = []
+
+            # 8. Enriquecimento opcional dos inéditos com a página de detalhes de cada processo
+            detalhes = {}
+            if settings.ENRICH_PROCESSOS and processos_ineditos:
+                self.fase('detalhes_processos')
+                try:
+                    detalhes = await buscar_detalhes(page, processos_ineditos)
+                except Exception as de:
+                    self.logger.warning(f'Falha ao buscar os detalhes dos processos inéditos, enviando sem eles: {de}')
 
-            # 8. Integração com o LegalMind Core (apenas processos inéditos)
+            # 9. Integração com o LegalMind Core (apenas processos inéditos)
+            self.fase('legalmind')
             integrado = False
             msg_integracao = 'Nenhum processo inédito para integrar.'
 
@@ -252,9 +406,11 @@ class LocBaseScraper(BaseScraper):
                 try:
                     from src.utils.integracao_legalmind import enviar_para_legalmind
 
-                    integrado = enviar_para_legalmind(
-                        processos_ineditos, localizador=self.LOCATOR_NAME
+                    integrado = await enviar_para_legalmind(
+                        processos_ineditos, localizador=self.LOCATOR_NAME, detalhes=detalhes
                     )
+                    if integrado:
+                        REGISTROS_LEGALMIND.inc(self.script_name, valor=len(processos_ineditos))
                     msg_integracao = (
                         'Processos inéditos enviados com sucesso para o LegalMind Core.'
                         if integrado
@@ -270,12 +426,25 @@ class LocBaseScraper(BaseScraper):
                     'Sincronização concluída. Nenhum novo processo para integrar no LegalMind.'
                 )
 
+            # Registra o estado apenas após uma sincronização completa bem-sucedida
+            if sheets_sincronizado and integrado:
+                await run_blocking(
+                    save_state,
+                    self.STATE_NAME,
+                    {
+                        'localizador': self.LOCATOR_NAME,
+                        'total': total_txt,
+                        'fingerprint': fingerprint_atual,
+                    },
+                )
+
             execution_time = time.time() - start_time
             return ScraperResult(
                 success=integrado,
                 data={
                     'processos_adicionados': len(processos_ineditos),
                     'total_original': len(dados_brutos),
+                    'processos_enriquecidos': len(detalhes),
                     'integrado': integrado,
                 },
                 message=f'Extração e gravação em lote finalizada. {msg_integracao}',
@@ -288,7 +457,7 @@ class LocBaseScraper(BaseScraper):
                 success=False, data=None, message=str(e), execution_time=time.time() - start_time
             )
         finally:
-            # 9. Limpar arquivos temporários
+            # 10. Limpar arquivos temporários
             if excel_path and os.path.exists(excel_path):
                 try:
                     os.remove(excel_path)
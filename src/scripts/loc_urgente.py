@@ -2,3 +2,6 @@ from src.scripts.loc_base import LocBaseScraper
 
 class LocUrgente(LocBaseScraper):
     LOCATOR_NAME = "URGENTE"
+    # Resultados relevantes em minutos: fura a fila e pode usar a vaga reservada a urgentes
+    PRIORITY = 0
+    DEADLINE_S = 300
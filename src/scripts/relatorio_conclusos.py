@@ -1,17 +1,45 @@
 import time
 import os
 import shutil
-import pandas as pd
-import requests
+from datetime import date, datetime, timedelta
 import re
 from playwright.async_api import Page
 from src.scripts.base import BaseScraper, ScraperResult
 from src.logger import logger
 from src.config import settings
-from src.utils.integracao_legalmind import enviar_relatorio_concluso
+from src.utils.integracao_legalmind import enviar_delta_relatorio_concluso, enviar_relatorio_concluso
+from src.utils.async_io import run_blocking, run_cpu_bound
 from src.utils.google_drive import upload_to_drive
+from src.utils.metrics import LINHAS_EXTRAIDAS, REGISTROS_LEGALMIND
+from src.utils.pipeline import CheckpointedPipeline
+from src.utils.replay import agora, reproduzindo
+from src.utils.selector_cache import selector_registry
+from src.utils.report_processing import processar_relatorio_conclusos
+from src.utils.snapshot_store import calcular_delta, load_snapshot, save_snapshot
+from src.utils.state_store import load_state, save_state
+from src.utils.tracing import medido
+
+STATE_NAME = 'relatorio_conclusos'
+SNAPSHOT_NAME = 'relatorio_conclusos_snapshot'
+PIPELINE_NAME = 'relatorio_conclusos'
+FASES_PIPELINE = ['download', 'persistir', 'upload_drive', 'enviar_legalmind']
+
+
+def _artefato_disponivel(pipeline: CheckpointedPipeline) -> bool:
+    """Uma run só pode ser retomada se o relatório baixado ainda existir em disco."""
+    artefato = pipeline.artefato('persistir')
+    return bool(artefato) and os.path.exists(artefato["caminho"])
+
+
+def _remover_artefato(caminho: str):
+    if caminho and os.path.exists(caminho):
+        os.remove(caminho)
+
 
 class RelatorioConclusos(BaseScraper):
+    # Exportação longa e sem urgência: cede a vez aos localizadores
+    PRIORITY = 9
+
     def __init__(self):
         super().__init__()
         # Caminho final do CSV (Google Drive)
@@ -19,152 +47,349 @@ class RelatorioConclusos(BaseScraper):
         # Webhook URL
         self.webhook_url = settings.N8N_WEBHOOK_PLANILHA
 
+    def inicio_janela_incremental(self, estado: dict, snapshot: dict) -> date | None:
+        """
+        Retorna a data inicial da janela incremental (dia da última execução bem-sucedida),
+        ou None quando a execução deve ser completa: modo desativado, sem snapshot local,
+        execução forçada ou atualização completa periódica vencida.
+        """
+        if not settings.CONCLUSOS_INCREMENTAL or settings.CONCLUSOS_FORCE_SYNC or not snapshot:
+            return None
+
+        ultima_execucao = estado.get('ultima_execucao')
+        ultima_completa = estado.get('ultima_atualizacao_completa')
+        if not ultima_execucao or not ultima_completa:
+            return None
+
+        limite = datetime.fromisoformat(ultima_completa) + timedelta(days=settings.CONCLUSOS_FULL_REFRESH_DIAS)
+        if agora() >= limite:
+            self.logger.info(
+                f"Última atualização completa em {ultima_completa}. Executando atualização completa periódica."
+            )
+            return None
+
+        return datetime.fromisoformat(ultima_execucao).date()
+
+    async def aplicar_filtro_periodo(self, page: Page, inicio: date, fim: date) -> bool:
+        """
+        Preenche o período no formulário do relatório, se os campos de data existirem.
+        Retorna False quando o formulário não oferece filtro por período.
+        """
+        campo_inicio = page.locator(settings.CONCLUSOS_FILTRO_DATA_INICIO).first
+        campo_fim = page.locator(settings.CONCLUSOS_FILTRO_DATA_FIM).first
+        if not await campo_inicio.count() or not await campo_fim.count():
+            return False
+
+        # input type="date" espera yyyy-mm-dd; campos de texto do eproc usam dd/mm/aaaa
+        formato = '%Y-%m-%d' if await campo_inicio.get_attribute('type') == 'date' else '%d/%m/%Y'
+        await campo_inicio.fill(inicio.strftime(formato))
+        await campo_fim.fill(fim.strftime(formato))
+        return True
+
+    @medido('download')
+    async def baixar_relatorio(self, page: Page, inicio_janela: date | None, destino: str) -> bool:
+        """
+        Navega até o relatório no eproc, gera o Excel e salva em `destino`.
+        Retorna True se o relatório foi restrito ao período incremental.
+        """
+        # 1. Navegar e Logar (Login é tratado na base se não estiver logado)
+        await self.navigate_to_home(page)
+        await self.login(page)
+        
+        # Garante que a página do painel carregou (crucial para estabilidade no modo headless)
+        await page.wait_for_load_state("networkidle")
+        
+        # Verificação de segurança: em modo headless, pode haver falso-positivo no cache
+        if 'txtUsuario' in await page.content():
+            self.logger.warning('Sessão expirada ou redirecionada. Tentando logar novamente...')
+            await self.login(page)
+            await page.wait_for_load_state('networkidle')
+
+        # 2. Navegar para a tela de Relatórios Estatísticos via Sidebar
+        self.logger.info('Pesquisando "Relatórios Estatísticos" na sidebar...')
+        
+        # Preencher o campo de pesquisa da sidebar
+        sidebar_search = page.locator('#sidebar-searchbox')
+        await sidebar_search.wait_for(state='visible', timeout=30000)
+        await sidebar_search.clear()
+        # Busca por "Estatístico" que cobre "Relatórios Estatísticos", "Estatísticos", etc.
+        await sidebar_search.fill('Estatístico')
+        await page.wait_for_timeout(1500)  # Aguarda a filtragem dinâmica do menu (Javascript nativo)
+        await sidebar_search.press('Enter')
+        
+        # Clicar no link resultante
+        self.logger.info('Link filtrado. Localizando e clicando no menu...')
+        
+        # As alternativas são disputadas em paralelo; a que funcionou antes tem prioridade
+        relatorio_link = await selector_registry.localizar(
+            'menu_estatistico',
+            {
+                'texto': page.locator('a:has-text("Estatístico")'),
+                'role': page.get_by_role("link", name=re.compile("Estatístico", re.IGNORECASE)),
+            },
+            timeout=15000,
+        )
+        await relatorio_link.click()
+        
+        # Aguarda carregamento da página de relatórios (iframe ou nova página)
+        await page.wait_for_load_state("domcontentloaded")
+        
+        # 3. Selecionar "Processos Conclusos no 1º Grau - Vara"
+        self.logger.info("Selecionando relatório...")
+        
+        # Seleciona o relatório usando o label fornecido
+        await page.get_by_label("Selecione o Relatório:").select_option(label="Processos Conclusos no 1º Grau - Vara")
+
+        # 3.1 Modo incremental: restringe o relatório ao período desde a última execução
+        incremental = False
+        if inicio_janela is not None:
+            # No replay, o dia da gravação (o formulário precisa ser idêntico ao gravado)
+            hoje = agora().date()
+            incremental = await self.aplicar_filtro_periodo(page, inicio_janela, hoje)
+            if incremental:
+                self.logger.info(
+                    f"Modo incremental: período de {inicio_janela:%d/%m/%Y} a {hoje:%d/%m/%Y}."
+                )
+            else:
+                self.logger.warning(
+                    "Formulário do relatório sem filtro por período. Executando relatório completo."
+                )
+
+        # 4. Clicar em Pesquisar
+        self.logger.info("Pesquisando (Aguardando até 5 min)...")
+        # Aumentando timeout para 5 minutos pois relatórios podem demorar
+        await page.locator("#divInfraBarraComandosSuperior").get_by_role("button", name="Pesquisar").click(timeout=300000)
+        
+        # Aguarda processamento
+        await page.wait_for_timeout(2000)
+
+        # 5. Gerar Excel (Download)
+        self.logger.info("Iniciando processo de download do Excel (aguardando até 10 min)...")
+        
+        # Prepara o listener de download com timeout estendido
+        async with page.expect_download(timeout=600000) as download_info:
+            # Clica no botão "Gerar Excel" sem esperar por navegação,
+            # pois a ação apenas dispara um download em segundo plano.
+            await page.locator("#divInfraBarraComandosSuperior").get_by_role("button", name="Gerar Excel").click(no_wait_after=True)
+        
+        download = await download_info.value
+        await download.save_as(destino)
+        self.logger.info(f"Download concluído: {destino}")
+        return incremental
+
+    @medido('upload_drive')
+    async def enviar_drive(self, caminho: str, incremental: bool) -> str | None:
+        """Faz o upload do relatório para o Google Drive. Lança exceção se o upload falhar."""
+        if not settings.GOOGLE_DRIVE_FOLDER_ID:
+            self.logger.info("GOOGLE_DRIVE_FOLDER_ID não configurado. Pulando upload.")
+            return None
+        if reproduzindo():
+            self.logger.info("Modo replay: upload para o Google Drive ignorado.")
+            return None
+
+        self.logger.info("Enviando planilha para o Google Drive...")
+        prefixo = "Processos_Conclusos_incremental" if incremental else "Processos_Conclusos"
+        nome_arquivo = f"{prefixo}_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
+        file_id = await run_blocking(
+            upload_to_drive,
+            file_path=caminho,
+            file_name=nome_arquivo
+        )
+        if not file_id:
+            raise RuntimeError("Upload para o Google Drive não retornou um ID de arquivo.")
+        self.logger.info(f"Upload para o Drive concluído com sucesso. ID: {file_id}")
+        return file_id
+
+    @medido('legalmind')
+    async def integrar_legalmind(self, records: list[dict], snapshot: dict, incremental: bool) -> dict:
+        """
+        Envia o relatório ao LegalMind (apenas linhas novas/alteradas quando houver snapshot)
+        e atualiza o snapshot local. Lança exceção se o envio falhar.
+        """
+        if reproduzindo():
+            self.logger.info("Modo replay: envio ao LegalMind ignorado.")
+            return {"total": len(records)}
+
+        self.logger.info("Integrando dados com o LegalMind Core...")
+        if incremental:
+            # Mescla a janela ao snapshot completo: processos fora do período são mantidos
+            registros_completos = {
+                numero: item['registro'] for numero, item in snapshot.items()
+            }
+            registros_completos.update({r['numero_processo']: r for r in records})
+            records = list(registros_completos.values())
+
+        resultado = {"total": len(records)}
+        success = None
+        if settings.CONCLUSOS_DELTA_SYNC and snapshot:
+            delta = calcular_delta(snapshot, records)
+            self.logger.info(
+                f"Delta em relação ao snapshot: {len(delta.novos)} novos, "
+                f"{len(delta.alterados)} alterados, {len(delta.removidos)} removidos."
+            )
+            resultado.update({"enviados": len(delta.upserts), "removidos": len(delta.removidos)})
+            if delta.vazio:
+                success = True
+            else:
+                success = await enviar_delta_relatorio_concluso(delta.upserts, delta.removidos)
+
+        # Sem snapshot anterior ou API sem suporte a delta: envio completo
+        if success is None:
+            resultado = {"total": len(records)}
+            success = await enviar_relatorio_concluso(records)
+
+        if not success:
+            raise RuntimeError("Falha no envio do relatório para a API do LegalMind.")
+        REGISTROS_LEGALMIND.inc(self.script_name, valor=resultado.get("enviados", resultado["total"]))
+
+        await run_blocking(save_snapshot, SNAPSHOT_NAME, records)
+        return resultado
+
     async def run(self, page: Page) -> ScraperResult:
         start_time = time.time()
         self.logger.info("Iniciando automação: Relatório de Processos Conclusos")
 
         try:
-            # 1. Navegar e Logar (Login é tratado na base se não estiver logado)
-            await self.navigate_to_home(page)
-            await self.login(page)
-            
-            # Garante que a página do painel carregou (crucial para estabilidade no modo headless)
-            await page.wait_for_load_state("networkidle")
-            
-            # Verificação de segurança: em modo headless, pode haver falso-positivo no cache
-            if 'txtUsuario' in await page.content():
-                self.logger.warning('Sessão expirada ou redirecionada. Tentando logar novamente...')
-                await self.login(page)
-                await page.wait_for_load_state('networkidle')
-
-            # 2. Navegar para a tela de Relatórios Estatísticos via Sidebar
-            self.logger.info('Pesquisando "Relatórios Estatísticos" na sidebar...')
-            
-            # Preencher o campo de pesquisa da sidebar
-            sidebar_search = page.locator('#sidebar-searchbox')
-            await sidebar_search.wait_for(state='visible', timeout=30000)
-            await sidebar_search.clear()
-            # Busca por "Estatístico" que cobre "Relatórios Estatísticos", "Estatísticos", etc.
-            await sidebar_search.fill('Estatístico')
-            await page.wait_for_timeout(1500)  # Aguarda a filtragem dinâmica do menu (Javascript nativo)
-            await sidebar_search.press('Enter')
-            
-            # Clicar no link resultante
-            self.logger.info('Link filtrado. Localizando e clicando no menu...')
-            
-            try:
-                relatorio_link = page.locator('a:has-text("Estatístico")').first
-                await relatorio_link.wait_for(state='visible', timeout=15000)
-                await relatorio_link.click()
-            except Exception:
-                self.logger.warning('Link com texto "Estatístico" não encontrado. Tentando alternativa por role...')
-                fallback_link = page.get_by_role("link", name=re.compile("Estatístico", re.IGNORECASE)).first
-                await fallback_link.wait_for(state='visible', timeout=10000)
-                await fallback_link.click()
-            
-            # Aguarda carregamento da página de relatórios (iframe ou nova página)
-            await page.wait_for_load_state("domcontentloaded")
-            
-            # 3. Selecionar "Processos Conclusos no 1º Grau - Vara"
-            self.logger.info("Selecionando relatório...")
-            
-            # Seleciona o relatório usando o label fornecido
-            await page.get_by_label("Selecione o Relatório:").select_option(label="Processos Conclusos no 1º Grau - Vara")
-
-            # 4. Clicar em Pesquisar
-            self.logger.info("Pesquisando (Aguardando até 5 min)...")
-            # Aumentando timeout para 5 minutos pois relatórios podem demorar
-            await page.locator("#divInfraBarraComandosSuperior").get_by_role("button", name="Pesquisar").click(timeout=300000)
-            
-            # Aguarda processamento
-            await page.wait_for_timeout(2000)
-
-            # 5. Gerar Excel (Download)
-            self.logger.info("Iniciando processo de download do Excel (aguardando até 10 min)...")
-            
-            # Prepara o listener de download com timeout estendido
-            async with page.expect_download(timeout=600000) as download_info:
-                # Clica no botão "Gerar Excel" sem esperar por navegação,
-                # pois a ação apenas dispara um download em segundo plano.
-                await page.locator("#divInfraBarraComandosSuperior").get_by_role("button", name="Gerar Excel").click(no_wait_after=True)
-            
-            download = await download_info.value
-            temp_dir = os.path.join(os.getcwd(), settings.TEMP_DOWNLOAD_DIR)
-            os.makedirs(temp_dir, exist_ok=True)
-            temp_path = os.path.join(temp_dir, "temp_download.xlsx")
-            await download.save_as(temp_path)
-            self.logger.info(f"Download concluído: {temp_path}")
-
-            # 5.1 Fazer upload para Google Drive
-            if settings.GOOGLE_DRIVE_FOLDER_ID:
-                self.logger.info("Enviando planilha para o Google Drive...")
-                try:
-                    nome_arquivo = f"Processos_Conclusos_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"
-                    file_id = upload_to_drive(
-                        file_path=temp_path,
-                        file_name=nome_arquivo
-                    )
-                    self.logger.info(f"Upload para o Drive concluído com sucesso. ID: {file_id}")
-                except Exception as e:
-                    self.logger.error(f"Erro ao enviar para o Google Drive: {e}")
+            estado_anterior = await run_blocking(load_state, STATE_NAME)
+            snapshot = await run_blocking(load_snapshot, SNAPSHOT_NAME)
+
+            # Retoma a última execução incompleta (ex: falha no Drive ou no LegalMind)
+            # reaproveitando o relatório já baixado em vez de gerá-lo novamente no eproc
+            pipeline = await run_blocking(
+                CheckpointedPipeline.retomar_ou_iniciar,
+                PIPELINE_NAME,
+                FASES_PIPELINE,
+                validar=_artefato_disponivel,
+                ao_descartar=lambda p: _remover_artefato((p.artefato('persistir') or {}).get("caminho", "")),
+            )
+            retomada = pipeline.retomada
+
+            # 1-5. Gerar e baixar o relatório no eproc
+            if not pipeline.concluida('persistir'):
+                inicio_execucao = agora()
+                inicio_janela = self.inicio_janela_incremental(estado_anterior, snapshot)
+
+                temp_dir = os.path.join(os.getcwd(), settings.TEMP_DOWNLOAD_DIR)
+                os.makedirs(temp_dir, exist_ok=True)
+                temp_path = os.path.join(temp_dir, "temp_download.xlsx")
+                incremental = await self.baixar_relatorio(page, inicio_janela, temp_path)
+                await run_blocking(pipeline.registrar, 'download', {
+                    "incremental": incremental,
+                    "inicio_execucao": inicio_execucao.isoformat(timespec='seconds'),
+                })
+
+                # 5.1 Persistir o artefato fora da pasta temporária para permitir a retomada
+                artefatos_dir = os.path.join(os.getcwd(), settings.ARTIFACTS_DIR)
+                os.makedirs(artefatos_dir, exist_ok=True)
+                artefato_path = os.path.join(artefatos_dir, f"relatorio_conclusos_{pipeline.run_id}.xlsx")
+                await run_blocking(shutil.move, temp_path, artefato_path)
+                await run_blocking(pipeline.registrar, 'persistir', {"caminho": artefato_path})
             else:
-                self.logger.info("GOOGLE_DRIVE_FOLDER_ID não configurado. Pulando upload.")
+                self.logger.info(
+                    f"Relatório da run {pipeline.run_id} já baixado. Pulando a geração no eproc."
+                )
+
+            incremental = pipeline.artefato('download')["incremental"]
+            inicio_execucao = datetime.fromisoformat(pipeline.artefato('download')["inicio_execucao"])
+            artefato_path = pipeline.artefato('persistir')["caminho"]
+
+            # Leitura do Excel, hash e montagem dos registros em processo separado (CPU intensivo).
+            # No modo incremental o arquivo cobre apenas a janela e o hash não é comparável.
+            with self.span('processamento', incremental=incremental):
+                relatorio = await run_cpu_bound(
+                    processar_relatorio_conclusos, artefato_path, calcular_hash=not incremental
+                )
+            total_relatorio = relatorio["total"]
+            LINHAS_EXTRAIDAS.inc(self.script_name, valor=total_relatorio)
+            hash_atual = relatorio["hash"]
+
+            # 5.2 Compara o conteúdo com o último relatório completo sincronizado
+            if (
+                not incremental
+                and not retomada
+                and not settings.CONCLUSOS_FORCE_SYNC
+                and estado_anterior.get('hash') == hash_atual
+            ):
+                tempo_economizado = estado_anterior.get('duracao_sincronizacao', 0.0)
+                self.logger.info(
+                    f"Relatório idêntico ao sincronizado em {estado_anterior.get('atualizado_em')}. "
+                    f"Pulando upload no Drive e envio ao LegalMind (~{tempo_economizado:.1f}s economizados)."
+                )
+                await run_blocking(pipeline.finalizar, resultado="inalterado")
+                await run_blocking(_remover_artefato, artefato_path)
+                return ScraperResult(
+                    success=True,
+                    data={
+                        "total_processado": total_relatorio,
+                        "relatorio_inalterado": True,
+                        "tempo_economizado": tempo_economizado,
+                    },
+                    message=f"Relatório sem alterações desde a última execução. {total_relatorio} processos; nada enviado.",
+                    execution_time=time.time() - start_time
+                )
 
-            # Carrega o Excel para o DataFrame forçando colunas como string para não perder zeros à esquerda
-            df = pd.read_excel(temp_path, dtype=str)
+            inicio_sincronizacao = time.time()
+
+            # 5.3 Fazer upload para Google Drive
+            try:
+                await pipeline.executar(
+                    'upload_drive', lambda: self.enviar_drive(artefato_path, incremental)
+                )
+            except Exception as e:
+                self.logger.error(f"Erro ao enviar para o Google Drive: {e}")
 
             # 6. Integrar com LegalMind Core
-            self.logger.info("Integrando dados com o LegalMind Core...")
+            resultado_legalmind = {}
+            success = pipeline.concluida('enviar_legalmind')
             try:
-                records = []
-                # Converter DataFrame para lista de dicionários para a API
-                for _, row in df.iterrows():
-                    # Normaliza colunas mapeando do Excel do Eproc (19 colunas)
-                    records.append({
-                        "localidade": str(row.get('LOCALIDADE', '')),
-                        "vara": str(row.get('VARA', '')),
-                        "competencia": str(row.get('COMPETENCIA', '')),
-                        "numero_processo": str(row.get('PROCESSO', row.get('Nº do Processo', ''))),
-                        "data_autuacao": str(row.get('DATA_AUTUACAO', '')),
-                        "classe": str(row.get('CLASSE', '')),
-                        "codigo_classe": str(row.get('CODIGO_CLASSE', '')),
-                        "situacao_classe": str(row.get('SITUACAO_CLASSE', '')),
-                        "assunto": str(row.get('ASSUNTO', '')),
-                        "codigo_assunto": str(row.get('CODIGO_ASSUNTO', '')),
-                        "movimento": str(row.get('MOVIMENTO', '')),
-                        "codigo_movimento": str(row.get('CODIGO_MOVIMENTO', '')),
-                        "data_movimento": str(row.get('DATA_MOVIMENTO', '')),
-                        "dias_conclusos": int(row.get('DIAS', 0)) if pd.notnull(row.get('DIAS')) else 0,
-                        "parte_autora": str(row.get('PARTE_AUTORA', '')),
-                        "parte_reu": str(row.get('PARTE_REU', '')),
-                        "ultimo_localizador": str(row.get('ULTIMO LOCALIZADOR', '')),
-                        "pessoa_situacao_rua": str(row.get('PESSOA EM SITUACAO DE RUA', '')),
-                        "magistrado": str(row.get('MAGISTRADO', '')),
-                        
-                        # Campos Extras/Derivados
-                        "tipo_conclusao": str(row.get('TIPO', '')), # Pode não existir neste layout novo, mas mantemos
-                        "data_conclusao": str(row.get('DATA DA CONCLUSÃO', '')), # Idem
-                        "observacao": str(row.get('OBSERVAÇÕES', '')), # Idem
-                        
-                        "dados_snapshot": row.dropna().to_dict() # Remove NaNs para o JSON
-                    })
-                
-                success = enviar_relatorio_concluso(records)
+                resultado_legalmind = await pipeline.executar(
+                    'enviar_legalmind', lambda: self.integrar_legalmind(relatorio["registros"], snapshot, incremental)
+                )
+                if not success:
+                    # Registra o hash e a data da execução apenas quando o LegalMind recebeu o relatório.
+                    # Após um incremental o hash do último relatório completo deixa de valer.
+                    estado = {
+                        **estado_anterior,
+                        "hash": hash_atual,
+                        "total": resultado_legalmind["total"],
+                        "duracao_sincronizacao": round(time.time() - inicio_sincronizacao, 2),
+                        "ultima_execucao": inicio_execucao.isoformat(timespec='seconds'),
+                    }
+                    if not incremental:
+                        estado["ultima_atualizacao_completa"] = inicio_execucao.isoformat(timespec='seconds')
+                    await run_blocking(save_state, STATE_NAME, estado)
+                success = True
             except Exception as ie:
                 self.logger.error(f"Falha na integração com LegalMind: {ie}")
                 success = False
 
-            # Limpa temporário
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            # Finaliza a run apenas com todas as fases concluídas; senão mantém o artefato para retomada
+            pendente = pipeline.proxima_fase
+            if pendente is None:
+                await run_blocking(pipeline.finalizar, resultado="sincronizado")
+                await run_blocking(_remover_artefato, artefato_path)
+            else:
+                self.logger.warning(
+                    f"Run {pipeline.run_id} incompleta (fase pendente: {pendente}). "
+                    "A próxima execução retomará a partir desta fase."
+                )
 
             execution_time = time.time() - start_time
             msg_status = "Sucesso" if success else "Falha na API"
-            
+
+            data = {
+                "total_processado": total_relatorio,
+                "modo": "incremental" if incremental else "completo",
+                "run_id": pipeline.run_id,
+                **{k: v for k, v in resultado_legalmind.items() if k != "total"},
+            }
+            if pendente is not None:
+                data["fase_pendente"] = pendente
+
             return ScraperResult(
                 success=success,
-                data={"total_processado": len(df)},
-                message=f"Fluxo finalizado: {msg_status}. {len(df)} processos processados.",
+                data=data,
+                message=f"Fluxo finalizado: {msg_status}. {total_relatorio} processos processados.",
                 execution_time=execution_time
             )
 
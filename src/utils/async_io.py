@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from src.config import settings
+
+T = TypeVar('T')
+
+_io_executor: ThreadPoolExecutor | None = None
+_cpu_executor: ProcessPoolExecutor | None = None
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    """Pool de threads limitado, compartilhado pelas chamadas bloqueantes (Google APIs, pandas, disco)."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=settings.IO_THREAD_POOL_SIZE, thread_name_prefix='robo-io'
+        )
+    return _io_executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função bloqueante no pool de threads de I/O sem travar o event loop.
+    O contexto (contextvars, ex: relógio e estado de um replay) é repassado à thread.
+    Ex: await run_blocking(pd.read_excel, caminho, dtype=str)
+    """
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    return await loop.run_in_executor(_get_io_executor(), functools.partial(contexto.run, func, *args, **kwargs))
+
+
+def _get_cpu_executor() -> ProcessPoolExecutor:
+    """
+    Pool de processos para transformações CPU intensivas (pandas/openpyxl), permitindo
+    que execuções simultâneas usem vários núcleos em vez de disputar o GIL com o
+    Playwright e o event loop. Usa 'spawn' para não herdar threads do processo principal.
+    """
+    global _cpu_executor
+    if _cpu_executor is None:
+        _cpu_executor = ProcessPoolExecutor(
+            max_workers=settings.CPU_PROCESS_POOL_SIZE,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _cpu_executor
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função CPU intensiva no pool de processos. A função deve ser definida no
+    nível do módulo e receber/retornar valores serializáveis (prefira caminhos de arquivo
+    a conteúdos grandes). Com CPU_PROCESS_POOL_SIZE=0 executa no pool de threads.
+    """
+    global _cpu_executor
+    if settings.CPU_PROCESS_POOL_SIZE <= 0:
+        return await run_blocking(func, *args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_cpu_executor(), functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        # Um worker morreu (ex: falta de memória): descarta o pool para recriá-lo na próxima chamada
+        _cpu_executor = None
+        raise
+
+
+def shutdown_executors():
+    """Encerra os pools de threads e processos (desligamento da API e fim da CLI)."""
+    global _io_executor, _cpu_executor
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=False, cancel_futures=True)
+        _cpu_executor = None
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=False, cancel_futures=True)
+        _io_executor = None
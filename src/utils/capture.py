@@ -0,0 +1,229 @@
+"""
+Captura de trace e HAR do Playwright para investigar execuções lentas ou com falha.
+
+Modos (CAPTURE_MODE, ou por execução com `--trace` na CLI / `?trace=true` na API):
+- off:    nada é capturado;
+- always: toda execução grava trace e HAR;
+- auto:   toda execução grava, mas a captura só é mantida se a execução falhar ou for mais
+          lenta que o p95 das últimas execuções do mesmo script (após CAPTURE_AUTO_MIN_AMOSTRAS).
+
+Cada captura fica em CAPTURE_DIR/<script>/<data-hora>/ com trace.zip (abrir com
+`playwright show-trace`), rede.har e resumo.json (requisições mais lentas e esperas mais
+longas da árvore de tempos). Somente as CAPTURE_MAX_RUNS capturas mais recentes são mantidas.
+No modo daemon o contexto do navegador já existe, então apenas o trace é gravado (sem HAR).
+"""
+import contextlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+from src.config import settings
+from src.logger import logger
+
+MODOS = ('off', 'always', 'auto')
+HISTORICO_DURACOES = 200
+
+
+def _raiz() -> str:
+    return os.path.join(os.getcwd(), settings.CAPTURE_DIR)
+
+
+def _p95(valores: list[float]) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(0.95 * (len(ordenados) - 1))))]
+
+
+def esperas_mais_longas(timings: dict | None, limite: int) -> list[dict]:
+    """Spans sem filhos (esperas efetivas) mais demorados da árvore de tempos."""
+    folhas = []
+
+    def visitar(no: dict, caminho: str):
+        nome = f'{caminho}/{no["nome"]}' if caminho else no['nome']
+        if no.get('filhos'):
+            for filho in no['filhos']:
+                visitar(filho, nome)
+        elif caminho:
+            folhas.append({'fase': nome, 'duracao_s': no['duracao_s']})
+
+    if timings:
+        visitar(timings, '')
+    return sorted(folhas, key=lambda f: f['duracao_s'], reverse=True)[:limite]
+
+
+def modo_captura(capturar: bool | None) -> str:
+    """Modo da execução: True/False forçam a captura (--trace, ?trace=); None usa CAPTURE_MODE."""
+    if capturar is None:
+        return settings.CAPTURE_MODE
+    return 'always' if capturar else 'off'
+
+
+class RunCapture:
+    def __init__(self, script: str, modo: str):
+        if modo not in MODOS:
+            raise ValueError(f'Modo de captura inválido: "{modo}" (use {", ".join(MODOS)}).')
+        self.script = script
+        self.modo = modo
+        self.diretorio = os.path.join(_raiz(), script, datetime.now().strftime('%Y%m%d-%H%M%S-%f'))
+        self.requisicoes: list[dict] = []
+        self._tracing = None
+
+    @property
+    def ativa(self) -> bool:
+        return self.modo != 'off'
+
+    @property
+    def har_path(self) -> str:
+        return os.path.join(self.diretorio, 'rede.har')
+
+    @property
+    def trace_path(self) -> str:
+        return os.path.join(self.diretorio, 'trace.zip')
+
+    def context_kwargs(self) -> dict:
+        """Argumentos extras de browser.new_context para gravar o HAR (sem o corpo das respostas)."""
+        if not self.ativa:
+            return {}
+        os.makedirs(self.diretorio, exist_ok=True)
+        return {'record_har_path': self.har_path, 'record_har_content': 'omit'}
+
+    def _registrar_requisicao(self, request, falhou: bool = False):
+        timing = request.timing
+        duracao = timing.get('responseEnd', -1)
+        self.requisicoes.append(
+            {
+                'url': request.url,
+                'metodo': request.method,
+                'tipo': request.resource_type,
+                'duracao_ms': round(duracao, 1) if duracao >= 0 else None,
+                'espera_servidor_ms': _intervalo(timing, 'requestStart', 'responseStart'),
+                'falhou': falhou,
+            }
+        )
+
+    async def iniciar(self, context, page, compartilhado: bool = False):
+        """
+        Inicia o trace no contexto e passa a registrar os tempos das requisições da página.
+        Em um contexto compartilhado (daemon) o trace não é iniciado: ele registraria as
+        abas das outras execuções e só um trace pode estar ativo por contexto.
+        """
+        if not self.ativa:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        if not compartilhado:
+            try:
+                await context.tracing.start(screenshots=True, snapshots=True)
+                self._tracing = context.tracing
+            except Exception as e:
+                logger.warning(f'Não foi possível iniciar o trace do Playwright: {e}')
+        page.on('requestfinished', self._registrar_requisicao)
+        page.on('requestfailed', lambda request: self._registrar_requisicao(request, falhou=True))
+
+    async def parar_trace(self):
+        """Encerra o trace gravando trace.zip. Deve ser chamado antes de fechar o contexto."""
+        if self._tracing is not None:
+            try:
+                await self._tracing.stop(path=self.trace_path)
+            except Exception as e:
+                logger.warning(f'Falha ao gravar o trace do Playwright: {e}')
+            self._tracing = None
+
+    def concluir(self, result) -> dict | None:
+        """
+        Decide se a captura é mantida (chamar após fechar o contexto, quando o HAR já foi
+        gravado), grava resumo.json e faz a rotação. Retorna o resumo ou None se descartada.
+        """
+        if not self.ativa:
+            return None
+        duracao = (result.timings or {}).get('duracao_s', result.execution_time)
+        motivo = self._motivo(result.success, duracao)
+        _registrar_duracao(self.script, duracao)
+
+        if motivo is None:
+            shutil.rmtree(self.diretorio, ignore_errors=True)
+            return None
+
+        limite = settings.CAPTURE_TOP_REQUESTS
+        lentas = sorted(
+            (r for r in self.requisicoes if r['duracao_ms'] is not None),
+            key=lambda r: r['duracao_ms'],
+            reverse=True,
+        )
+        resumo = {
+            'script': self.script,
+            'motivo': motivo,
+            'sucesso': result.success,
+            'duracao_s': duracao,
+            'diretorio': os.path.relpath(self.diretorio),
+            'trace': os.path.exists(self.trace_path),
+            'har': os.path.exists(self.har_path),
+            'total_requisicoes': len(self.requisicoes),
+            'requisicoes_falhas': [r['url'] for r in self.requisicoes if r['falhou']][:limite],
+            'requisicoes_lentas': lentas[:limite],
+            'esperas_longas': esperas_mais_longas(result.timings, limite),
+        }
+        with open(os.path.join(self.diretorio, 'resumo.json'), 'w', encoding='utf-8') as f:
+            json.dump(resumo, f, ensure_ascii=False, indent=2)
+
+        logger.info(f'Captura de "{self.script}" mantida ({motivo}) em {resumo["diretorio"]}.')
+        for req in resumo['requisicoes_lentas'][:3]:
+            logger.info(
+                f'Requisição lenta: {req["metodo"]} {req["url"]} ({req["duracao_ms"]:.0f} ms)'
+            )
+        rotacionar_capturas()
+        return resumo
+
+    def _motivo(self, sucesso: bool, duracao: float) -> str | None:
+        if self.modo == 'always':
+            return 'solicitada'
+        if not sucesso:
+            return 'falha'
+        historico = carregar_duracoes().get(self.script, [])
+        if len(historico) < settings.CAPTURE_AUTO_MIN_AMOSTRAS:
+            return None
+        p95 = _p95(historico)
+        return f'lenta: {duracao:.1f}s > p95 {p95:.1f}s' if duracao > p95 else None
+
+
+def _intervalo(timing: dict, inicio: str, fim: str) -> float | None:
+    a, b = timing.get(inicio, -1), timing.get(fim, -1)
+    return round(b - a, 1) if a >= 0 and b >= 0 else None
+
+
+def _duracoes_path() -> str:
+    return os.path.join(_raiz(), 'duracoes.json')
+
+
+def carregar_duracoes() -> dict[str, list[float]]:
+    try:
+        with open(_duracoes_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _registrar_duracao(script: str, duracao: float):
+    """Guarda a duração das execuções com captura ativa, para o cálculo do p95 do modo auto."""
+    duracoes = carregar_duracoes()
+    duracoes[script] = (duracoes.get(script, []) + [round(duracao, 3)])[-HISTORICO_DURACOES:]
+    os.makedirs(_raiz(), exist_ok=True)
+    # Nome temporário único: execuções simultâneas podem registrar durações ao mesmo tempo
+    tmp_path = f'{_duracoes_path()}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(duracoes, f)
+    os.replace(tmp_path, _duracoes_path())
+
+
+def rotacionar_capturas():
+    """Mantém apenas as CAPTURE_MAX_RUNS capturas mais recentes (de todos os scripts)."""
+    raiz = _raiz()
+    capturas = []
+    for script in os.listdir(raiz) if os.path.isdir(raiz) else []:
+        pasta = os.path.join(raiz, script)
+        if os.path.isdir(pasta):
+            capturas += [os.path.join(pasta, nome) for nome in os.listdir(pasta)]
+    capturas.sort(key=os.path.basename, reverse=True)
+    for antiga in capturas[settings.CAPTURE_MAX_RUNS :]:
+        with contextlib.suppress(OSError):
+            shutil.rmtree(antiga)
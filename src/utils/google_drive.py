@@ -1,10 +1,8 @@
 import os
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 from loguru import logger
 
 from src.config import settings
+from src.utils.metrics import medir_google
 
 def get_drive_service():
     """Autentica e retorna o serviço do Google Drive usando Service Account."""
@@ -12,6 +10,10 @@ def get_drive_service():
         logger.warning(f"Credenciais do Google Drive não encontradas no caminho: {settings.GOOGLE_APPLICATION_CREDENTIALS}")
         return None
         
+    # Importação tardia: a biblioteca do Google é pesada e só é necessária ao usar o Drive
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+
     try:
         SCOPES = ['https://www.googleapis.com/auth/drive.file']
         creds = Credentials.from_service_account_file(
@@ -46,16 +48,19 @@ def upload_to_drive(file_path: str, file_name: str = None, mime_type: str = 'app
             'parents': [settings.GOOGLE_DRIVE_FOLDER_ID]
         }
         
+        from googleapiclient.http import MediaFileUpload
+
         media = MediaFileUpload(file_path, mimetype=mime_type, resumable=True)
         
         logger.info(f"Iniciando upload de {file_name} para o Google Drive...")
         
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id',
-            supportsAllDrives=True
-        ).execute()
+        with medir_google('drive', 'upload'):
+            file = service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=True
+            ).execute()
         
         file_id = file.get('id')
         logger.success(f"Upload concluído com sucesso. ID no Google Drive: {file_id}")
@@ -77,9 +82,10 @@ def search_file_in_drive(file_name: str) -> str:
 
     try:
         query = f"name='{file_name}' and '{settings.GOOGLE_DRIVE_FOLDER_ID}' in parents and trashed=false"
-        results = service.files().list(
-            q=query, spaces='drive', fields='files(id, name)', supportsAllDrives=True, includeItemsFromAllDrives=True
-        ).execute()
+        with medir_google('drive', 'buscar'):
+            results = service.files().list(
+                q=query, spaces='drive', fields='files(id, name)', supportsAllDrives=True, includeItemsFromAllDrives=True
+            ).execute()
         
         items = results.get('files', [])
         
@@ -108,7 +114,8 @@ def download_from_drive(file_id: str, dest_path: str) -> bool:
             downloader = MediaIoBaseDownload(fh, request)
             done = False
             while done is False:
-                status, done = downloader.next_chunk()
+                with medir_google('drive', 'download_parte'):
+                    status, done = downloader.next_chunk()
                 
         logger.success(f"Download do arquivo {file_id} concluído em {dest_path}.")
         return True
@@ -128,16 +135,19 @@ def update_file_in_drive(file_id: str, file_path: str, mime_type: str = 'applica
         return None
 
     try:
+        from googleapiclient.http import MediaFileUpload
+
         media = MediaFileUpload(file_path, mimetype=mime_type, resumable=True)
         
         logger.info(f"Iniciando atualização do arquivo {file_id} no Google Drive...")
         
-        file = service.files().update(
-            fileId=file_id,
-            media_body=media,
-            fields='id',
-            supportsAllDrives=True
-        ).execute()
+        with medir_google('drive', 'atualizar'):
+            file = service.files().update(
+                fileId=file_id,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=True
+            ).execute()
         
         logger.success(f"Atualização concluída com sucesso para o ID: {file.get('id')}")
         return file.get('id')
@@ -2,11 +2,10 @@ import os
 import re
 from datetime import datetime
 
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
 from loguru import logger
 
 from src.config import settings
+from src.utils.metrics import medir_google
 
 
 def get_sheets_service():
@@ -21,6 +20,10 @@ def get_sheets_service():
         )
         return None
 
+    # Importação tardia: a biblioteca do Google é pesada e só é necessária ao usar o Sheets
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+
     try:
         # Define os escopos necessários para acessar planilhas e o drive
         SCOPES = [
@@ -87,13 +90,17 @@ def normalizar_data_br(data_str: str) -> str:
     return data_str
 
 
-def salvar_processos_no_sheets(spreadsheet_id: str, dados_processos: list[dict]) -> list[str]:
+def salvar_processos_no_sheets(
+    spreadsheet_id: str, dados_processos: list[dict], propagar_erros: bool = False
+) -> list[str]:
     """
     Mapeia os cabeçalhos 'Processo' and 'Data' na planilha do Google Sheets,
     verifica duplicidade com base na chave composta (Processo, Data_Com_Hora)
     e insere em lote os registros inéditos para capturar múltiplos eventos no mesmo dia.
 
     Retorna a lista de números de processos inéditos adicionados nesta execução.
+    Com propagar_erros=True, falhas do serviço são relançadas em vez de retornar
+    lista vazia, permitindo ao chamador distinguir "nada novo" de "gravação falhou".
     """
     if not dados_processos:
         logger.info('Nenhum processo enviado para salvar no Google Sheets.')
@@ -102,17 +109,20 @@ def salvar_processos_no_sheets(spreadsheet_id: str, dados_processos: list[dict])
     service = get_sheets_service()
     if not service:
         logger.error('Serviço do Google Sheets indisponível. A gravação será ignorada.')
+        if propagar_erros:
+            raise RuntimeError('Serviço do Google Sheets indisponível.')
         return []
 
     try:
         # 1. Identificar cabeçalhos na primeira linha da planilha (primeira aba ativa)
         logger.info('Lendo cabeçalhos da planilha do Google Sheets...')
-        result_header = (
-            service.spreadsheets()
-            .values()
-            .get(spreadsheetId=spreadsheet_id, range='A1:Z1')
-            .execute()
-        )
+        with medir_google('sheets', 'ler_cabecalho'):
+            result_header = (
+                service.spreadsheets()
+                .values()
+                .get(spreadsheetId=spreadsheet_id, range='A1:Z1')
+                .execute()
+            )
 
         rows_header = result_header.get('values', [])
 
@@ -123,12 +133,13 @@ def salvar_processos_no_sheets(spreadsheet_id: str, dados_processos: list[dict])
             # Planilha vazia: inicializa cabeçalho padrão
             logger.info('Planilha vazia. Inicializando cabeçalho padrão ["Processo", "Data"]')
             body_header = {'values': [['Processo', 'Data']]}
-            service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range='A1:B1',
-                valueInputOption='USER_ENTERED',
-                body=body_header,
-            ).execute()
+            with medir_google('sheets', 'gravar_cabecalho'):
+                service.spreadsheets().values().update(
+                    spreadsheetId=spreadsheet_id,
+                    range='A1:B1',
+                    valueInputOption='USER_ENTERED',
+                    body=body_header,
+                ).execute()
             idx_processo = 0
             idx_data = 1
         else:
@@ -163,12 +174,13 @@ def salvar_processos_no_sheets(spreadsheet_id: str, dados_processos: list[dict])
         # 2. Ler todos os dados existentes para desduplicação histórica
         logger.info('Buscando dados existentes na planilha do Google Sheets...')
         # Lê uma faixa ampla da planilha
-        result_data = (
-            service.spreadsheets()
-            .values()
-            .get(spreadsheetId=spreadsheet_id, range='A2:Z100000')
-            .execute()
-        )
+        with medir_google('sheets', 'ler_dados'):
+            result_data = (
+                service.spreadsheets()
+                .values()
+                .get(spreadsheetId=spreadsheet_id, range='A2:Z100000')
+                .execute()
+            )
 
         rows_data = result_data.get('values', [])
 
@@ -228,13 +240,14 @@ def salvar_processos_no_sheets(spreadsheet_id: str, dados_processos: list[dict])
                 f'Gravando {len(novas_linhas)} novos processos inéditos no Google Sheets...'
             )
             body_append = {'values': novas_linhas}
-            service.spreadsheets().values().append(
-                spreadsheetId=spreadsheet_id,
-                range='A:Z',
-                valueInputOption='USER_ENTERED',
-                insertDataOption='INSERT_ROWS',
-                body=body_append,
-            ).execute()
+            with medir_google('sheets', 'inserir_linhas'):
+                service.spreadsheets().values().append(
+                    spreadsheetId=spreadsheet_id,
+                    range='A:Z',
+                    valueInputOption='USER_ENTERED',
+                    insertDataOption='INSERT_ROWS',
+                    body=body_append,
+                ).execute()
             logger.success(
                 f'Gravação realizada com sucesso! {len(novas_linhas)} linhas adicionadas.'
             )
@@ -247,6 +260,8 @@ def salvar_processos_no_sheets(spreadsheet_id: str, dados_processos: list[dict])
 
     except Exception as e:
         logger.error(f'Erro durante a gravação na planilha do Google Sheets: {e}')
+        if propagar_erros:
+            raise
         # Em caso de falha técnica severa na API do Google Sheets, retornamos lista vazia
         # para evitar enviar dados não gravados para o LegalMind (segurança transacional)
         return []
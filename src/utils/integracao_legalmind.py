@@ -1,9 +1,9 @@
-import requests
+import httpx
 import urllib3
 from typing import List
 from src.logger import logger
 from src.config import settings
-from src.utils.legalmind_startup import ensure_legalmind_running
+from src.utils.legalmind_startup import ensure_legalmind_running_async
 
 # Desabilita avisos de segurança para requisições HTTPS sem verificação de certificado
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -22,24 +22,29 @@ def _get_auth_headers() -> dict:
     return {'Authorization': settings.LEGALMIND_API_KEY}
 
 
-def enviar_para_legalmind(processos: List[str], localizador: str = None):
+async def enviar_para_legalmind(
+    processos: list[str], localizador: str = None, detalhes: dict | None = None
+):
     """
     Envia a lista de processos extraídos para a API do LegalMind Core,
     incluindo o nome do localizador como contexto.
+    Com `detalhes` ({processo: {'classe', 'partes', 'eventos'}}), cada registro vai enriquecido
+    com os dados da página do processo no eproc.
     """
     if not settings.LEGALMIND_API_URL:
         logger.warning('LEGALMIND_API_URL não configurada. Pulando integração.')
         return False
 
-    if not ensure_legalmind_running(verbose=False):
+    if not await ensure_legalmind_running_async(verbose=False):
         logger.error('LegalMind não pôde ser iniciado. Abortando envio de processos.')
         return False
 
     url = f"{settings.LEGALMIND_API_URL.rstrip('/')}/processos/importar"
 
     # Prepara o payload como uma lista de objetos
+    detalhes = detalhes or {}
     payload = [
-        {'numero_processo': p, 'localizador': localizador}
+        {'numero_processo': p, 'localizador': localizador, **detalhes.get(p, {})}
         for p in processos
     ]
 
@@ -47,13 +52,8 @@ def enviar_para_legalmind(processos: List[str], localizador: str = None):
         headers = _get_auth_headers()
         logger.info(f'Enviando {len(processos)} processos (Localizador: {localizador}) para o LegalMind: {url}')
 
-        response = requests.post(
-            url,
-            json=payload,
-            headers=headers,
-            timeout=30,
-            verify=False
-        )
+        async with httpx.AsyncClient(verify=False, timeout=30) as client:
+            response = await client.post(url, json=payload, headers=headers)
 
         if response.status_code == 200:
             result = response.json()
@@ -70,7 +70,7 @@ def enviar_para_legalmind(processos: List[str], localizador: str = None):
         return False
 
 
-def enviar_relatorio_concluso(items: List[dict]):
+async def enviar_relatorio_concluso(items: List[dict]):
     """
     Envia os dados detalhados de um relatório de processos conclusos para o LegalMind.
     """
@@ -78,7 +78,7 @@ def enviar_relatorio_concluso(items: List[dict]):
         logger.warning('LEGALMIND_API_URL não configurada. Pulando integração.')
         return False
 
-    if not ensure_legalmind_running(verbose=False):
+    if not await ensure_legalmind_running_async(verbose=False):
         logger.error('LegalMind não pôde ser iniciado. Abortando envio de relatório.')
         return False
 
@@ -88,13 +88,8 @@ def enviar_relatorio_concluso(items: List[dict]):
         headers = _get_auth_headers()
         logger.info(f'Enviando relatório com {len(items)} itens para o LegalMind: {url}')
 
-        response = requests.post(
-            url,
-            json=items,
-            headers=headers,
-            timeout=60,
-            verify=False
-        )
+        async with httpx.AsyncClient(verify=False, timeout=60) as client:
+            response = await client.post(url, json=items, headers=headers)
 
         if response.status_code == 200:
             logger.info('Relatório integrado com sucesso ao LegalMind Core.')
@@ -107,3 +102,48 @@ def enviar_relatorio_concluso(items: List[dict]):
     except Exception as e:
         logger.error(f'Erro na integração do relatório: {e}')
         return False
+
+
+async def enviar_delta_relatorio_concluso(upserts: list[dict], removidos: list[str]) -> bool | None:
+    """
+    Envia apenas as linhas novas/alteradas e a lista de processos que deixaram
+    de estar conclusos desde o último relatório.
+
+    Retorna None se a API do LegalMind não suportar o envio incremental
+    (404/405), para que o chamador recorra ao envio completo.
+    """
+    if not settings.LEGALMIND_API_URL:
+        logger.warning('LEGALMIND_API_URL não configurada. Pulando integração.')
+        return False
+
+    if not await ensure_legalmind_running_async(verbose=False):
+        logger.error('LegalMind não pôde ser iniciado. Abortando envio de relatório.')
+        return False
+
+    url = f"{settings.LEGALMIND_API_URL.rstrip('/')}/relatorios/conclusos/delta"
+    payload = {'upserts': upserts, 'removidos': removidos}
+
+    try:
+        headers = _get_auth_headers()
+        logger.info(
+            f'Enviando delta do relatório ({len(upserts)} novos/alterados, '
+            f'{len(removidos)} removidos) para o LegalMind: {url}'
+        )
+
+        async with httpx.AsyncClient(verify=False, timeout=60) as client:
+            response = await client.post(url, json=payload, headers=headers)
+
+        if response.status_code == 200:
+            logger.info('Delta do relatório integrado com sucesso ao LegalMind Core.')
+            return True
+        elif response.status_code in (404, 405):
+            logger.warning('LegalMind não suporta envio incremental do relatório.')
+            return None
+        else:
+            logger.error(f'Falha ao enviar delta do relatório: {response.status_code} - {response.text}')
+            return False
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f'Erro na integração do delta do relatório: {e}')
+        return False
@@ -1,3 +1,4 @@
+import httpx
 import requests
 import urllib3
 from urllib.parse import urlparse
@@ -26,6 +27,16 @@ def _ping_api() -> bool:
         return False
 
 
+async def _ping_api_async() -> bool:
+    try:
+        health_url = f'{_api_base_url()}/api/v1/health/'
+        async with httpx.AsyncClient(verify=False, timeout=_CONNECT_TIMEOUT) as client:
+            resp = await client.get(health_url)
+        return resp.status_code < 500
+    except Exception:
+        return False
+
+
 def ensure_legalmind_running(verbose: bool = False) -> bool:
     """
     Verifica se a API LegalMind está acessível.
@@ -42,3 +53,19 @@ def ensure_legalmind_running(verbose: bool = False) -> bool:
         )
     return False
 
+
+async def ensure_legalmind_running_async(verbose: bool = False) -> bool:
+    """
+    Versão assíncrona de ensure_legalmind_running, para uso dentro dos scrapers
+    sem bloquear o event loop.
+    """
+    if await _ping_api_async():
+        logger.debug('LegalMind API está ativa e respondendo.')
+        return True
+
+    if verbose:
+        logger.error(
+            f'LegalMind API não responde no endereço configurado: {settings.LEGALMIND_API_URL}. '
+            'Certifique-se de que a API está rodando e que o endereço está correto no arquivo .env.'
+        )
+    return False
@@ -0,0 +1,186 @@
+"""
+Extração dos processos da listagem HTML de um localizador (acao=localizador_processos_listar),
+alternativa à exportação para Excel (#sbmExcel).
+
+Função pura sobre o HTML (sem Playwright), com o parser da biblioteca padrão. Além das linhas
+da tabela, devolve a paginação do framework "infra" do eproc (hdnInfraPaginaAtual e
+selInfraPaginacaoSuperior) e os campos do formulário da listagem, usados para buscar as
+demais páginas.
+"""
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+REGEX_PROCESSO = re.compile(r'\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}')
+
+CAMPO_PAGINA = 'hdnInfraPaginaAtual'
+PREFIXO_SELECT_PAGINACAO = 'selInfraPaginacao'
+
+
+def encontrar_colunas(colunas) -> tuple[str | None, str | None]:
+    """Colunas do número do processo e da data de inclusão no localizador (Excel ou HTML)."""
+    p_col = None
+    d_col = None
+    for c in colunas:
+        c_lower = c.lower()
+        if (
+            'número processo' in c_lower
+            or 'numero processo' in c_lower
+            or 'processo' in c_lower
+            or 'pocesso' in c_lower
+        ):
+            p_col = c
+            break
+    for c in colunas:
+        c_lower = c.lower()
+        if (
+            'inclusão no localizador' in c_lower
+            or 'inclusao no localizador' in c_lower
+            or 'inclusão' in c_lower
+            or 'inclusao' in c_lower
+            or 'data' in c_lower
+        ):
+            d_col = c
+            break
+    return p_col, d_col
+
+
+@dataclass
+class Listagem:
+    # [{'processo': ..., 'data_inclusao': ...}] no mesmo formato da leitura do Excel
+    processos: list[dict] = field(default_factory=list)
+    pagina_atual: int = 0
+    total_paginas: int = 1
+    # Formulário da listagem: {'action', 'method', 'campos'} (None se não houver)
+    formulario: dict | None = None
+
+
+class _Tabela:
+    def __init__(self):
+        self.linhas: list[list[str]] = []
+        self.cabecalho: list[str] | None = None
+        # Linha e célula em leitura (cada tabela tem o seu, para suportar tabelas aninhadas)
+        self.linha: list[str] | None = None
+        self.linha_cabecalho = False
+        self.celula: list[str] | None = None
+
+
+class _ParserListagem(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tabelas: list[_Tabela] = []
+        self.formularios: list[dict] = []
+        self.paginas: list[str] = []
+        self.pagina_selecionada: str | None = None
+        self._pilha_tabelas: list[_Tabela] = []
+        self._form: dict | None = None
+        self._select: dict | None = None
+        self._option: dict | None = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        tabela = self._pilha_tabelas[-1] if self._pilha_tabelas else None
+        if tag == 'table':
+            tabela = _Tabela()
+            self.tabelas.append(tabela)
+            self._pilha_tabelas.append(tabela)
+        elif tag == 'tr' and tabela is not None:
+            tabela.linha = []
+            tabela.linha_cabecalho = False
+        elif tag in ('td', 'th') and tabela is not None and tabela.linha is not None:
+            tabela.celula = []
+            tabela.linha_cabecalho = tabela.linha_cabecalho or tag == 'th'
+        elif tag == 'form':
+            self._form = {
+                'action': attrs.get('action') or '',
+                'method': (attrs.get('method') or 'get').lower(),
+                'campos': {},
+            }
+            self.formularios.append(self._form)
+        elif tag == 'input' and self._form is not None and attrs.get('name'):
+            if attrs.get('type', 'text').lower() not in ('submit', 'button', 'image', 'checkbox', 'radio'):
+                self._form['campos'][attrs['name']] = attrs.get('value') or ''
+        elif tag == 'select':
+            self._select = {'id': attrs.get('id') or attrs.get('name') or '', 'name': attrs.get('name')}
+        elif tag == 'option' and self._select is not None:
+            self._option = {'value': attrs.get('value'), 'selected': 'selected' in attrs, 'texto': []}
+
+    def handle_endtag(self, tag):
+        tabela = self._pilha_tabelas[-1] if self._pilha_tabelas else None
+        if tag in ('td', 'th') and tabela is not None and tabela.celula is not None:
+            tabela.linha.append(' '.join(''.join(tabela.celula).split()))
+            tabela.celula = None
+        elif tag == 'tr' and tabela is not None and tabela.linha is not None:
+            if tabela.linha_cabecalho and tabela.cabecalho is None:
+                tabela.cabecalho = tabela.linha
+            elif tabela.linha:
+                tabela.linhas.append(tabela.linha)
+            tabela.linha = None
+        elif tag == 'table' and tabela is not None:
+            self._pilha_tabelas.pop()
+        elif tag == 'form':
+            self._form = None
+        elif tag == 'option' and self._option is not None:
+            self._fechar_option()
+        elif tag == 'select':
+            if self._option is not None:
+                self._fechar_option()
+            self._select = None
+
+    def _fechar_option(self):
+        valor = self._option['value']
+        if valor is None:
+            valor = ' '.join(''.join(self._option['texto']).split())
+        if self._select['id'].startswith(PREFIXO_SELECT_PAGINACAO):
+            self.paginas.append(valor)
+            if self._option['selected']:
+                self.pagina_selecionada = valor
+        if self._form is not None and self._select['name'] and (
+            self._option['selected'] or self._select['name'] not in self._form['campos']
+        ):
+            self._form['campos'][self._select['name']] = valor
+        self._option = None
+
+    def handle_data(self, data):
+        if self._pilha_tabelas and self._pilha_tabelas[-1].celula is not None:
+            self._pilha_tabelas[-1].celula.append(data)
+        if self._option is not None:
+            self._option['texto'].append(data)
+
+
+def extrair_listagem(html: str) -> Listagem:
+    """
+    Lê as linhas da tabela de processos (a primeira com colunas de processo e de data de
+    inclusão), a página atual, o total de páginas e o formulário usado na paginação.
+    """
+    parser = _ParserListagem()
+    parser.feed(html)
+    parser.close()
+
+    listagem = Listagem()
+    for tabela in parser.tabelas:
+        if not tabela.cabecalho:
+            continue
+        col_processo, col_data = encontrar_colunas(tabela.cabecalho)
+        if col_processo is None or col_data is None:
+            continue
+        i_processo, i_data = tabela.cabecalho.index(col_processo), tabela.cabecalho.index(col_data)
+        for linha in tabela.linhas:
+            if len(linha) <= max(i_processo, i_data):
+                continue
+            match = REGEX_PROCESSO.search(linha[i_processo])
+            if match:
+                listagem.processos.append({'processo': match.group(0), 'data_inclusao': linha[i_data]})
+        break
+
+    for formulario in parser.formularios:
+        if CAMPO_PAGINA in formulario['campos']:
+            listagem.formulario = formulario
+            pagina = formulario['campos'][CAMPO_PAGINA]
+            listagem.pagina_atual = int(pagina) if pagina.isdigit() else 0
+            break
+    if parser.paginas:
+        listagem.total_paginas = len(parser.paginas)
+        if parser.pagina_selecionada is not None and parser.pagina_selecionada.isdigit():
+            listagem.pagina_atual = int(parser.pagina_selecionada)
+    return listagem
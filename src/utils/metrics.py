@@ -0,0 +1,271 @@
+"""
+Métricas de desempenho no formato de exposição do Prometheus (texto, versão 0.0.4).
+
+As métricas ficam em memória no processo da API e são expostas em GET /metrics. A
+implementação é mínima (contador, gauge e histograma com rótulos) para não exigir o
+prometheus_client. Os valores podem ser atualizados a partir de threads (run_blocking).
+"""
+import contextlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Buckets (em segundos) para execuções inteiras, fases e chamadas às APIs do Google
+BUCKETS_EXECUCAO = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+BUCKETS_FASE = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+BUCKETS_API = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Buckets (em MB) para o pico de memória das execuções
+BUCKETS_MEMORIA = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatar_numero(valor: float) -> str:
+    if math.isinf(valor):
+        return '+Inf' if valor > 0 else '-Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+def _rotulos(nomes: tuple, valores: tuple, extra: dict | None = None) -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores, strict=True)]
+    pares += [f'{n}="{_escapar(v)}"' for n, v in (extra or {}).items()]
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class _Metrica(ABC):
+    tipo = ''
+
+    def __init__(self, nome: str, descricao: str, rotulos: tuple = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+        self._series: dict[tuple, object] = {}
+
+    def _chave(self, valores: tuple) -> tuple:
+        if len(valores) != len(self.rotulos):
+            raise ValueError(f'{self.nome} espera os rótulos {self.rotulos}, recebeu {valores}')
+        return tuple(str(v) for v in valores)
+
+    @abstractmethod
+    def _amostras(self) -> list[str]:
+        """Linhas de amostra da métrica, chamada com o lock adquirido."""
+
+    def expor(self) -> str:
+        with self._lock:
+            amostras = self._amostras()
+        cabecalho = [f'# HELP {self.nome} {self.descricao}', f'# TYPE {self.nome} {self.tipo}']
+        return '\n'.join(cabecalho + amostras)
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metrica):
+    tipo = 'counter'
+
+    def inc(self, *rotulos, valor: float = 1):
+        if valor < 0:
+            raise ValueError('Contadores só podem aumentar.')
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def valor(self, *rotulos) -> float:
+        return self._series.get(self._chave(rotulos), 0)
+
+    def _amostras(self):
+        return [
+            f'{self.nome}{_rotulos(self.rotulos, chave)} {_formatar_numero(v)}'
+            for chave, v in sorted(self._series.items())
+        ]
+
+
+class Gauge(Counter):
+    tipo = 'gauge'
+
+    def inc(self, *rotulos, valor: float = 1):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def dec(self, *rotulos, valor: float = 1):
+        self.inc(*rotulos, valor=-valor)
+
+    def set(self, *rotulos, valor: float):
+        with self._lock:
+            self._series[self._chave(rotulos)] = valor
+
+
+class Histogram(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(
+        self, nome: str, descricao: str, rotulos: tuple = (), buckets: tuple = BUCKETS_FASE
+    ):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, *rotulos, valor: float):
+        chave = self._chave(rotulos)
+        with self._lock:
+            serie = self._series.setdefault(
+                chave, {'contagens': [0] * len(self.buckets), 'soma': 0.0, 'total': 0}
+            )
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie['contagens'][i] += 1
+                    break
+            serie['soma'] += valor
+            serie['total'] += 1
+
+    def contagem(self, *rotulos) -> int:
+        serie = self._series.get(self._chave(rotulos))
+        return serie['total'] if serie else 0
+
+    def _amostras(self):
+        linhas = []
+        for chave, serie in sorted(self._series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, serie['contagens'], strict=True):
+                acumulado += contagem
+                le = {'le': _formatar_numero(limite)}
+                linhas.append(f'{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}')
+            linhas.append(
+                f'{self.nome}_sum{_rotulos(self.rotulos, chave)} {_formatar_numero(serie["soma"])}'
+            )
+            linhas.append(f'{self.nome}_count{_rotulos(self.rotulos, chave)} {serie["total"]}')
+        return linhas
+
+
+class Registro:
+    def __init__(self):
+        self._metricas: dict[str, _Metrica] = {}
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nome in self._metricas:
+            raise ValueError(f'Métrica já registrada: {metrica.nome}')
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def expor(self) -> str:
+        return '\n'.join(m.expor() for m in self._metricas.values()) + '\n'
+
+    def limpar(self):
+        for metrica in self._metricas.values():
+            metrica.limpar()
+
+
+registro = Registro()
+
+EXECUCAO_DURACAO = registro.registrar(
+    Histogram(
+        'eproc_execucao_duracao_segundos',
+        'Duração das execuções dos scripts (sem a espera na fila).',
+        ('script', 'resultado'),
+        BUCKETS_EXECUCAO,
+    )
+)
+FASE_DURACAO = registro.registrar(
+    Histogram(
+        'eproc_fase_duracao_segundos',
+        'Duração das fases de primeiro nível de cada script.',
+        ('script', 'fase'),
+    )
+)
+EXECUCOES_EM_ANDAMENTO = registro.registrar(
+    Gauge('eproc_execucoes_em_andamento', 'Execuções de scripts em andamento.', ('script',))
+)
+LINHAS_EXTRAIDAS = registro.registrar(
+    Counter(
+        'eproc_linhas_extraidas_total',
+        'Linhas extraídas das planilhas/relatórios do eproc.',
+        ('script',),
+    )
+)
+LINHAS_SHEETS = registro.registrar(
+    Counter(
+        'eproc_linhas_inseridas_sheets_total',
+        'Linhas inéditas inseridas no Google Sheets.',
+        ('script',),
+    )
+)
+REGISTROS_LEGALMIND = registro.registrar(
+    Counter(
+        'eproc_registros_enviados_legalmind_total',
+        'Registros enviados com sucesso ao LegalMind.',
+        ('script',),
+    )
+)
+NAVEGADORES_INICIADOS = registro.registrar(
+    Counter(
+        'eproc_navegadores_iniciados_total', 'Navegadores abertos ou conexões ao daemon.', ('modo',)
+    )
+)
+LOGINS = registro.registrar(
+    Counter('eproc_logins_total', 'Tentativas de login no eproc, por resultado.', ('resultado',))
+)
+DESAFIOS_2FA = registro.registrar(
+    Counter('eproc_2fa_total', 'Solicitações de código 2FA durante o login.')
+)
+GOOGLE_API_DURACAO = registro.registrar(
+    Histogram(
+        'eproc_google_api_duracao_segundos',
+        'Latência das chamadas às APIs do Google (Drive e Sheets).',
+        ('api', 'operacao', 'resultado'),
+        BUCKETS_API,
+    )
+)
+
+RSS_PICO = registro.registrar(
+    Histogram(
+        'eproc_execucao_rss_pico_mb',
+        'Pico de memória (RSS, MB) de cada execução por componente (python, navegador, workers).',
+        ('script', 'componente'),
+        BUCKETS_MEMORIA,
+    )
+)
+CPU_SEGUNDOS = registro.registrar(
+    Counter(
+        'eproc_execucao_cpu_segundos_total',
+        'Tempo de CPU consumido pelas execuções por componente (python, navegador, workers).',
+        ('script', 'componente'),
+    )
+)
+
+
+def registrar_recursos(script: str, recursos: dict):
+    """Registra o pico de memória e o tempo de CPU de uma execução (ver src/utils/resources.py)."""
+    if recursos.get('execucoes_simultaneas', 1) > 1:
+        # Com execuções sobrepostas os valores são do processo inteiro, não deste script
+        return
+    for componente in ('python', 'navegador', 'workers'):
+        dados = recursos.get(componente)
+        if dados:
+            RSS_PICO.observe(script, componente, valor=dados['rss_pico_mb'])
+            CPU_SEGUNDOS.inc(script, componente, valor=max(dados['cpu_s'], 0))
+
+
+def registrar_execucao(script: str, success: bool, duracao_s: float, timings: dict | None = None):
+    """Registra a duração de uma execução e das suas fases de primeiro nível."""
+    EXECUCAO_DURACAO.observe(script, 'sucesso' if success else 'falha', valor=duracao_s)
+    for fase in (timings or {}).get('filhos', []):
+        FASE_DURACAO.observe(script, fase['nome'], valor=fase['duracao_s'])
+
+
+@contextlib.contextmanager
+def medir_google(api: str, operacao: str):
+    """Mede a latência de uma chamada às APIs do Google (ex: `with medir_google('drive', 'upload'):`)."""
+    inicio = time.perf_counter()
+    resultado = 'erro'
+    try:
+        yield
+        resultado = 'sucesso'
+    finally:
+        GOOGLE_API_DURACAO.observe(api, operacao, resultado, valor=time.perf_counter() - inicio)
@@ -0,0 +1,131 @@
+import os
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from loguru import logger
+
+from src.config import settings
+from src.utils.async_io import run_blocking
+from src.utils.state_store import delete_state, list_states, load_state, save_state
+
+STATUS_EM_ANDAMENTO = 'em_andamento'
+STATUS_CONCLUIDO = 'concluido'
+
+
+class CheckpointedPipeline:
+    """
+    Pipeline em fases com checkpoint em disco por run_id.
+
+    Cada fase concluída é registrada junto com o seu artefato (valor serializável em JSON,
+    ex: caminho do arquivo baixado ou ID no Drive). Uma nova execução do mesmo pipeline
+    retoma a última execução incompleta a partir da primeira fase pendente.
+    Os métodos que leem ou gravam o checkpoint são síncronos: em código assíncrono,
+    chame-os via run_blocking.
+    """
+
+    def __init__(self, nome: str, fases: list[str], run_id: str | None = None, dados: dict | None = None):
+        self.nome = nome
+        self.fases = fases
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self.dados = dados or {'status': STATUS_EM_ANDAMENTO, 'criado_em': datetime.now().isoformat(), 'fases': {}}
+
+    @property
+    def _subdir(self) -> str:
+        return os.path.join('pipelines', self.nome)
+
+    @property
+    def retomada(self) -> bool:
+        """Indica se esta execução retoma um checkpoint anterior."""
+        return bool(self.dados['fases'])
+
+    @property
+    def proxima_fase(self) -> str | None:
+        """Primeira fase ainda não concluída (None se todas estiverem concluídas)."""
+        return next((f for f in self.fases if not self.concluida(f)), None)
+
+    @classmethod
+    def retomar_ou_iniciar(
+        cls,
+        nome: str,
+        fases: list[str],
+        validar: Callable[['CheckpointedPipeline'], bool] | None = None,
+        ao_descartar: Callable[['CheckpointedPipeline'], None] | None = None,
+    ) -> 'CheckpointedPipeline':
+        """
+        Retorna a execução incompleta mais recente do pipeline, se ainda estiver dentro de
+        PIPELINE_RETOMADA_MAX_HORAS, não tiver esgotado PIPELINE_MAX_TENTATIVAS e passar na
+        validação opcional (ex: artefato ainda existe). Caso contrário, inicia uma nova execução.
+        Checkpoints descartados são removidos (ao_descartar permite limpar seus artefatos).
+        """
+        subdir = os.path.join('pipelines', nome)
+        limite = datetime.now() - timedelta(hours=settings.PIPELINE_RETOMADA_MAX_HORAS)
+
+        for run_id in reversed(list_states(subdir)):
+            dados = load_state(run_id, subdir)
+            if dados.get('status') != STATUS_EM_ANDAMENTO:
+                continue
+
+            pipeline = cls(nome, fases, run_id=run_id, dados=dados)
+            criado_em = datetime.fromisoformat(dados.get('criado_em', '1970-01-01T00:00:00'))
+            if (
+                criado_em >= limite
+                and dados.get('tentativas', 0) < settings.PIPELINE_MAX_TENTATIVAS
+                and (validar is None or validar(pipeline))
+            ):
+                dados['tentativas'] = dados.get('tentativas', 0) + 1
+                pipeline._salvar()
+                logger.info(
+                    f'Retomando pipeline "{nome}" (run {run_id}) a partir da fase "{pipeline.proxima_fase}".'
+                )
+                return pipeline
+
+            logger.info(f'Descartando checkpoint expirado ou inválido do pipeline "{nome}" (run {run_id}).')
+            if ao_descartar is not None:
+                ao_descartar(pipeline)
+            delete_state(run_id, subdir)
+
+        return cls(nome, fases)
+
+    def concluida(self, fase: str) -> bool:
+        return fase in self.dados['fases']
+
+    def artefato(self, fase: str, default: Any = None) -> Any:
+        return self.dados['fases'].get(fase, {}).get('artefato', default)
+
+    def registrar(self, fase: str, artefato: Any = None):
+        """Marca a fase como concluída e persiste o checkpoint."""
+        if fase not in self.fases:
+            raise ValueError(f'Fase desconhecida no pipeline "{self.nome}": {fase}')
+        self.dados['fases'][fase] = {'artefato': artefato, 'concluida_em': datetime.now().isoformat()}
+        self._salvar()
+        logger.debug(f'Pipeline "{self.nome}" (run {self.run_id}): fase "{fase}" concluída.')
+
+    async def executar(self, fase: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa a fase se ainda não tiver sido concluída e registra o artefato retornado.
+        Se já estiver concluída (execução retomada), retorna o artefato salvo sem executar.
+        """
+        if self.concluida(fase):
+            logger.info(f'Fase "{fase}" já concluída na run {self.run_id}. Reaproveitando resultado.')
+            return self.artefato(fase)
+
+        artefato = await func()
+        await run_blocking(self.registrar, fase, artefato)
+        return artefato
+
+    def finalizar(self, **extras):
+        """Marca a execução como concluída; ela não será mais retomada."""
+        self.dados.update(extras)
+        self.dados['status'] = STATUS_CONCLUIDO
+        self._salvar()
+        self._limpar_antigos()
+
+    def _salvar(self):
+        save_state(self.run_id, self.dados, self._subdir)
+
+    def _limpar_antigos(self):
+        """Mantém apenas os checkpoints mais recentes como histórico."""
+        antigos = list_states(self._subdir)[: -settings.PIPELINE_HISTORICO_MAX]
+        for run_id in antigos:
+            delete_state(run_id, self._subdir)
@@ -0,0 +1,252 @@
+"""
+Enriquecimento dos processos inéditos com a página de detalhes do eproc
+(acao=processo_selecionar): classe, partes e últimos eventos.
+
+As páginas são buscadas com fetch() na página já autenticada, com no máximo
+ENRICH_CONCURRENCY requisições simultâneas, preferindo os links exibidos na listagem (que
+trazem a assinatura do eproc). Cada detalhe fica em cache em STATE_DIR/detalhes por
+ENRICH_CACHE_TTL_HORAS, para que reexecuções não visitem de novo os mesmos processos.
+"""
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+
+from src.config import settings
+from src.logger import logger
+from src.utils.async_io import run_blocking
+from src.utils.state_store import delete_state, list_states, load_state, save_state, state_saved_at
+
+SUBDIR_CACHE = 'detalhes'
+URL_DETALHE = 'controlador.php?acao=processo_selecionar&num_processo='
+
+# Busca os detalhes com no máximo `limite` requisições simultâneas. Falhas individuais
+# devolvem null, sem interromper as demais.
+SCRIPT_BUSCAR_DETALHES = '''
+async ({processos, urlDetalhe, limite}) => {
+  const links = {};
+  for (const a of document.querySelectorAll('a[href*="acao=processo_selecionar"]')) {
+    const digitos = a.textContent.replace(/\\D/g, '');
+    if (digitos) links[digitos] = a.href;
+  }
+  const htmls = new Array(processos.length).fill(null);
+  let proxima = 0;
+  const trabalhador = async () => {
+    while (proxima < processos.length) {
+      const i = proxima++;
+      const digitos = processos[i].replace(/\\D/g, '');
+      const url = links[digitos] || new URL(urlDetalhe + digitos, location.href).href;
+      try {
+        const resposta = await fetch(url, {credentials: 'same-origin'});
+        if (resposta.ok) htmls[i] = await resposta.text();
+      } catch (e) {}
+    }
+  };
+  await Promise.all(Array.from({length: Math.min(limite, processos.length)}, trabalhador));
+  return htmls;
+}
+'''
+
+TABELA_PARTES = 'tblPartesERepresentantes'
+TABELA_EVENTOS = 'tblEventos'
+
+
+def _texto(partes: list[str]) -> str:
+    return ' '.join(''.join(partes).split())
+
+
+class _ParserDetalhe(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.classe: list[str] | None = None
+        self.polos: list[str] = []
+        self.partes: list[dict] = []
+        self.cabecalho_eventos: list[str] = []
+        self.eventos: list[list[str]] = []
+        self._lendo_classe = False
+        self._tabela: str | None = None
+        # Tabelas aninhadas dentro da tabela em leitura (ignoradas)
+        self._aninhadas = 0
+        self._linha: list[str] | None = None
+        self._linha_cabecalho = False
+        self._coluna = -1
+        self._celula: list[str] | None = None
+        self._nomes_na_celula = 0
+        self._nome: list[str] | None = None
+
+    def _polo(self) -> str:
+        return self.polos[self._coluna] if 0 <= self._coluna < len(self.polos) else ''
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'span' and attrs.get('id') == 'txtClasse':
+            self.classe = []
+            self._lendo_classe = True
+        elif tag == 'table':
+            if self._tabela is not None:
+                self._aninhadas += 1
+            elif attrs.get('id') in (TABELA_PARTES, TABELA_EVENTOS):
+                self._tabela = attrs['id']
+        elif self._tabela is None or self._aninhadas:
+            return
+        elif tag == 'tr':
+            self._linha = []
+            self._linha_cabecalho = False
+            self._coluna = -1
+        elif tag in ('td', 'th') and self._linha is not None:
+            self._celula = []
+            self._coluna += 1
+            self._nomes_na_celula = 0
+            self._linha_cabecalho = self._linha_cabecalho or tag == 'th'
+        elif tag == 'span' and 'infraNomeParte' in (attrs.get('class') or '').split():
+            self._nome = []
+
+    def handle_endtag(self, tag):
+        if tag == 'span' and self._nome is not None:
+            self.partes.append({'polo': self._polo(), 'nome': _texto(self._nome)})
+            self._nomes_na_celula += 1
+            self._nome = None
+        elif tag == 'span' and self._lendo_classe:
+            self._lendo_classe = False
+        elif tag == 'table' and self._tabela is not None:
+            if self._aninhadas:
+                self._aninhadas -= 1
+            else:
+                self._tabela = None
+        elif self._tabela is None or self._aninhadas:
+            return
+        elif tag in ('td', 'th') and self._celula is not None:
+            texto = _texto(self._celula)
+            self._linha.append(texto)
+            # Sem o span de nome da parte, usa o texto da célula inteira
+            sem_nome = not self._nomes_na_celula
+            if self._tabela == TABELA_PARTES and tag == 'td' and texto and sem_nome:
+                self.partes.append({'polo': self._polo(), 'nome': texto})
+            self._celula = None
+        elif tag == 'tr' and self._linha is not None:
+            if self._linha_cabecalho:
+                if self._tabela == TABELA_PARTES:
+                    self.polos = self._linha
+                else:
+                    self.cabecalho_eventos = self._linha
+            elif self._tabela == TABELA_EVENTOS and self._linha:
+                self.eventos.append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        if self._lendo_classe:
+            self.classe.append(data)
+        if self._nome is not None:
+            self._nome.append(data)
+        if self._celula is not None:
+            self._celula.append(data)
+
+
+def _indice(cabecalho: list[str], trecho: str, padrao: int) -> int:
+    for i, coluna in enumerate(cabecalho):
+        if trecho in coluna.lower():
+            return i
+    return padrao
+
+
+def extrair_detalhe(html: str, max_eventos: int | None = None) -> dict | None:
+    """
+    Lê a classe, as partes (polo e nome) e os `max_eventos` eventos mais recentes da página de
+    detalhes. Retorna None se a página não tiver nenhum deles (ex: erro ou sessão expirada).
+    """
+    parser = _ParserDetalhe()
+    parser.feed(html)
+    parser.close()
+    if parser.classe is None and not parser.partes and not parser.eventos:
+        return None
+
+    max_eventos = settings.ENRICH_MAX_EVENTOS if max_eventos is None else max_eventos
+    cabecalho = parser.cabecalho_eventos
+    i_evento, i_data, i_descricao = (
+        _indice(cabecalho, 'evento', 0),
+        _indice(cabecalho, 'data', 1),
+        _indice(cabecalho, 'descri', 2),
+    )
+    eventos = [
+        {'evento': linha[i_evento], 'data': linha[i_data], 'descricao': linha[i_descricao]}
+        for linha in parser.eventos
+        if len(linha) > max(i_evento, i_data, i_descricao)
+    ]
+    return {
+        'classe': _texto(parser.classe) if parser.classe is not None else None,
+        'partes': parser.partes,
+        # O eproc lista os eventos do mais recente ao mais antigo
+        'eventos': eventos[:max_eventos],
+    }
+
+
+def _expirado(numero: str) -> bool:
+    # A validade vem do mtime do arquivo, sem precisar ler o JSON
+    salvo_em = state_saved_at(numero, SUBDIR_CACHE)
+    validade = timedelta(hours=settings.ENRICH_CACHE_TTL_HORAS)
+    return salvo_em is None or salvo_em < datetime.now() - validade
+
+
+def detalhe_em_cache(numero: str) -> dict | None:
+    """Detalhe salvo de um processo, ou None se não houver ou tiver expirado."""
+    if _expirado(numero):
+        return None
+    estado = load_state(numero, SUBDIR_CACHE)
+    estado.pop('atualizado_em', None)
+    return estado or None
+
+
+def limpar_cache_expirado() -> int:
+    """Remove do cache os detalhes expirados. Retorna quantos foram removidos."""
+    removidos = 0
+    for numero in list_states(SUBDIR_CACHE):
+        if _expirado(numero):
+            delete_state(numero, SUBDIR_CACHE)
+            removidos += 1
+    return removidos
+
+
+def _ler_cache(processos: list[str]) -> dict[str, dict]:
+    """Detalhes válidos em cache dos processos informados (uma só chamada fora do event loop)."""
+    em_cache = {numero: detalhe_em_cache(numero) for numero in processos}
+    return {numero: detalhe for numero, detalhe in em_cache.items() if detalhe is not None}
+
+
+def _gravar_cache(detalhes: dict[str, dict]):
+    for numero, detalhe in detalhes.items():
+        save_state(numero, detalhe, SUBDIR_CACHE)
+
+
+async def buscar_detalhes(page, processos: list[str]) -> dict[str, dict]:
+    """
+    Devolve {número do processo: detalhe} para os processos informados, usando o cache e
+    buscando os demais no eproc. Processos cuja página não pôde ser lida ficam de fora.
+    """
+    unicos = list(dict.fromkeys(processos))
+    detalhes = await run_blocking(_ler_cache, unicos)
+    pendentes = [numero for numero in unicos if numero not in detalhes]
+
+    if pendentes:
+        logger.info(
+            f'Buscando detalhes de {len(pendentes)} processo(s) no eproc ({len(detalhes)} em cache)...'
+        )
+        argumentos = {
+            'processos': pendentes,
+            'urlDetalhe': URL_DETALHE,
+            'limite': settings.ENRICH_CONCURRENCY,
+        }
+        htmls = await page.evaluate(SCRIPT_BUSCAR_DETALHES, argumentos)
+        novos = {}
+        falhas = []
+        for numero, html in zip(pendentes, htmls, strict=True):
+            detalhe = await run_blocking(extrair_detalhe, html) if html else None
+            if detalhe is None:
+                falhas.append(numero)
+            else:
+                novos[numero] = detalhe
+        if falhas:
+            logger.warning(
+                f'Detalhes indisponíveis para {len(falhas)} processo(s) (ex: {falhas[0]}).'
+            )
+        await run_blocking(_gravar_cache, novos)
+        detalhes.update(novos)
+        await run_blocking(limpar_cache_expirado)
+    return detalhes
@@ -0,0 +1,131 @@
+"""
+Gravação e reprodução do tráfego de rede de uma execução (Playwright route_from_har), para
+iterar nos scripts sem acessar o eproc: sem login real, sem 2FA e sem esperar o servidor.
+
+Modos (REPLAY_MODE, ou `--record` / `--replay` na CLI):
+- off:    execução normal;
+- record: executa contra o eproc e grava todas as respostas em REPLAY_DIR/<script>/rede.zip,
+          junto com a data/hora da gravação e uma cópia de STATE_DIR anterior à execução;
+- replay: serve as respostas gravadas (requisições não gravadas são abortadas e registradas no
+          log), restaura a cópia do estado em uma pasta temporária e usa o horário da gravação
+          nas datas dos formulários e no código TOTP, para que o eproc receba exatamente as
+          mesmas requisições. Google Sheets, Google Drive e LegalMind não são acionados.
+
+Gravação e reprodução usam sempre um navegador local (o daemon é ignorado) e o replay não lê
+nem grava a sessão salva. Atenção: a gravação contém cookies e o corpo do formulário de login.
+"""
+import contextvars
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from src.config import settings
+from src.logger import logger
+from src.utils.state_store import (
+    definir_diretorio_estado,
+    diretorio_estado,
+    restaurar_diretorio_estado,
+)
+
+MODOS = ('off', 'record', 'replay')
+
+# Horário da gravação durante um replay (None = relógio real)
+_relogio: contextvars.ContextVar[datetime | None] = contextvars.ContextVar('relogio_replay', default=None)
+
+
+def agora() -> datetime:
+    """datetime.now(), ou o horário da gravação quando a execução é um replay."""
+    return _relogio.get() or datetime.now()
+
+
+def reproduzindo() -> bool:
+    """True durante um replay: as integrações externas não devem ser acionadas."""
+    return settings.REPLAY_MODE == 'replay'
+
+
+class NetworkReplay:
+    """Grava ou reproduz a rede de uma execução. Use com `async with` em volta do navegador."""
+
+    def __init__(self, script: str, modo: str):
+        if modo not in MODOS:
+            raise ValueError(f'Modo de replay inválido: "{modo}" (use {", ".join(MODOS)}).')
+        self.script = script
+        self.modo = modo
+        self.diretorio = os.path.join(os.getcwd(), settings.REPLAY_DIR, script)
+        self.abortadas: list[str] = []
+        self._token_estado = None
+        self._estado_temporario = None
+        self._token = None
+
+    @property
+    def ativo(self) -> bool:
+        return self.modo != 'off'
+
+    @property
+    def har_path(self) -> str:
+        return os.path.join(self.diretorio, 'rede.zip')
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.diretorio, 'meta.json')
+
+    @property
+    def estado_path(self) -> str:
+        return os.path.join(self.diretorio, 'estado')
+
+    async def __aenter__(self):
+        if self.modo == 'record':
+            self._preparar_gravacao()
+        elif self.modo == 'replay':
+            self._preparar_replay()
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._token is not None:
+            _relogio.reset(self._token)
+        if self._token_estado is not None:
+            restaurar_diretorio_estado(self._token_estado)
+            shutil.rmtree(self._estado_temporario, ignore_errors=True)
+        if self.abortadas:
+            logger.warning(
+                f'Replay de "{self.script}": {len(self.abortadas)} requisição(ões) sem resposta gravada '
+                f'(ex: {self.abortadas[0]}). Grave novamente com --record se o fluxo mudou.'
+            )
+        elif self.modo == 'record':
+            logger.info(f'Tráfego de "{self.script}" gravado em {os.path.relpath(self.har_path)}.')
+
+    def _preparar_gravacao(self):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+        os.makedirs(self.diretorio)
+        origem = diretorio_estado()
+        if os.path.isdir(origem):
+            shutil.copytree(origem, self.estado_path)
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'script': self.script, 'gravado_em': datetime.now().isoformat()}, f, indent=2)
+
+    def _preparar_replay(self):
+        if not os.path.exists(self.har_path):
+            raise FileNotFoundError(
+                f'Nenhuma gravação de "{self.script}" em {self.diretorio}. Execute antes com --record.'
+            )
+        with open(self.meta_path, encoding='utf-8') as f:
+            gravado_em = datetime.fromisoformat(json.load(f)['gravado_em'])
+        self._token = _relogio.set(gravado_em)
+
+        # O estado local decide o fluxo (ex: modo incremental); parte sempre do estado da gravação.
+        # Só esta execução usa a cópia: execuções normais simultâneas continuam em STATE_DIR.
+        self._estado_temporario = tempfile.mkdtemp(prefix=f'replay-{self.script}-')
+        if os.path.isdir(self.estado_path):
+            shutil.copytree(self.estado_path, self._estado_temporario, dirs_exist_ok=True)
+        self._token_estado = definir_diretorio_estado(self._estado_temporario)
+        logger.info(f'Replay de "{self.script}" gravado em {gravado_em:%d/%m/%Y %H:%M:%S}.')
+
+    async def aplicar(self, context):
+        """Liga a gravação (update=True) ou a reprodução do HAR no contexto do navegador."""
+        if self.modo == 'record':
+            await context.route_from_har(self.har_path, update=True, update_content='attach', update_mode='full')
+        elif self.modo == 'replay':
+            await context.route_from_har(self.har_path, not_found='abort')
+            context.on('requestfailed', lambda request: self.abortadas.append(f'{request.method} {request.url}'))
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from src.utils.state_store import fingerprint
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Funções puras (sem Playwright/event loop) executadas no pool de processos de src.utils.async_io.
+# Recebem o caminho do arquivo em disco, de modo que o conteúdo do Excel não atravessa
+# a fronteira entre processos; apenas o resultado já transformado é devolvido.
+# O pandas é importado dentro das funções, para que importar os scripts não o carregue.
+
+# Colunas que mudam a cada dia sem que o relatório tenha mudado de fato (ex: contagem de dias conclusos)
+COLUNAS_VOLATEIS = ('DIAS',)
+
+
+def hash_relatorio(df: pd.DataFrame) -> str:
+    """
+    Calcula o hash do conteúdo do relatório, ignorando colunas voláteis,
+    espaços nas bordas das células e a ordem das linhas.
+    """
+    estaveis = df.drop(columns=[c for c in df.columns if str(c).strip().upper() in COLUNAS_VOLATEIS])
+    estaveis = estaveis.fillna('')
+    cabecalho = '|'.join(str(c).strip() for c in estaveis.columns)
+    linhas = ('|'.join(str(v).strip() for v in row) for row in estaveis.itertuples(index=False))
+    return fingerprint([f'#{cabecalho}', *linhas])
+
+
+def montar_registros(df: pd.DataFrame) -> list[dict]:
+    """
+    Converte o DataFrame do relatório de conclusos em registros normalizados para a API do LegalMind.
+    """
+    import pandas as pd
+
+    records = []
+    # Converter DataFrame para lista de dicionários para a API
+    for _, row in df.iterrows():
+        # Normaliza colunas mapeando do Excel do Eproc (19 colunas)
+        records.append({
+            'localidade': str(row.get('LOCALIDADE', '')),
+            'vara': str(row.get('VARA', '')),
+            'competencia': str(row.get('COMPETENCIA', '')),
+            'numero_processo': str(row.get('PROCESSO', row.get('Nº do Processo', ''))),
+            'data_autuacao': str(row.get('DATA_AUTUACAO', '')),
+            'classe': str(row.get('CLASSE', '')),
+            'codigo_classe': str(row.get('CODIGO_CLASSE', '')),
+            'situacao_classe': str(row.get('SITUACAO_CLASSE', '')),
+            'assunto': str(row.get('ASSUNTO', '')),
+            'codigo_assunto': str(row.get('CODIGO_ASSUNTO', '')),
+            'movimento': str(row.get('MOVIMENTO', '')),
+            'codigo_movimento': str(row.get('CODIGO_MOVIMENTO', '')),
+            'data_movimento': str(row.get('DATA_MOVIMENTO', '')),
+            'dias_conclusos': int(row.get('DIAS', 0)) if pd.notnull(row.get('DIAS')) else 0,
+            'parte_autora': str(row.get('PARTE_AUTORA', '')),
+            'parte_reu': str(row.get('PARTE_REU', '')),
+            'ultimo_localizador': str(row.get('ULTIMO LOCALIZADOR', '')),
+            'pessoa_situacao_rua': str(row.get('PESSOA EM SITUACAO DE RUA', '')),
+            'magistrado': str(row.get('MAGISTRADO', '')),
+
+            # Campos Extras/Derivados
+            'tipo_conclusao': str(row.get('TIPO', '')), # Pode não existir neste layout novo, mas mantemos
+            'data_conclusao': str(row.get('DATA DA CONCLUSÃO', '')), # Idem
+            'observacao': str(row.get('OBSERVAÇÕES', '')), # Idem
+
+            'dados_snapshot': row.dropna().to_dict() # Remove NaNs para o JSON
+        })
+    return records
+
+
+def processar_relatorio_conclusos(caminho: str, calcular_hash: bool = True) -> dict:
+    """
+    Lê o Excel do relatório de conclusos e devolve o total de linhas, o hash do conteúdo
+    (opcional) e os registros normalizados para o LegalMind.
+    """
+    import pandas as pd
+
+    # Força colunas como string para não perder zeros à esquerda
+    df = pd.read_excel(caminho, dtype=str)
+    return {
+        'total': len(df),
+        'hash': hash_relatorio(df) if calcular_hash else None,
+        'registros': montar_registros(df),
+    }
+
+
+def mesclar_alvaras(novo_path: str, antigo_path: str | None, destino_path: str) -> dict:
+    """
+    Lê o relatório de alvarás baixado e, se houver um dataset anterior, anexa as novas
+    linhas ao final dele usando as colunas do arquivo existente como referência.
+    Grava o resultado em destino_path e devolve as contagens de linhas.
+    """
+    import pandas as pd
+
+    # As linhas 1 e 2 do eproc são cabeçalho, então header=1 usa a segunda como nomes das colunas
+    df_novo = pd.read_excel(novo_path, header=1, dtype=str)
+
+    if antigo_path:
+        df_antigo = pd.read_excel(antigo_path, dtype=str)
+        # Alinhar colunas do novo ao antigo para evitar duplicação de cabeçalho
+        df_novo_alinhado = pd.DataFrame(df_novo.values, columns=df_antigo.columns[: len(df_novo.columns)])
+        df_final = pd.concat([df_antigo, df_novo_alinhado], ignore_index=True)
+    else:
+        df_final = df_novo
+
+    df_final.to_excel(destino_path, index=False)
+    return {'novas': len(df_novo), 'total': len(df_final)}
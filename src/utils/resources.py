@@ -0,0 +1,260 @@
+"""
+Consumo de recursos por execução: pico de memória (RSS) e tempo de CPU do processo Python,
+do navegador (processos filhos do Chromium) e dos workers de CPU (run_cpu_bound, ex: pandas).
+
+Durante a execução, um ResourceMonitor amostra periodicamente os processos (psutil, se
+instalado; senão /proc no Linux). Ao final devolve um resumo anexado a ScraperResult.resources
+e às métricas. Com RESOURCE_TRACEMALLOC_TOP > 0, também lista as linhas que mais alocaram
+memória no processo Python (as alocações dos workers e do navegador não entram no tracemalloc).
+
+A leitura dos processos roda no pool de threads (run_blocking), fora do event loop. Os
+filhos são os do processo Python inteiro: quando execuções se sobrepõem, os valores de uma
+incluem o consumo das outras, e o resumo indica isso em 'execucoes_simultaneas'.
+
+Observação: no modo daemon o navegador não é filho do processo e não é contabilizado.
+"""
+import asyncio
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+from src.config import settings
+from src.logger import logger
+from src.utils.async_io import run_blocking
+
+try:
+    import psutil
+except ImportError:  # psutil é opcional; sem ele, /proc (Linux) ou apenas o processo Python
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+NAVEGADOR = 'navegador'
+WORKERS = 'workers'
+PYTHON = 'python'
+
+# Processos do navegador: o driver do Playwright (node) e o Chromium (chrome, headless_shell...)
+_PROCESSOS_NAVEGADOR = ('node', 'chrom', 'headless_shell', 'msedge', 'firefox', 'webkit')
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _classificar(nome: str) -> str:
+    nome = nome.lower()
+    if any(p in nome for p in _PROCESSOS_NAVEGADOR):
+        return NAVEGADOR
+    return WORKERS
+
+
+def _ler_proc(pid: int) -> tuple[str, int, int, float] | None:
+    """(nome, ppid, rss em bytes, cpu em segundos) a partir de /proc/<pid>/stat."""
+    try:
+        with open(f'/proc/{pid}/stat', encoding='utf-8', errors='replace') as f:
+            dados = f.read()
+    except OSError:
+        return None
+    # O nome (campo 2) fica entre parênteses e pode conter espaços
+    nome = dados[dados.index('(') + 1 : dados.rindex(')')]
+    campos = dados[dados.rindex(')') + 2 :].split()
+    ppid = int(campos[1])
+    cpu = (int(campos[11]) + int(campos[12])) / _CLK_TCK
+    rss = int(campos[21]) * _PAGINA
+    return nome, ppid, rss, cpu
+
+
+def _amostrar_proc(pid_raiz: int) -> dict[int, tuple[str, int, float]]:
+    """{pid: (nome, rss, cpu)} dos descendentes de pid_raiz, lidos de /proc."""
+    processos = {}
+    for entrada in os.listdir('/proc'):
+        if entrada.isdigit():
+            info = _ler_proc(int(entrada))
+            if info is not None:
+                processos[int(entrada)] = info
+
+    descendentes = {}
+    pais = {pid_raiz}
+    while pais:
+        filhos = {
+            pid for pid, info in processos.items() if info[1] in pais and pid not in descendentes
+        }
+        for pid in filhos:
+            nome, _, rss, cpu = processos[pid]
+            descendentes[pid] = (nome, rss, cpu)
+        pais = filhos
+    return descendentes
+
+
+def _amostrar_psutil(pid_raiz: int) -> dict[int, tuple[str, int, float]]:
+    descendentes = {}
+    for proc in psutil.Process(pid_raiz).children(recursive=True):
+        with contextlib.suppress(psutil.Error), proc.oneshot():
+            cpu = proc.cpu_times()
+            descendentes[proc.pid] = (proc.name(), proc.memory_info().rss, cpu.user + cpu.system)
+    return descendentes
+
+
+def _rss_proprio() -> int:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    info = _ler_proc(os.getpid()) if os.path.exists('/proc/self/stat') else None
+    if info is not None:
+        return info[2]
+    if resource is None:
+        return 0
+    # Sem /proc: pico do processo inteiro (ru_maxrss em KB no Linux, bytes no macOS)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def amostrar_filhos(pid_raiz: int | None = None) -> dict[int, tuple[str, int, float]]:
+    """Processos descendentes (nome, rss em bytes, cpu em segundos); vazio se não suportado."""
+    pid_raiz = pid_raiz or os.getpid()
+    if psutil is not None:
+        return _amostrar_psutil(pid_raiz)
+    if os.path.isdir('/proc'):
+        return _amostrar_proc(pid_raiz)
+    return {}
+
+
+def _coletar() -> tuple[int, dict[int, tuple[str, int, float]]]:
+    """RSS do processo Python e amostra dos descendentes (bloqueante: lê /proc ou usa psutil)."""
+    return _rss_proprio(), amostrar_filhos()
+
+
+class ResourceMonitor:
+    # Monitores em andamento no processo (execuções simultâneas compartilham os filhos)
+    _ativos: set['ResourceMonitor'] = set()
+    # Monitores que usam o tracemalloc iniciado aqui: só o último a terminar o desliga
+    _usando_tracemalloc: set['ResourceMonitor'] = set()
+
+    def __init__(self, intervalo_s: float | None = None, tracemalloc_top: int | None = None):
+        self.intervalo_s = intervalo_s or settings.RESOURCE_SAMPLE_INTERVAL_S
+        self.tracemalloc_top = (
+            settings.RESOURCE_TRACEMALLOC_TOP if tracemalloc_top is None else tracemalloc_top
+        )
+        self._task: asyncio.Task | None = None
+
+    async def _amostrar(self):
+        rss_python, filhos = await run_blocking(_coletar)
+        rss = {PYTHON: rss_python, NAVEGADOR: 0, WORKERS: 0}
+        for pid, (nome, rss_filho, cpu) in filhos.items():
+            componente = _classificar(nome)
+            rss[componente] += rss_filho
+            # CPU acumulada de cada processo; os que já existiam no início contam apenas o delta
+            inicial = self._cpu_filhos_inicial.setdefault(pid, cpu if self._amostras == 0 else 0.0)
+            self._cpu_filhos[pid] = (componente, cpu - inicial)
+            self._processos[componente].add(pid)
+
+        for componente, valor in rss.items():
+            self._pico[componente] = max(self._pico[componente], valor)
+        self._pico_total = max(self._pico_total, sum(rss.values()))
+        self._amostras += 1
+
+    async def _loop(self):
+        while True:
+            try:
+                await self._amostrar()
+            except Exception as e:  # A medição nunca deve derrubar a execução
+                logger.debug(f'Falha ao amostrar recursos: {e}')
+            await asyncio.sleep(self.intervalo_s)
+
+    def start(self):
+        self._inicio = time.perf_counter()
+        self._cpu_inicial = time.process_time()
+        self._pico = {PYTHON: 0, NAVEGADOR: 0, WORKERS: 0}
+        self._pico_total = 0
+        self._amostras = 0
+        self._cpu_filhos_inicial: dict[int, float] = {}
+        self._cpu_filhos: dict[int, tuple[str, float]] = {}
+        self._processos = {NAVEGADOR: set(), WORKERS: set()}
+        self._simultaneas = 1
+
+        ResourceMonitor._ativos.add(self)
+        for monitor in ResourceMonitor._ativos:
+            monitor._simultaneas = max(monitor._simultaneas, len(ResourceMonitor._ativos))
+
+        # Um tracemalloc iniciado fora do monitor (ex: PYTHONTRACEMALLOC) nunca é desligado aqui
+        if self.tracemalloc_top and (ResourceMonitor._usando_tracemalloc or not tracemalloc.is_tracing()):
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            ResourceMonitor._usando_tracemalloc.add(self)
+        # A primeira amostra (referência da CPU dos filhos) é feita pela própria tarefa
+        self._task = asyncio.create_task(self._loop(), name='resource-monitor')
+
+    async def stop(self) -> dict:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        ResourceMonitor._ativos.discard(self)
+        with contextlib.suppress(Exception):
+            await self._amostrar()
+
+        cpu = {NAVEGADOR: 0.0, WORKERS: 0.0}
+        for componente, valor in self._cpu_filhos.values():
+            cpu[componente] += valor
+
+        resumo = {
+            'duracao_s': round(time.perf_counter() - self._inicio, 3),
+            'amostras': self._amostras,
+            'rss_pico_total_mb': _mb(self._pico_total),
+            # > 1: navegador e workers incluem o consumo das outras execuções do processo
+            'execucoes_simultaneas': self._simultaneas,
+            PYTHON: {
+                'rss_pico_mb': _mb(self._pico[PYTHON]),
+                'cpu_s': round(time.process_time() - self._cpu_inicial, 3),
+            },
+        }
+        for componente in (NAVEGADOR, WORKERS):
+            resumo[componente] = {
+                'rss_pico_mb': _mb(self._pico[componente]),
+                'cpu_s': round(cpu[componente], 3),
+                'processos': len(self._processos[componente]),
+            }
+
+        if tracemalloc.is_tracing() and self.tracemalloc_top:
+            resumo['tracemalloc'] = _top_alocacoes(self.tracemalloc_top)
+        if self in ResourceMonitor._usando_tracemalloc:
+            ResourceMonitor._usando_tracemalloc.discard(self)
+            if not ResourceMonitor._usando_tracemalloc:
+                tracemalloc.stop()
+        return resumo
+
+
+def _mb(valor: int) -> float:
+    return round(valor / (1024 * 1024), 1)
+
+
+def _top_alocacoes(limite: int) -> dict:
+    estatisticas = tracemalloc.take_snapshot().statistics('lineno')[:limite]
+    _, pico = tracemalloc.get_traced_memory()
+    return {
+        'pico_kb': round(pico / 1024, 1),
+        'top': [
+            {
+                'local': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                'tamanho_kb': round(stat.size / 1024, 1),
+                'blocos': stat.count,
+            }
+            for stat in estatisticas
+        ],
+    }
+
+
+def resumo_recursos(recursos: dict) -> str:
+    """Resumo de uma linha (ex: 'pico 1450 MB; python 380 MB/12.3s CPU; navegador 900 MB/40.1s CPU')."""
+    partes = [f'pico {recursos["rss_pico_total_mb"]:.0f} MB']
+    for componente in (PYTHON, NAVEGADOR, WORKERS):
+        dados = recursos[componente]
+        if dados['rss_pico_mb'] or dados['cpu_s']:
+            partes.append(f'{componente} {dados["rss_pico_mb"]:.0f} MB/{dados["cpu_s"]:.1f}s CPU')
+    if recursos.get('execucoes_simultaneas', 1) > 1:
+        partes.append(f'valores do processo inteiro ({recursos["execucoes_simultaneas"]} execuções simultâneas)')
+    return '; '.join(partes)
@@ -0,0 +1,118 @@
+import asyncio
+from collections.abc import Iterable
+from datetime import datetime
+
+from loguru import logger
+from playwright.async_api import Locator
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.utils.async_io import run_blocking
+from src.utils.state_store import load_state, update_state
+
+SUBDIR_SELETORES = 'seletores'
+
+
+async def disputar(alvos: dict[str, Locator], timeout: int) -> tuple[str | None, set[str]]:
+    """
+    Aguarda em paralelo que algum dos locators fique visível. Retorna o nome do primeiro (ou
+    None se nenhum aparecer em `timeout` ms) e os nomes dos que falharam (timeout ou erro)
+    antes disso; os que perderam a disputa ainda aguardando não contam como falha.
+    Se mais de um aparecer ao mesmo tempo, vale a ordem do dicionário.
+    """
+    tarefas = {
+        asyncio.create_task(locator.first.wait_for(state='visible', timeout=timeout)): nome
+        for nome, locator in alvos.items()
+    }
+
+    falhas = set()
+    try:
+        pendentes = set(tarefas)
+        while pendentes:
+            concluidas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            vencedores = []
+            for tarefa in concluidas:
+                if tarefa.cancelled() or tarefa.exception() is not None:
+                    falhas.add(tarefas[tarefa])
+                else:
+                    vencedores.append(tarefas[tarefa])
+            if vencedores:
+                return next(nome for nome in alvos if nome in vencedores), falhas
+        return None, falhas
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+
+async def aguardar_primeiro(alvos: dict[str, Locator], timeout: int) -> str:
+    """
+    Aguarda em paralelo que algum dos locators fique visível e retorna o nome do primeiro.
+    Se mais de um aparecer ao mesmo tempo, vale a ordem do dicionário.
+    """
+    vencedora, _ = await disputar(alvos, timeout)
+    if vencedora is None:
+        raise PlaywrightTimeoutError(f'Nenhum dos alvos esperados apareceu em {timeout} ms: {", ".join(alvos)}')
+    return vencedora
+
+
+class SelectorRegistry:
+    """
+    Registro persistente de qual alternativa de seletor funcionou em cada etapa.
+
+    As alternativas de uma etapa são disputadas em paralelo (nenhuma paga o timeout
+    da outra) e, quando mais de uma está disponível, vence a que tem o melhor histórico.
+    As contagens ficam em STATE_DIR/seletores/<etapa>.json, de modo que uma mudança de
+    layout do eproc é aprendida na primeira execução em vez de custar tempo em todas.
+    """
+
+    def estatisticas(self, etapa: str) -> dict[str, dict]:
+        return load_state(etapa, SUBDIR_SELETORES).get('alternativas', {})
+
+    def ordenar(self, etapa: str, nomes: list[str]) -> list[str]:
+        """Ordena as alternativas pela taxa de sucesso (empates mantêm a ordem original)."""
+        stats = self.estatisticas(etapa)
+
+        def taxa(nome: str) -> float:
+            s = stats.get(nome, {})
+            sucessos, falhas = s.get('sucessos', 0), s.get('falhas', 0)
+            return sucessos / (sucessos + falhas) if sucessos + falhas else 0.0
+
+        return sorted(nomes, key=lambda nome: -taxa(nome))
+
+    def registrar(self, etapa: str, vencedora: str | None, falhas: Iterable[str]):
+        """
+        Soma um sucesso para a alternativa vencedora e uma falha para as que expiraram ou deram
+        erro. A leitura e a gravação ficam sob a trava do arquivo (execuções simultâneas).
+        """
+
+        def atualizar(estado: dict) -> dict:
+            stats = estado.get('alternativas', {})
+            if vencedora is not None:
+                s = stats.setdefault(vencedora, {'sucessos': 0, 'falhas': 0})
+                s['sucessos'] += 1
+                s['ultimo_sucesso'] = datetime.now().isoformat(timespec='seconds')
+            for nome in falhas:
+                stats.setdefault(nome, {'sucessos': 0, 'falhas': 0})['falhas'] += 1
+            return {'alternativas': stats}
+
+        update_state(etapa, atualizar, SUBDIR_SELETORES)
+
+    async def localizar(self, etapa: str, alternativas: dict[str, Locator], timeout: int) -> Locator:
+        """
+        Retorna o locator (.first) da alternativa que ficar visível primeiro,
+        priorizando a de melhor histórico, e registra o resultado.
+        """
+        nomes = await run_blocking(self.ordenar, etapa, list(alternativas))
+        vencedora, falhas = await disputar({nome: alternativas[nome] for nome in nomes}, timeout)
+        await run_blocking(self.registrar, etapa, vencedora, falhas)
+        if vencedora is None:
+            raise PlaywrightTimeoutError(
+                f'Nenhuma alternativa da etapa "{etapa}" apareceu em {timeout} ms: {", ".join(nomes)}'
+            )
+
+        if vencedora != nomes[0]:
+            logger.info(f'Seletor "{vencedora}" usado na etapa "{etapa}" no lugar de "{nomes[0]}".')
+        return alternativas[vencedora].first
+
+
+selector_registry = SelectorRegistry()
@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+
+from playwright.async_api import async_playwright
+
+from src.config import settings
+from src.logger import logger
+from src.scripts.base import BaseScraper, ScraperResult
+from src.utils.async_io import run_blocking
+from src.utils.metrics import NAVEGADORES_INICIADOS
+from src.utils.session_store import session_store
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
+
+
+class LoginScraper(BaseScraper):
+    """Script interno que apenas realiza o login (e grava a sessão no session_store)."""
+
+    async def run(self, page) -> ScraperResult:
+        await self.navigate_to_home(page)
+        await self.login(page)
+        return ScraperResult(success=True, message='Sessão renovada.')
+
+
+class SessionKeeper:
+    """
+    Mantém a sessão do eproc aquecida enquanto a API estiver no ar.
+
+    Ao iniciar, faz o login se não houver sessão válida. Depois, a cada
+    SESSION_KEEPALIVE_INTERVAL_MIN, acessa a página inicial via requisição HTTP
+    (sem navegador) para manter a sessão ativa, e refaz o login antes que a sessão
+    atinja SESSION_MAX_IDADE_MIN. Assim as execuções partem de um contexto já autenticado.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name='session-keeper')
+            logger.info('Manutenção de sessão em segundo plano iniciada.')
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.verificar()
+            except Exception as e:
+                logger.warning(f'Falha na manutenção da sessão: {e}')
+            await asyncio.sleep(settings.SESSION_KEEPALIVE_INTERVAL_MIN * 60)
+
+    async def verificar(self) -> str:
+        """
+        Verifica a sessão salva e toma a ação necessária.
+        Retorna 'login' (sessão criada/renovada) ou 'keepalive' (sessão mantida).
+        """
+        sessao = await run_blocking(session_store.load, settings.EPROC_LOGIN, settings.EPROC_PERFIL)
+
+        if sessao is None:
+            logger.info('Nenhuma sessão salva. Realizando login antecipado...')
+        elif session_store.idade_segundos(sessao) >= settings.SESSION_MAX_IDADE_MIN * 60:
+            logger.info('Sessão próxima da expiração. Renovando login...')
+        elif await self._tocar(sessao['storage_state']):
+            logger.debug('Sessão mantida ativa.')
+            return 'keepalive'
+        else:
+            logger.info('Sessão salva expirou. Realizando novo login...')
+
+        await self._login()
+        return 'login'
+
+    async def _tocar(self, storage_state: dict) -> bool:
+        """Acessa a página inicial com os cookies da sessão, sem abrir o navegador."""
+        async with async_playwright() as p:
+            request = await p.request.new_context(storage_state=storage_state, user_agent=USER_AGENT)
+            try:
+                response = await request.get(settings.EPROC_URL, timeout=15000)
+                return response.ok and 'txtUsuario' not in await response.text()
+            except Exception as e:
+                logger.debug(f'Falha ao acessar o eproc com a sessão salva: {e}')
+                return False
+            finally:
+                await request.dispose()
+
+    async def _login(self):
+        """Login completo em um contexto limpo (o BaseScraper grava a nova sessão)."""
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, channel=settings.BROWSER_CHANNEL)
+            NAVEGADORES_INICIADOS.inc('keepalive')
+            try:
+                context = await browser.new_context(
+                    viewport={'width': 1920, 'height': 1080}, user_agent=USER_AGENT
+                )
+                page = await context.new_page()
+                await LoginScraper().run(page)
+            finally:
+                await browser.close()
@@ -0,0 +1,125 @@
+import contextlib
+import json
+import os
+import re
+from datetime import datetime
+
+from loguru import logger
+
+from src.config import settings
+from src.utils.state_store import trava_arquivo
+
+# Arquivo de sessão legado (versões anteriores salvavam um único state.json no diretório atual)
+LEGACY_STATE_PATH = 'state.json'
+
+
+class SessionStore:
+    """
+    Armazena o estado de sessão do Playwright (cookies, storage) por (login, perfil).
+
+    As gravações são atômicas (arquivo temporário + os.replace) e protegidas por um
+    arquivo de trava, de modo que execuções simultâneas (API, CLI, agendador) possam
+    compartilhar a mesma sessão sem corromper o arquivo nem sobrescrever uma sessão
+    mais recente gravada por outra execução.
+    """
+
+    def __init__(self, base_dir: str | None = None):
+        self.base_dir = base_dir
+
+    def _dir(self) -> str:
+        return os.path.join(os.getcwd(), self.base_dir or settings.SESSION_DIR)
+
+    def _path(self, login: str, perfil: str | None) -> str:
+        chave = f'{login}__{perfil or "padrao"}'
+        chave = re.sub(r'[\\/*?:"<>|\s]+', '_', chave.strip())
+        return os.path.join(self._dir(), f'{chave}.json')
+
+    def _lock(self, path: str):
+        return trava_arquivo(path, settings.SESSION_LOCK_TIMEOUT)
+
+    def load(self, login: str, perfil: str | None) -> dict | None:
+        """
+        Retorna {'storage_state', 'salvo_em', 'login', 'perfil'} da sessão salva, ou None.
+        Se não houver sessão no armazenamento, tenta o state.json legado.
+        """
+        path = self._path(login, perfil)
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f'Sessão salva ilegível em {path}. Ignorando: {e}')
+                return None
+
+        if os.path.exists(LEGACY_STATE_PATH):
+            try:
+                with open(LEGACY_STATE_PATH, encoding='utf-8') as f:
+                    storage_state = json.load(f)
+                salvo_em = datetime.fromtimestamp(os.path.getmtime(LEGACY_STATE_PATH))
+                logger.info(f"Usando sessão legada de '{LEGACY_STATE_PATH}'.")
+                return {
+                    'storage_state': storage_state,
+                    'salvo_em': salvo_em.isoformat(timespec='seconds'),
+                    'login': login,
+                    'perfil': perfil,
+                }
+            except Exception:
+                return None
+        return None
+
+    def save(
+        self, login: str, perfil: str | None, storage_state: dict, obtido_em: datetime | None = None
+    ) -> bool:
+        """
+        Grava a sessão, a menos que já exista uma sessão obtida depois de `obtido_em`
+        (outra execução logou mais recentemente). Retorna True se a sessão foi gravada.
+        """
+        obtido_em = obtido_em or datetime.now()
+        path = self._path(login, perfil)
+
+        with self._lock(path):
+            atual = self.load(login, perfil) if os.path.exists(path) else None
+            if atual and datetime.fromisoformat(atual['salvo_em']) > obtido_em:
+                logger.info('Sessão mais recente já salva por outra execução. Mantendo a existente.')
+                return False
+
+            conteudo = {
+                'storage_state': storage_state,
+                'salvo_em': obtido_em.isoformat(timespec='seconds'),
+                'login': login,
+                'perfil': perfil,
+            }
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(conteudo, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+        logger.info(f'Sessão salva para o usuário {login} (perfil: {perfil or "padrão"}).')
+        return True
+
+    def invalidate(self, login: str, perfil: str | None):
+        """Remove a sessão salva (ex: após detectar que expirou no eproc)."""
+        path = self._path(login, perfil)
+        with self._lock(path), contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+    @staticmethod
+    def idade_segundos(sessao: dict) -> float:
+        """Idade da sessão em segundos, a partir de 'salvo_em'."""
+        return (datetime.now() - datetime.fromisoformat(sessao['salvo_em'])).total_seconds()
+
+
+async def probe_session(context) -> bool:
+    """
+    Verificação barata de validade da sessão: uma requisição HTTP autenticada (sem abrir aba)
+    à página inicial do eproc. A sessão é válida se não houver redirecionamento para o login.
+    """
+    try:
+        response = await context.request.get(settings.EPROC_URL, timeout=15000)
+        return response.ok and 'txtUsuario' not in await response.text()
+    except Exception as e:
+        logger.debug(f'Falha na verificação da sessão: {e}')
+        return False
+
+
+session_store = SessionStore()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.utils.state_store import load_state, save_state
+
+# Campos que mudam diariamente sem representar alteração real do processo
+CAMPOS_VOLATEIS = ('dias_conclusos', 'dados_snapshot')
+
+
+@dataclass
+class Delta:
+    """Diferença entre o snapshot anterior e o relatório atual."""
+
+    novos: list[dict] = field(default_factory=list)
+    alterados: list[dict] = field(default_factory=list)
+    removidos: list[str] = field(default_factory=list)
+
+    @property
+    def upserts(self) -> list[dict]:
+        return self.novos + self.alterados
+
+    @property
+    def vazio(self) -> bool:
+        return not (self.novos or self.alterados or self.removidos)
+
+
+def hash_registro(registro: dict) -> str:
+    """Hash SHA-256 de um registro, ignorando os campos voláteis."""
+    estavel = {k: v for k, v in registro.items() if k not in CAMPOS_VOLATEIS}
+    conteudo = json.dumps(estavel, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def load_snapshot(nome: str) -> dict[str, dict]:
+    """
+    Carrega o snapshot local do último relatório sincronizado.
+    Retorna {numero_processo: {'hash': ..., 'registro': {...}}}.
+    """
+    return load_state(nome).get('registros', {})
+
+
+def save_snapshot(nome: str, registros: list[dict], chave: str = 'numero_processo') -> str:
+    """Grava o snapshot do relatório atual, indexado pela chave e com o hash de cada linha."""
+    snapshot = {}
+    for registro in registros:
+        snapshot[registro[chave]] = {'hash': hash_registro(registro), 'registro': registro}
+    return save_state(nome, {'total': len(snapshot), 'registros': snapshot})
+
+
+def calcular_delta(
+    anterior: dict[str, dict], registros: list[dict], chave: str = 'numero_processo'
+) -> Delta:
+    """
+    Compara o relatório atual com o snapshot anterior e separa os registros
+    novos, os alterados e as chaves que deixaram de constar no relatório.
+    """
+    # Uma linha por chave: em caso de duplicidade, vale a última ocorrência (como no snapshot)
+    unicos: dict[str, dict] = {}
+    for registro in registros:
+        numero = registro[chave]
+        if numero in unicos:
+            logger.warning(f'Processo {numero} duplicado no relatório. Mantendo a última ocorrência.')
+        unicos[numero] = registro
+
+    delta = Delta()
+    for numero, registro in unicos.items():
+        item_anterior = anterior.get(numero)
+        if item_anterior is None:
+            delta.novos.append(registro)
+        elif item_anterior['hash'] != hash_registro(registro):
+            delta.alterados.append(registro)
+
+    delta.removidos = sorted(set(anterior) - set(unicos))
+    return delta
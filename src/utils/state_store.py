@@ -0,0 +1,160 @@
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from datetime import datetime
+
+from loguru import logger
+
+from src.config import settings
+
+# Diretório de estado da execução atual (ex: cópia temporária durante um replay). Por ser uma
+# ContextVar, vale apenas para a execução que o definiu, não para as simultâneas.
+_diretorio_estado: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    'diretorio_estado', default=None
+)
+
+
+def diretorio_estado() -> str:
+    """Diretório de estado em uso: o definido para esta execução ou STATE_DIR."""
+    return os.path.join(os.getcwd(), _diretorio_estado.get() or settings.STATE_DIR)
+
+
+def definir_diretorio_estado(caminho: str | None) -> contextvars.Token:
+    """Usa `caminho` como diretório de estado na execução atual (ver restaurar_diretorio_estado)."""
+    return _diretorio_estado.set(caminho)
+
+
+def restaurar_diretorio_estado(token: contextvars.Token):
+    _diretorio_estado.reset(token)
+
+
+def _state_dir(subdir: str = '') -> str:
+    return os.path.join(diretorio_estado(), subdir)
+
+
+def _state_path(nome: str, subdir: str = '') -> str:
+    """Retorna o caminho do arquivo de estado, com o nome sanitizado para o sistema de arquivos."""
+    nome_limpo = re.sub(r'[\\/*?:"<>|\s]+', '_', nome.strip())
+    return os.path.join(_state_dir(subdir), f'{nome_limpo}.json')
+
+
+def list_states(subdir: str) -> list[str]:
+    """Lista os nomes dos estados gravados em um subdiretório, em ordem alfabética."""
+    diretorio = _state_dir(subdir)
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(f[: -len('.json')] for f in os.listdir(diretorio) if f.endswith('.json'))
+
+
+def state_saved_at(nome: str, subdir: str = '') -> datetime | None:
+    """Data/hora da última gravação do estado (mtime do arquivo), ou None se não existir."""
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(_state_path(nome, subdir)))
+    except FileNotFoundError:
+        return None
+
+
+def delete_state(nome: str, subdir: str = ''):
+    """Remove um estado gravado, se existir."""
+    path = _state_path(nome, subdir)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def load_state(nome: str, subdir: str = '') -> dict:
+    """
+    Carrega o estado persistido de uma execução anterior.
+    Retorna um dicionário vazio se o arquivo não existir ou estiver corrompido.
+    """
+    path = _state_path(nome, subdir)
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f'Estado "{nome}" ilegível em {path}. Ignorando: {e}')
+        return {}
+
+
+def save_state(nome: str, dados: dict, subdir: str = '') -> str:
+    """
+    Persiste o estado de forma atômica (arquivo temporário + os.replace),
+    adicionando a data/hora da gravação em 'atualizado_em'.
+    """
+    path = _state_path(nome, subdir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    conteudo = {**dados, 'atualizado_em': datetime.now().isoformat(timespec='seconds')}
+    # Nome temporário único: agendador, API e daemon podem gravar o mesmo estado ao mesmo tempo
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+    logger.debug(f'Estado "{nome}" salvo em {path}')
+    return path
+
+
+def update_state(nome: str, alterar: Callable[[dict], dict], subdir: str = '') -> dict:
+    """
+    Lê, altera e grava um estado sob a trava do arquivo, para que execuções simultâneas não
+    percam as atualizações umas das outras. Retorna o estado gravado.
+    """
+    path = _state_path(nome, subdir)
+    with trava_arquivo(path, settings.SESSION_LOCK_TIMEOUT):
+        dados = alterar(load_state(nome, subdir))
+        save_state(nome, dados, subdir)
+    return dados
+
+
+@contextlib.contextmanager
+def trava_arquivo(path: str, timeout: float):
+    """
+    Trava entre processos baseada na criação exclusiva de `path`.lock. Aguarda até `timeout`
+    segundos e remove travas mais antigas que isso, abandonadas por processos que morreram.
+    """
+    lock_path = f'{path}.lock'
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    limite = time.monotonic() + timeout
+
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError as e:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > limite:
+                raise TimeoutError(f'Não foi possível obter a trava: {lock_path}') from e
+            time.sleep(0.05)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(lock_path)
+
+
+def fingerprint(valores: Iterable[str]) -> str:
+    """
+    Calcula uma impressão digital (SHA-256) independente da ordem dos valores.
+    """
+    digest = hashlib.sha256()
+    for valor in sorted(valores):
+        digest.update(valor.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
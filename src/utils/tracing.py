@@ -0,0 +1,193 @@
+"""
+Medição de tempo por fase das execuções dos scrapers.
+
+Cada execução tem um PhaseTracer com uma árvore de spans (fases aninhadas). Há duas formas
+de marcar fases:
+
+    with self.span('download_excel'):       # bloco delimitado (aceita aninhamento)
+        ...
+
+    self.fase('leitura_excel')               # fase sequencial: termina quando a próxima começa
+
+A árvore é devolvida em ScraperResult.timings, registrada no log e, opcionalmente, gravada
+em TRACE_EXPORT_FILE (JSONL). Se o pacote opentelemetry estiver instalado, cada span também
+é criado como span do OpenTelemetry (exportado se houver um TracerProvider configurado;
+OTEL_ENABLED configura o SDK com o exportador OTLP).
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from loguru import logger
+
+from src.config import settings
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # opentelemetry é opcional
+    otel_trace = None
+
+_otel_configurado = False
+
+
+@dataclass(eq=False)
+class Span:
+    nome: str
+    pai: 'Span | None' = None
+    atributos: dict = field(default_factory=dict)
+    sequencial: bool = False
+    inicio: float = field(default_factory=time.perf_counter)
+    fim: float | None = None
+    filhos: list['Span'] = field(default_factory=list)
+    otel: object = None
+
+    @property
+    def duracao_s(self) -> float:
+        return (self.fim if self.fim is not None else time.perf_counter()) - self.inicio
+
+    def to_dict(self) -> dict:
+        dados = {'nome': self.nome, 'duracao_s': round(self.duracao_s, 3)}
+        if self.atributos:
+            dados['atributos'] = self.atributos
+        if self.filhos:
+            dados['filhos'] = [filho.to_dict() for filho in self.filhos]
+        return dados
+
+
+def _atributos_otel(atributos: dict) -> dict:
+    return {k: v for k, v in atributos.items() if isinstance(v, (str, bool, int, float))}
+
+
+class PhaseTracer:
+    def __init__(self, nome_raiz: str):
+        self.raiz = self._abrir(nome_raiz, None, {})
+        self._atual = contextvars.ContextVar(f'span_atual_{id(self)}', default=self.raiz)
+
+    def _abrir(self, nome: str, pai: Span | None, atributos: dict, sequencial: bool = False) -> Span:
+        span = Span(nome, pai, dict(atributos), sequencial)
+        if otel_trace is not None:
+            contexto = otel_trace.set_span_in_context(pai.otel) if pai is not None and pai.otel else None
+            span.otel = otel_trace.get_tracer('robo_eproc').start_span(
+                nome, context=contexto, attributes=_atributos_otel(atributos)
+            )
+        if pai is not None:
+            pai.filhos.append(span)
+        return span
+
+    def _fechar(self, span: Span):
+        if span.fim is None:
+            span.fim = time.perf_counter()
+            if span.otel is not None:
+                span.otel.set_attributes(_atributos_otel(span.atributos))
+                span.otel.end()
+
+    def _fechar_ate(self, limite: Span | None):
+        """Fecha as fases sequenciais abertas a partir do span atual até `limite` (exclusive)."""
+        cadeia = []
+        atual = self._atual.get()
+        while atual is not None and atual is not limite:
+            cadeia.append(atual)
+            atual = atual.pai
+        if atual is limite:
+            for span in cadeia:
+                self._fechar(span)
+
+    @contextlib.contextmanager
+    def span(self, nome: str, **atributos):
+        span = self._abrir(nome, self._atual.get(), atributos)
+        token = self._atual.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.atributos['erro'] = type(e).__name__
+            raise
+        finally:
+            self._fechar_ate(span)
+            self._fechar(span)
+            self._atual.reset(token)
+
+    def fase(self, nome: str, **atributos) -> Span:
+        """Inicia uma fase sequencial, encerrando a fase sequencial anterior do mesmo nível."""
+        atual = self._atual.get()
+        if atual.sequencial:
+            self._fechar(atual)
+            atual = atual.pai
+        span = self._abrir(nome, atual, atributos, sequencial=True)
+        self._atual.set(span)
+        return span
+
+    def registrar(self, nome: str, duracao_s: float, **atributos):
+        """Registra um span já concluído (ex: medido por outro mecanismo) no span atual."""
+        span = self._abrir(nome, self._atual.get(), atributos)
+        span.inicio = time.perf_counter() - duracao_s
+        self._fechar(span)
+
+    def finalizar(self) -> dict:
+        """Encerra todos os spans abertos e devolve a árvore de tempos."""
+        self._fechar_ate(None)
+        self._fechar(self.raiz)
+        return self.raiz.to_dict()
+
+
+def medido(nome: str | None = None):
+    """Decorador para métodos assíncronos de BaseScraper: executa o método dentro de um span."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with self.span(nome or func.__name__):
+                return await func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def resumo_fases(timings: dict) -> str:
+    """Resumo de uma linha com as fases de primeiro nível (ex: 'login=3.1s, download=12.0s')."""
+    return ', '.join(f'{f["nome"]}={f["duracao_s"]:.1f}s' for f in timings.get('filhos', []))
+
+
+def exportar_timings(script: str, timings: dict):
+    """Registra a árvore de tempos no log (estruturado) e, se configurado, em TRACE_EXPORT_FILE."""
+    logger.bind(script=script, timings=timings).info(
+        f'Tempos de "{script}" ({timings["duracao_s"]:.1f}s): {resumo_fases(timings) or "sem fases"}'
+    )
+
+    if settings.TRACE_EXPORT_FILE:
+        path = os.path.join(os.getcwd(), settings.TRACE_EXPORT_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        registro = {'script': script, 'registrado_em': datetime.now().isoformat(timespec='seconds'), 'timings': timings}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def configurar_opentelemetry():
+    """
+    Com OTEL_ENABLED, configura o SDK do OpenTelemetry com o exportador OTLP (endpoint padrão
+    ou OTEL_EXPORTER_OTLP_ENDPOINT). Requer opentelemetry-sdk e opentelemetry-exporter-otlp.
+    """
+    global _otel_configurado
+    if _otel_configurado or not settings.OTEL_ENABLED:
+        return
+    _otel_configurado = True
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning(
+            'OTEL_ENABLED ativo, mas opentelemetry-sdk/opentelemetry-exporter-otlp não estão instalados.'
+        )
+        return
+
+    provider = TracerProvider(resource=Resource.create({'service.name': 'robo-eproc'}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(provider)
+    logger.info('Exportação de spans via OpenTelemetry (OTLP) configurada.')
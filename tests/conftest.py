@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    """Diretório de trabalho temporário, para que data/ (estado, cache, histórico) fique isolado."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
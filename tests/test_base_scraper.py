@@ -1,7 +1,15 @@
+import asyncio
+import time
+
 import pytest
-from unittest.mock import AsyncMock, patch
-from src.scripts.base import BaseScraper, ScraperResult
-from playwright.async_api import Page
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.config import settings
+from src.scripts.base import (
+    SELETOR_2FA, SELETOR_ERRO_LOGIN, SELETOR_FORMULARIO_LOGIN, SELETOR_PAINEL, SELETOR_SENHA,
+    BaseScraper, ScraperResult,
+)
+from src.utils.session_store import session_store
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
 
 class DummyScraper(BaseScraper):
     async def run(self, page: Page) -> ScraperResult:
@@ -36,3 +44,198 @@ async def test_wait_and_click(dummy_scraper):
     
     page_mock.wait_for_selector.assert_called_once_with("#btn", timeout=5000)
     page_mock.click.assert_called_once_with("#btn")
+
+
+class FakeLocator:
+    def __init__(self, atraso):
+        self.atraso = atraso
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state, timeout):
+        if self.atraso is None or self.atraso * 1000 > timeout:
+            await asyncio.sleep(timeout / 1000)
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms")
+        await asyncio.sleep(self.atraso)
+
+
+class FakePage:
+    def __init__(self, atrasos):
+        self.atrasos = atrasos
+
+    def locator(self, seletor):
+        return FakeLocator(self.atrasos.get(seletor))
+
+
+@pytest.mark.asyncio
+async def test_aguardar_proximo_estado_retorna_o_primeiro(dummy_scraper):
+    page = FakePage({"#painel": 0.05, "#2fa": None, "#erro": 2})
+
+    inicio = time.perf_counter()
+    estado = await dummy_scraper._aguardar_proximo_estado(
+        page, {"painel": "#painel", "2fa": "#2fa", "erro": "#erro"}, timeout=5000
+    )
+
+    assert estado == "painel"
+    # Não espera pelos estados que nunca aparecem
+    assert time.perf_counter() - inicio < 1
+
+
+@pytest.mark.asyncio
+async def test_aguardar_proximo_estado_timeout(dummy_scraper):
+    page = FakePage({})
+
+    with pytest.raises(PlaywrightTimeoutError):
+        await dummy_scraper._aguardar_proximo_estado(page, {"painel": "#painel", "2fa": "#2fa"}, timeout=50)
+
+
+FORMULARIO = {SELETOR_FORMULARIO_LOGIN, SELETOR_SENHA}
+PERFIL = 'DIRETOR DE SECRETARIA'
+
+
+class ElementoLogin:
+    """Locator falso: visível quando algum dos seus seletores está na tela atual da página."""
+
+    def __init__(self, pagina, *seletores):
+        self.pagina = pagina
+        self.seletores = seletores
+        self.first = self
+
+    def or_(self, outro):
+        return ElementoLogin(self.pagina, *self.seletores, *outro.seletores)
+
+    async def wait_for(self, state, timeout):
+        # A tela só muda com as ações do login, nunca durante a espera
+        if not any(seletor in self.pagina.tela for seletor in self.seletores):
+            await asyncio.sleep(timeout / 1000)
+            raise PlaywrightTimeoutError(f'Timeout {timeout}ms')
+
+    async def fill(self, valor):
+        self.pagina.preenchidos[self.seletores[0]] = valor
+
+    async def press(self, tecla):
+        self.pagina.avancar()
+
+    async def click(self):
+        self.pagina.avancar()
+
+    async def inner_text(self):
+        return ' Usuário ou senha inválidos. '
+
+
+class PaginaLogin:
+    """Página falsa do eproc que exibe as telas informadas, uma a cada envio do usuário."""
+
+    url = 'https://eproc.local/'
+
+    def __init__(self, *telas):
+        self.telas = list(telas)
+        self.tela = self.telas.pop(0)
+        self.preenchidos = {}
+        self.context = MagicMock(storage_state=AsyncMock(return_value={'cookies': []}))
+
+    def avancar(self):
+        self.tela = self.telas.pop(0) if self.telas else set()
+
+    def locator(self, seletor):
+        return ElementoLogin(self, seletor)
+
+    def get_by_role(self, papel, name):
+        return ElementoLogin(self, f'role={papel}[name={name}]')
+
+    def get_by_text(self, texto, exact=False):
+        return ElementoLogin(self, f'text={texto}')
+
+
+@pytest.fixture
+def login_eproc(state_dir, monkeypatch):
+    """Credenciais de teste, timeout curto por estado e gravação da sessão substituída."""
+    monkeypatch.setattr(settings, 'EPROC_LOGIN', 'usuario')
+    monkeypatch.setattr(settings, 'EPROC_SENHA', 'senha')
+    monkeypatch.setattr(settings, 'EPROC_PERFIL', None)
+    monkeypatch.setattr(settings, 'EPROC_2FA_SECRET', None)
+    monkeypatch.setattr(settings, 'LOGIN_ESTADO_TIMEOUT', 200)
+    salvar = MagicMock()
+    monkeypatch.setattr(session_store, 'save', salvar)
+    return salvar
+
+
+def _transicoes(scraper):
+    return [(t['de'], t['para']) for t in scraper.login_timings]
+
+
+@pytest.mark.asyncio
+async def test_login_com_sessao_valida_vai_direto_ao_painel(dummy_scraper, login_eproc):
+    page = PaginaLogin({SELETOR_PAINEL})
+
+    await dummy_scraper.login(page)
+
+    assert _transicoes(dummy_scraper) == [('inicio', 'painel')]
+    assert page.preenchidos == {}
+    login_eproc.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_com_usuario_e_senha(dummy_scraper, login_eproc):
+    page = PaginaLogin(FORMULARIO, {SELETOR_PAINEL})
+
+    await dummy_scraper.login(page)
+
+    assert _transicoes(dummy_scraper) == [('inicio', 'formulario'), ('formulario', 'painel')]
+    assert page.preenchidos == {SELETOR_FORMULARIO_LOGIN: 'usuario', SELETOR_SENHA: 'senha'}
+    login_eproc.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_login_com_2fa(dummy_scraper, login_eproc, monkeypatch):
+    monkeypatch.setattr(settings, 'EPROC_2FA_SECRET', 'JBSWY3DPEHPK3PXP')
+    page = PaginaLogin(FORMULARIO, {SELETOR_2FA}, {SELETOR_PAINEL})
+
+    await dummy_scraper.login(page)
+
+    assert _transicoes(dummy_scraper) == [('inicio', 'formulario'), ('formulario', '2fa'), ('2fa', 'painel')]
+    codigo = page.preenchidos[SELETOR_2FA]
+    assert len(codigo) == 6 and codigo.isdigit()
+    login_eproc.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_login_com_2fa_sem_segredo_configurado(dummy_scraper, login_eproc):
+    page = PaginaLogin(FORMULARIO, {SELETOR_2FA})
+
+    with pytest.raises(RuntimeError, match='EPROC_2FA_SECRET'):
+        await dummy_scraper.login(page)
+    assert SELETOR_2FA not in page.preenchidos
+    login_eproc.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_com_credenciais_invalidas(dummy_scraper, login_eproc):
+    page = PaginaLogin(FORMULARIO, {SELETOR_ERRO_LOGIN})
+
+    with pytest.raises(RuntimeError, match='O eproc recusou o login: Usuário ou senha inválidos.'):
+        await dummy_scraper.login(page)
+    assert _transicoes(dummy_scraper) == [('inicio', 'formulario'), ('formulario', 'erro')]
+    login_eproc.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_com_selecao_de_perfil(dummy_scraper, login_eproc, monkeypatch):
+    monkeypatch.setattr(settings, 'EPROC_PERFIL', PERFIL)
+    page = PaginaLogin(FORMULARIO, {f'text={PERFIL}'}, {SELETOR_PAINEL})
+
+    await dummy_scraper.login(page)
+
+    assert _transicoes(dummy_scraper) == [('inicio', 'formulario'), ('formulario', 'perfil'), ('perfil', 'painel')]
+    login_eproc.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_login_sem_proxima_tela_expira(dummy_scraper, login_eproc):
+    page = PaginaLogin(FORMULARIO, set())
+
+    with pytest.raises(PlaywrightTimeoutError):
+        await dummy_scraper.login(page)
+    login_eproc.assert_not_called()
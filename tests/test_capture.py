@@ -0,0 +1,129 @@
+import json
+import os
+
+import pytest
+
+from src.config import settings
+from src.scripts.base import ScraperResult
+from src.utils.capture import RunCapture, carregar_duracoes, esperas_mais_longas, modo_captura
+
+
+@pytest.fixture(autouse=True)
+def capture_dir(state_dir, monkeypatch):
+    monkeypatch.setattr(settings, 'CAPTURE_DIR', 'captures')
+    monkeypatch.setattr(settings, 'CAPTURE_AUTO_MIN_AMOSTRAS', 3)
+    return state_dir / 'captures'
+
+
+class FakeTracing:
+    async def start(self, **kwargs):
+        self.kwargs = kwargs
+
+    async def stop(self, path):
+        with open(path, 'wb') as f:
+            f.write(b'trace')
+
+
+class FakeContext:
+    def __init__(self):
+        self.tracing = FakeTracing()
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, evento, handler):
+        self.handlers[evento] = handler
+
+
+class FakeRequest:
+    def __init__(self, url, fim_ms):
+        self.url = url
+        self.method = 'GET'
+        self.resource_type = 'document'
+        self.timing = {'requestStart': 1.0, 'responseStart': fim_ms - 5, 'responseEnd': fim_ms}
+
+
+def _resultado(duracao_s: float, success: bool = True) -> ScraperResult:
+    timings = {
+        'nome': 'loc_urgente',
+        'duracao_s': duracao_s,
+        'filhos': [
+            {
+                'nome': 'login',
+                'duracao_s': 3.0,
+                'filhos': [{'nome': 'inicio->painel', 'duracao_s': 2.5}],
+            }
+        ],
+    }
+    return ScraperResult(success=success, message='ok', timings=timings)
+
+
+async def _executar(
+    modo: str, duracao_s: float, success: bool = True
+) -> tuple[RunCapture, dict | None]:
+    captura = RunCapture('loc_urgente', modo)
+    page = FakePage()
+    await captura.iniciar(FakeContext(), page)
+    page.handlers['requestfinished'](FakeRequest('https://eproc/lento', 900))
+    page.handlers['requestfinished'](FakeRequest('https://eproc/rapido', 50))
+    page.handlers['requestfailed'](FakeRequest('https://eproc/falhou', -1))
+    await captura.parar_trace()
+    return captura, captura.concluir(_resultado(duracao_s, success))
+
+
+def test_modo_captura():
+    assert modo_captura(True) == 'always'
+    assert modo_captura(False) == 'off'
+    assert modo_captura(None) == settings.CAPTURE_MODE
+    with pytest.raises(ValueError):
+        RunCapture('loc_urgente', 'sempre')
+
+
+async def test_captura_solicitada_grava_resumo():
+    captura, resumo = await _executar('always', 10.0)
+
+    assert resumo['motivo'] == 'solicitada'
+    assert resumo['trace'] is True
+    assert [r['url'] for r in resumo['requisicoes_lentas']] == [
+        'https://eproc/lento',
+        'https://eproc/rapido',
+    ]
+    assert resumo['requisicoes_falhas'] == ['https://eproc/falhou']
+    assert resumo['esperas_longas'][0] == {
+        'fase': 'loc_urgente/login/inicio->painel',
+        'duracao_s': 2.5,
+    }
+    with open(os.path.join(captura.diretorio, 'resumo.json'), encoding='utf-8') as f:
+        assert json.load(f)['motivo'] == 'solicitada'
+
+
+async def test_modo_auto_mantem_apenas_lentas_e_falhas():
+    # Sem histórico suficiente, nada é mantido
+    for duracao in (10.0, 11.0, 12.0):
+        captura, resumo = await _executar('auto', duracao)
+        assert resumo is None
+        assert not os.path.exists(captura.diretorio)
+    assert carregar_duracoes()['loc_urgente'] == [10.0, 11.0, 12.0]
+
+    _, resumo = await _executar('auto', 11.5)
+    assert resumo is None
+
+    _, resumo = await _executar('auto', 30.0)
+    assert resumo['motivo'].startswith('lenta')
+
+    _, resumo = await _executar('auto', 5.0, success=False)
+    assert resumo['motivo'] == 'falha'
+
+
+async def test_rotacao_mantem_capturas_recentes(capture_dir, monkeypatch):
+    monkeypatch.setattr(settings, 'CAPTURE_MAX_RUNS', 2)
+    diretorios = [(await _executar('always', 1.0))[0].diretorio for _ in range(3)]
+
+    assert not os.path.exists(diretorios[0])
+    assert all(os.path.exists(d) for d in diretorios[1:])
+
+
+def test_esperas_mais_longas_sem_timings():
+    assert esperas_mais_longas(None, 5) == []
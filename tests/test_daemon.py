@@ -0,0 +1,99 @@
+import contextlib
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src import main
+from src.config import settings
+from src.daemon import conectar_daemon, ler_endpoint
+from src.scripts.base import ScraperResult
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+
+def _escrever_endpoint(state_dir):
+    (state_dir / 'data').mkdir(exist_ok=True)
+    (state_dir / 'data' / 'daemon.json').write_text(json.dumps({'endpoint': 'http://127.0.0.1:9222'}))
+
+
+async def test_sem_daemon_nao_conecta():
+    playwright = MagicMock()
+
+    assert ler_endpoint() is None
+    assert await conectar_daemon(playwright) is None
+    playwright.chromium.connect_over_cdp.assert_not_called()
+
+
+async def test_conecta_ao_daemon_em_execucao(state_dir):
+    _escrever_endpoint(state_dir)
+    browser = MagicMock(contexts=[MagicMock()])
+    playwright = MagicMock()
+    playwright.chromium.connect_over_cdp = AsyncMock(return_value=browser)
+
+    assert await conectar_daemon(playwright) is browser
+    playwright.chromium.connect_over_cdp.assert_awaited_once()
+    assert playwright.chromium.connect_over_cdp.await_args.args[0] == 'http://127.0.0.1:9222'
+
+
+async def test_daemon_inacessivel_usa_navegador_proprio(state_dir):
+    _escrever_endpoint(state_dir)
+    playwright = MagicMock()
+    playwright.chromium.connect_over_cdp = AsyncMock(side_effect=Exception('ECONNREFUSED'))
+
+    assert await conectar_daemon(playwright) is None
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    """Navegador do daemon conectado via CDP; o navegador local falha se for aberto."""
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=MagicMock(close=AsyncMock()))
+    context.tracing.start = AsyncMock()
+    browser = MagicMock(contexts=[context], close=AsyncMock())
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=RuntimeError('navegador local aberto'))
+
+    @contextlib.asynccontextmanager
+    async def async_playwright():
+        yield playwright
+
+    monkeypatch.setattr('playwright.async_api.async_playwright', async_playwright)
+    monkeypatch.setattr('src.daemon.conectar_daemon', AsyncMock(return_value=browser))
+    monkeypatch.setattr(settings, 'DAEMON_ATTACH', True)
+    monkeypatch.setattr(settings, 'SESSION_PROBE_ON_START', True)
+    monkeypatch.setattr(main, 'probe_session', AsyncMock(return_value=True))
+    scraper = AsyncMock(return_value=ScraperResult(success=True, message='ok'))
+    monkeypatch.setattr(main, '_run_scraper', scraper)
+    return SimpleNamespace(browser=browser, context=context, playwright=playwright, scraper=scraper)
+
+
+async def test_execucao_no_daemon_sem_trace_e_desconecta(daemon):
+    result = await main._executar_no_navegador(MagicMock(), 'teste', True, capturar=True)
+
+    assert result.success
+    daemon.scraper.assert_awaited_once()
+    # O contexto é do daemon: sem trace, e apenas a conexão CDP é encerrada
+    daemon.context.tracing.start.assert_not_called()
+    daemon.context.close.assert_not_called()
+    daemon.browser.close.assert_awaited_once()
+    daemon.playwright.chromium.launch.assert_not_called()
+
+
+async def test_falha_no_script_ainda_desconecta_do_daemon(daemon):
+    daemon.scraper.side_effect = RuntimeError('falha no script')
+
+    with pytest.raises(RuntimeError, match='falha no script'):
+        await main._executar_no_navegador(MagicMock(), 'teste', True)
+    daemon.browser.close.assert_awaited_once()
+
+
+async def test_sessao_expirada_no_daemon_usa_navegador_proprio(daemon):
+    main.probe_session.return_value = False
+
+    with pytest.raises(RuntimeError, match='navegador local aberto'):
+        await main._executar_no_navegador(MagicMock(), 'teste', True)
+    daemon.scraper.assert_not_called()
+    daemon.context.new_page.assert_not_called()
+    daemon.browser.close.assert_awaited_once()
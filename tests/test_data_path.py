@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.data_path import (
+    BENCHMARKS,
+    FakeSheets,
+    historico_sheets,
+    lote_localizador,
+    medir,
+    regressoes,
+    tamanho,
+)
+from src.utils import google_sheets
+
+
+@pytest.mark.parametrize('nome', sorted(BENCHMARKS))
+def test_benchmarks_executam_com_poucas_linhas(nome):
+    assert medir(nome, 50, repeticoes=1) > 0
+
+
+def test_sheets_falso_insere_apenas_ineditos(monkeypatch):
+    historico = historico_sheets(200)
+    sheets = FakeSheets(historico)
+    monkeypatch.setattr(google_sheets, 'get_sheets_service', lambda: sheets)
+
+    lote = lote_localizador(historico, 100)
+    ineditos = google_sheets.salvar_processos_no_sheets('benchmark', lote)
+
+    assert len(ineditos) == 50
+    assert len(sheets.inseridas) == 50
+
+
+def test_regressao_considera_tolerancia():
+    baseline = {'sheets_dedup': {'10k': 0.100}}
+    assert regressoes({'sheets_dedup': {'10k': 0.120}}, baseline) == []
+    assert regressoes({'sheets_dedup': {'10k': 0.300}, 'novo': {'1k': 1.0}}, baseline) == [
+        'sheets_dedup[10k]: 300.0 ms (baseline 100.0 ms)'
+    ]
+
+
+def test_tamanhos_aceitam_rotulos_e_numeros():
+    assert tamanho('1M') == 1_000_000
+    assert tamanho('2500') == 2500
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from src.execution import ExecutionQueue
+
+
+@pytest.fixture
+def fila(monkeypatch):
+    monkeypatch.setattr('src.config.settings.EXECUTION_SLOTS', 1)
+    monkeypatch.setattr('src.config.settings.EXECUTION_URGENT_SLOTS', 1)
+    return ExecutionQueue()
+
+
+def _tarefa(ordem: list, nome: str, duracao: float = 0.02):
+    async def func():
+        ordem.append(nome)
+        await asyncio.sleep(duracao)
+        return nome
+
+    return func
+
+
+async def test_prioridade_e_prazo_definem_a_ordem(fila, monkeypatch):
+    monkeypatch.setattr('src.config.settings.EXECUTION_URGENT_SLOTS', 0)
+    ordem = []
+
+    # Ocupa a única vaga e enfileira as demais
+    em_execucao = asyncio.create_task(fila.executar('relatorio_conclusos', _tarefa(ordem, 'relatorio'), prioridade=9))
+    await asyncio.sleep(0)
+    aguardando = [
+        asyncio.create_task(fila.executar('loc_peticoes', _tarefa(ordem, 'peticoes'), prioridade=5)),
+        asyncio.create_task(fila.executar('loc_mandados', _tarefa(ordem, 'mandados'), prioridade=5, prazo_s=60)),
+        asyncio.create_task(fila.executar('loc_urgente', _tarefa(ordem, 'urgente'), prioridade=0)),
+    ]
+    await asyncio.gather(em_execucao, *aguardando)
+
+    assert ordem == ['relatorio', 'urgente', 'mandados', 'peticoes']
+
+
+async def test_urgente_usa_vaga_reservada(fila):
+    ordem = []
+    liberar = asyncio.Event()
+
+    async def longo():
+        ordem.append('relatorio')
+        await liberar.wait()
+
+    relatorio = asyncio.create_task(fila.executar('relatorio_conclusos', longo, prioridade=9))
+    await asyncio.sleep(0)
+
+    # A vaga geral está ocupada, mas o urgente não espera o relatório terminar
+    assert await fila.executar('loc_urgente', _tarefa(ordem, 'urgente'), prioridade=0) == 'urgente'
+
+    # Um script normal continua aguardando a vaga geral
+    normal = asyncio.create_task(fila.executar('loc_peticoes', _tarefa(ordem, 'peticoes'), prioridade=5))
+    await asyncio.sleep(0.05)
+    assert ordem == ['relatorio', 'urgente']
+
+    liberar.set()
+    await asyncio.gather(relatorio, normal)
+    assert ordem == ['relatorio', 'urgente', 'peticoes']
+
+
+async def test_metricas_de_espera_execucao_e_prazo(fila):
+    ordem = []
+    primeiro = asyncio.create_task(fila.executar('loc_peticoes', _tarefa(ordem, 'a', 0.05), prioridade=5))
+    await asyncio.sleep(0)
+    await asyncio.gather(primeiro, fila.executar('loc_mandados', _tarefa(ordem, 'b'), prioridade=5, prazo_s=0.01))
+
+    status = fila.status()
+    mandados = status['scripts']['loc_mandados']
+    assert mandados['execucoes'] == 1
+    assert mandados['prazos_perdidos'] == 1
+    assert mandados['espera_fila']['max_s'] >= 0.04
+    assert status['scripts']['loc_peticoes']['execucao']['media_s'] >= 0.05
+    assert status['vagas_livres'] == {'geral': 1, 'urgente': 1}
+
+
+async def test_falha_libera_a_vaga(fila):
+    async def falha():
+        raise RuntimeError('erro')
+
+    with pytest.raises(RuntimeError):
+        await fila.executar('loc_peticoes', falha)
+
+    assert await fila.executar('loc_peticoes', _tarefa([], 'ok')) == 'ok'
+
+
+async def test_cancelamento_apos_receber_a_vaga_a_devolve(fila, monkeypatch):
+    monkeypatch.setattr('src.config.settings.EXECUTION_URGENT_SLOTS', 0)
+    liberar = asyncio.Event()
+
+    async def longo():
+        await liberar.wait()
+
+    ocupante = asyncio.create_task(fila.executar('relatorio_conclusos', longo, prioridade=9))
+    await asyncio.sleep(0)
+    aguardando = asyncio.create_task(fila.executar('loc_peticoes', _tarefa([], 'cancelado')))
+    await asyncio.sleep(0)
+
+    # O ocupante termina e passa a vaga; no mesmo tique, quem a recebeu é cancelado
+    liberar.set()
+    asyncio.get_running_loop().call_soon(aguardando.cancel)
+    await ocupante
+    with pytest.raises(asyncio.CancelledError):
+        await aguardando
+
+    assert fila.status()['vagas_livres']['geral'] == 1
+    assert await asyncio.wait_for(fila.executar('loc_peticoes', _tarefa([], 'ok')), 1) == 'ok'
@@ -0,0 +1,54 @@
+import functools
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.utils import integracao_legalmind
+from src.utils.integracao_legalmind import enviar_delta_relatorio_concluso
+
+
+@pytest.fixture
+def legalmind(monkeypatch):
+    """Responde às requisições do LegalMind com o status configurado e guarda os pedidos."""
+    estado = {'status': 200, 'pedidos': []}
+
+    def responder(request: httpx.Request) -> httpx.Response:
+        estado['pedidos'].append(request)
+        return httpx.Response(estado['status'], json={})
+
+    cliente = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(responder))
+    monkeypatch.setattr(integracao_legalmind.httpx, 'AsyncClient', cliente)
+    monkeypatch.setattr(integracao_legalmind, 'ensure_legalmind_running_async', AsyncMock(return_value=True))
+    monkeypatch.setattr(settings, 'LEGALMIND_API_URL', 'http://legalmind.local/')
+    monkeypatch.setattr(settings, 'LEGALMIND_API_KEY', 'chave')
+    return estado
+
+
+async def test_delta_enviado_ao_endpoint_incremental(legalmind):
+    upserts = [{'numero_processo': '0001234-56.2024.8.27.2716'}]
+
+    assert await enviar_delta_relatorio_concluso(upserts, ['0009999-11.2023.8.27.2716']) is True
+
+    pedido = legalmind['pedidos'][0]
+    assert pedido.url == 'http://legalmind.local/relatorios/conclusos/delta'
+    assert pedido.headers['Authorization'] == 'chave'
+    assert json.loads(pedido.content) == {'upserts': upserts, 'removidos': ['0009999-11.2023.8.27.2716']}
+
+
+@pytest.mark.parametrize('status', [404, 405])
+async def test_api_sem_suporte_a_delta_retorna_none(legalmind, status):
+    legalmind['status'] = status
+    assert await enviar_delta_relatorio_concluso([], ['0009999-11.2023.8.27.2716']) is None
+
+
+async def test_erro_da_api_no_delta_retorna_false(legalmind):
+    legalmind['status'] = 500
+    assert await enviar_delta_relatorio_concluso([], ['0009999-11.2023.8.27.2716']) is False
+
+
+async def test_falha_de_conexao_no_delta_retorna_false(legalmind):
+    with patch.object(integracao_legalmind.httpx, 'AsyncClient', side_effect=httpx.ConnectError('recusada')):
+        assert await enviar_delta_relatorio_concluso([], []) is False
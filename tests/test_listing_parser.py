@@ -0,0 +1,92 @@
+import io
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from benchmarks.mock_eproc import PREFIXO, MockConfig, criar_app
+from src.utils.listing_parser import CAMPO_PAGINA, encontrar_colunas, extrair_listagem
+
+HTML_LISTAGEM = '''
+<form method="post" action="controlador.php?acao=localizador_processos_listar&id=3">
+  <input type="hidden" name="hdnInfraPaginaAtual" value="1">
+  <input type="submit" id="sbmExcel" name="sbmExcel" value="Gerar Planilha">
+  <select id="selInfraPaginacaoSuperior" name="selInfraPaginacaoSuperior">
+    <option value="0">1</option><option value="1" selected>2</option><option value="2">3</option>
+  </select>
+  <table><tr><td>Filtros</td></tr></table>
+  <table class="infraTable">
+    <tr><th>Número Processo</th><th>Classe</th><th>Inclusão no Localizador</th></tr>
+    <tr>
+      <td><a href="#">0001234-56.2024.8.27.2729</a>
+        <table><tr><td>Sigiloso</td></tr></table>
+      </td>
+      <td>PROCEDIMENTO COMUM</td><td> 10/03/2026
+        14:05:00 </td>
+    </tr>
+    <tr><td>Sem número</td><td>-</td><td>-</td></tr>
+    <tr><td>0007654-32.2025.8.27.2729</td><td>EXECUÇÃO FISCAL</td><td>11/03/2026 09:00:00</td></tr>
+  </table>
+</form>
+'''
+
+
+def test_extrai_linhas_paginacao_e_formulario():
+    listagem = extrair_listagem(HTML_LISTAGEM)
+
+    assert listagem.processos == [
+        {'processo': '0001234-56.2024.8.27.2729', 'data_inclusao': '10/03/2026 14:05:00'},
+        {'processo': '0007654-32.2025.8.27.2729', 'data_inclusao': '11/03/2026 09:00:00'},
+    ]
+    assert (listagem.pagina_atual, listagem.total_paginas) == (1, 3)
+    assert listagem.formulario['method'] == 'post'
+    assert listagem.formulario['action'].endswith('&id=3')
+    assert listagem.formulario['campos'] == {CAMPO_PAGINA: '1', 'selInfraPaginacaoSuperior': '1'}
+
+
+def test_listagem_sem_tabela_de_processos():
+    listagem = extrair_listagem('<html><body><p>Nenhum registro encontrado.</p></body></html>')
+    assert listagem.processos == []
+    assert (listagem.pagina_atual, listagem.total_paginas, listagem.formulario) == (0, 1, None)
+
+
+def test_encontrar_colunas():
+    assert encontrar_colunas(['Classe', 'Número Processo', 'Data Inclusão no Localizador']) == (
+        'Número Processo',
+        'Data Inclusão no Localizador',
+    )
+    assert encontrar_colunas(['Classe']) == (None, None)
+
+
+def test_listagem_paginada_do_mock_equivale_ao_excel():
+    config = MockConfig(localizadores={'URGENTE': 250}, itens_por_pagina=100)
+    client = TestClient(criar_app(config))
+    client.post(f'{PREFIXO}/', data={'txtUsuario': config.login, 'pwdSenha': config.senha})
+    url = f'{PREFIXO}/controlador.php?acao=localizador_processos_listar&id=0'
+
+    primeira = extrair_listagem(client.get(url).text)
+    assert (primeira.pagina_atual, primeira.total_paginas) == (0, 3)
+    processos = list(primeira.processos)
+    for pagina in range(1, primeira.total_paginas):
+        campos = {**primeira.formulario['campos'], CAMPO_PAGINA: str(pagina)}
+        processos += extrair_listagem(client.post(url, data=campos).text).processos
+
+    df = pd.read_excel(io.BytesIO(client.post(url, data={'sbmExcel': '1'}).content), header=1, dtype=str)
+    assert len(processos) == 250
+    assert [p['processo'] for p in processos] == df['Número Processo'].tolist()
+    assert [p['data_inclusao'] for p in processos] == df['Inclusão no Localizador'].tolist()
+
+
+def test_fingerprint_considera_todas_as_paginas():
+    from src.scripts.loc_base import LocBaseScraper
+
+    processos = [{'processo': f'000000{i}-00.2026.8.27.2729', 'data_inclusao': '01/03/2026'} for i in range(3)]
+    base = LocBaseScraper.fingerprint_listagem(processos, '3')
+
+    # Um processo sai e outro entra em uma página posterior: mesmo total, outra impressão digital
+    trocado = processos[:2] + [{'processo': '0000009-00.2026.8.27.2729', 'data_inclusao': '02/03/2026'}]
+    assert LocBaseScraper.fingerprint_listagem(trocado, '3') != base
+    assert LocBaseScraper.fingerprint_listagem(list(reversed(processos)), '3') == base
+
+    # Listagem incompleta ou ilegível não permite o atalho "sem alterações"
+    assert LocBaseScraper.fingerprint_listagem(processos[:2], '3') is None
+    assert LocBaseScraper.fingerprint_listagem(None, '3') is None
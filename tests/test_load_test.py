@@ -0,0 +1,26 @@
+from benchmarks.load_test import execucao_simulada, executar_carga, percentil
+from src import main
+from src.config import settings
+
+
+def test_percentil_interpola_amostras():
+    assert percentil([], 95) == 0.0
+    assert percentil([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert percentil([1.0, 2.0], 90) == 1.9
+
+
+async def test_carga_simulada_relata_latencia_erros_e_fila(monkeypatch):
+    monkeypatch.setattr(main, '_executar_no_navegador', execucao_simulada(0.02, variacao=0))
+    monkeypatch.setattr(settings, 'EXECUTION_SLOTS', 2)
+
+    dados = await executar_carga(['loc_urgente', 'nao_existe'], requisicoes=12, concorrencia=4)
+
+    assert dados['requisicoes'] == 12
+    assert dados['erros'] == {'404': 6}
+    assert dados['taxa_erro'] == 0.5
+    assert dados['latencia_ms']['p50'] >= 20
+    assert dados['latencia_ms']['p99'] <= dados['latencia_ms']['max']
+    assert dados['vazao_rps'] > 0
+    assert dados['recursos']['python']['rss_pico_mb'] > 0
+    assert dados['fila']['slots'] == 2
+    assert dados['fila']['scripts']['loc_urgente']['execucao']['max_s'] >= 0.02
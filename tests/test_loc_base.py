@@ -0,0 +1,144 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.config import settings
+from src.scripts.loc_base import LocBaseScraper
+from src.utils.state_store import load_state, save_state
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+PROCESSOS = [
+    {'processo': f'000000{i}-00.2026.8.27.2729', 'data_inclusao': '01/03/2026 10:00:00'} for i in range(3)
+]
+
+
+class _Elemento:
+    """Locator falso do Playwright: esperas e ações concluem imediatamente."""
+
+    def __init__(self, texto: str = ''):
+        self.texto = texto
+        self.first = self
+
+    async def wait_for(self, **kwargs):
+        pass
+
+    async def fill(self, valor):
+        pass
+
+    async def press(self, tecla):
+        pass
+
+    async def click(self, **kwargs):
+        pass
+
+    async def is_visible(self):
+        return True
+
+    async def inner_text(self):
+        return self.texto
+
+    async def all(self):
+        return [self]
+
+    def filter(self, **kwargs):
+        return self
+
+    def locator(self, seletor):
+        # Link "Total de processos" na linha do localizador
+        return _Elemento(str(len(PROCESSOS)))
+
+
+class _Pagina:
+    async def wait_for_load_state(self, *args, **kwargs):
+        pass
+
+    async def content(self):
+        return '<html></html>'
+
+    def locator(self, seletor):
+        return _Elemento('TESTE Localizador de teste 3')
+
+
+class _LocTeste(LocBaseScraper):
+    LOCATOR_NAME = 'TESTE'
+
+
+@pytest.fixture
+def scraper():
+    scraper = _LocTeste()
+    scraper.navigate_to_home = AsyncMock()
+    scraper.login = AsyncMock()
+    scraper.extrair_listagem_html = AsyncMock(return_value=list(PROCESSOS))
+    scraper.baixar_excel = AsyncMock()
+    return scraper
+
+
+@pytest.fixture
+def sheets():
+    with patch('src.scripts.loc_base.salvar_processos_no_sheets', new=MagicMock(return_value=[])) as sheets:
+        yield sheets
+
+
+def _gravar_estado_atual(scraper):
+    save_state(
+        scraper.STATE_NAME,
+        {'total': '3', 'fingerprint': LocBaseScraper.fingerprint_listagem(PROCESSOS, '3')},
+    )
+
+
+async def test_localizador_inalterado_pula_a_sincronizacao(scraper, sheets):
+    _gravar_estado_atual(scraper)
+
+    resultado = await scraper.run(_Pagina())
+
+    assert resultado.success
+    assert resultado.data['sem_alteracoes'] is True
+    sheets.assert_not_called()
+    scraper.baixar_excel.assert_not_called()
+
+
+async def test_full_sync_ignora_o_atalho(scraper, sheets, monkeypatch):
+    _gravar_estado_atual(scraper)
+    monkeypatch.setattr(settings, 'LOCATOR_FORCE_FULL_SYNC', True)
+    monkeypatch.setattr(settings, 'LOCATOR_EXTRACTION_MODE', 'excel')
+    scraper.ler_excel = AsyncMock(return_value=list(PROCESSOS))
+
+    resultado = await scraper.run(_Pagina())
+
+    assert resultado.success
+    assert 'sem_alteracoes' not in resultado.data
+    sheets.assert_called_once()
+    # Sem o atalho, a listagem não é lida à toa: os processos vêm só do Excel
+    scraper.extrair_listagem_html.assert_not_awaited()
+    scraper.baixar_excel.assert_awaited_once()
+    assert load_state(scraper.STATE_NAME)['fingerprint'] == LocBaseScraper.fingerprint_listagem(PROCESSOS, '3')
+
+
+async def test_listagem_lida_dispensa_o_excel_e_grava_o_estado(scraper, sheets, monkeypatch):
+    monkeypatch.setattr(settings, 'LOCATOR_EXTRACTION_MODE', 'excel')
+
+    resultado = await scraper.run(_Pagina())
+
+    assert resultado.success
+    scraper.baixar_excel.assert_not_called()
+    assert sheets.call_args.kwargs['dados_processos'] == PROCESSOS
+    assert load_state(scraper.STATE_NAME)['fingerprint'] == LocBaseScraper.fingerprint_listagem(PROCESSOS, '3')
+
+
+async def test_estado_nao_e_gravado_se_o_sheets_falhar(scraper, sheets):
+    sheets.side_effect = RuntimeError('quota')
+
+    await scraper.run(_Pagina())
+
+    assert load_state(scraper.STATE_NAME) == {}
+
+
+async def test_estado_nao_e_gravado_se_o_legalmind_falhar(scraper, sheets):
+    sheets.return_value = PROCESSOS[:1]
+
+    with patch('src.utils.integracao_legalmind.enviar_para_legalmind', new=AsyncMock(return_value=False)):
+        resultado = await scraper.run(_Pagina())
+
+    assert not resultado.success
+    assert load_state(scraper.STATE_NAME) == {}
@@ -1,7 +1,12 @@
 # Definir as enums ambientes cruciais antes da inicialização do app para os testes.
+import asyncio
+import contextlib
 import os
+import time
 from unittest.mock import AsyncMock, patch
 
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 
 os.environ['API_KEY'] = 'test-api-key'
@@ -49,6 +54,16 @@ def test_agendar_script_com_auth(mock_execute):
     assert data['message'] == 'Script finalizado com sucesso'
     assert mock_execute.call_count == 1
 
+@patch('src.main.execute_script', new_callable=AsyncMock)
+def test_agendar_script_com_trace(mock_execute):
+    """O parâmetro ?trace=true solicita a captura de trace/HAR da execução."""
+    mock_execute.return_value = ScraperResult(success=True, message='ok')
+    headers = {'X-API-Key': 'test-api-key'}
+    response = client.post('/run/test_script?trace=true', headers=headers)
+
+    assert response.status_code == 200
+    assert mock_execute.call_args.kwargs['capturar'] is True
+
 def test_agendar_script_nao_encontrado():
     """Testa se passar um script inválido retorna corretamente um erro 404."""
     headers = {'X-API-Key': 'test-api-key'}
@@ -57,3 +72,136 @@ def test_agendar_script_nao_encontrado():
     response = client.post('/run/script_inexistente', headers=headers)
     assert response.status_code == 404
     assert str('Não encontrado' in response.json().get('detail', '')) or str('não encontrado' in response.json().get('detail', ''))
+
+
+class _Elemento:
+    """Locator falso do Playwright: esperas e ações concluem imediatamente."""
+
+    def __init__(self, texto: str = ''):
+        self.texto = texto
+        self.first = self
+
+    async def wait_for(self, **kwargs):
+        pass
+
+    async def fill(self, valor):
+        pass
+
+    async def press(self, tecla):
+        pass
+
+    async def click(self, **kwargs):
+        pass
+
+    async def is_visible(self):
+        return True
+
+    async def inner_text(self):
+        return self.texto
+
+    async def all(self):
+        return [self]
+
+    def filter(self, **kwargs):
+        return self
+
+    def locator(self, seletor):
+        # Link "Total de processos" na linha do localizador
+        return _Elemento('30')
+
+
+class _PaginaLocalizador:
+    """Página falsa que exibe a listagem do localizador gerada pelo mock do eproc."""
+
+    url = 'http://eproc.local/eproc/controlador.php?acao=localizador_processos_listar&id=0'
+
+    def __init__(self, html: str):
+        self.html = html
+
+    async def wait_for_load_state(self, *args, **kwargs):
+        pass
+
+    async def content(self):
+        return self.html
+
+    def locator(self, seletor):
+        return _Elemento('URGENTE Localizador do órgão 30')
+
+
+@pytest.mark.asyncio
+async def test_api_responsiva_durante_sincronizacao(tmp_path, monkeypatch):
+    """
+    Executa o run() real de um localizador pela API, com googleapiclient e httpx falsos: a
+    chamada bloqueante do Sheets (1s) vai para o pool de threads e a API continua respondendo.
+    """
+    from benchmarks.data_path import FakeSheets, legalmind_falso
+    from benchmarks.mock_eproc import PREFIXO, MockConfig, criar_app
+    from src.main import _run_scraper
+    from src.scripts.loc_base import LocBaseScraper
+
+    monkeypatch.chdir(tmp_path)
+    config = MockConfig(localizadores={'URGENTE': 30})
+    eproc = TestClient(criar_app(config))
+    eproc.post(f'{PREFIXO}/', data={'txtUsuario': config.login, 'pwdSenha': config.senha})
+    listagem = eproc.get(f'{PREFIXO}/controlador.php?acao=localizador_processos_listar&id=0').text
+
+    class SheetsLento(FakeSheets):
+        def get(self, **kwargs):
+            time.sleep(0.5)  # Latência da API do Google, como no .execute() real
+            return super().get(**kwargs)
+
+    sheets = SheetsLento([])
+    credenciais = tmp_path / 'credentials.json'
+    credenciais.write_text('{}')
+
+    async def navegador_falso(scraper, script_name, headless, capturar=None):
+        return await _run_scraper(scraper, script_name, _PaginaLocalizador(listagem))
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {'X-API-Key': 'test-api-key'}
+    with contextlib.ExitStack() as pilha:
+        legalmind_falso(pilha)
+        for patch_ in (
+            patch('src.main._executar_no_navegador', new=navegador_falso),
+            patch.object(LocBaseScraper, 'navigate_to_home', new=AsyncMock()),
+            patch.object(LocBaseScraper, 'login', new=AsyncMock()),
+            patch('googleapiclient.discovery.build', new=lambda *args, **kwargs: sheets),
+            patch('google.oauth2.service_account.Credentials.from_service_account_file', new=lambda *a, **k: None),
+            patch.object(settings, 'GOOGLE_APPLICATION_CREDENTIALS', str(credenciais)),
+            patch.object(settings, 'GOOGLE_SHEETS_SPREADSHEET_ID', 'planilha-teste'),
+            patch.object(settings, 'LOCATOR_EXTRACTION_MODE', 'html'),
+        ):
+            pilha.enter_context(patch_)
+
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as ac:
+            run_task = asyncio.create_task(ac.post('/run/loc_urgente', headers=headers))
+
+            # Consulta a API durante toda a execução: um event loop travado abre um intervalo
+            # entre respostas do tamanho da chamada bloqueante
+            respostas = [time.perf_counter()]
+            while not run_task.done():
+                response = await ac.get('/')
+                assert response.status_code == 200
+                respostas.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+            run_response = await run_task
+            duracao = time.perf_counter() - respostas[0]
+
+    assert run_response.status_code == 200
+    assert duracao >= 1.0
+    assert max(b - a for a, b in zip(respostas, respostas[1:], strict=False)) < 0.3
+    resultado = run_response.json()
+    assert resultado['success'], resultado['message']
+    assert resultado['data']['processos_adicionados'] == 30
+    assert resultado['data']['integrado']
+    assert len(sheets.inseridas) == 30
+
+
+def test_desligamento_da_api_encerra_os_pools():
+    """O fim do lifespan da API encerra o pool de threads de I/O."""
+    from src.utils import async_io
+
+    with TestClient(app):
+        async_io._get_io_executor()
+    assert async_io._io_executor is None
@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.main import app
+from src.utils.metrics import (
+    GOOGLE_API_DURACAO,
+    LINHAS_EXTRAIDAS,
+    Counter,
+    Histogram,
+    medir_google,
+    registrar_execucao,
+    registro,
+)
+
+
+@pytest.fixture(autouse=True)
+def limpar_metricas():
+    registro.limpar()
+    yield
+    registro.limpar()
+
+
+def test_histograma_acumula_buckets():
+    hist = Histogram('teste_duracao_segundos', 'Teste.', ('script',), buckets=(1, 5))
+    hist.observe('loc_urgente', valor=0.5)
+    hist.observe('loc_urgente', valor=3)
+    hist.observe('loc_urgente', valor=10)
+
+    texto = hist.expor()
+    assert '# TYPE teste_duracao_segundos histogram' in texto
+    assert 'teste_duracao_segundos_bucket{script="loc_urgente",le="1"} 1' in texto
+    assert 'teste_duracao_segundos_bucket{script="loc_urgente",le="5"} 2' in texto
+    assert 'teste_duracao_segundos_bucket{script="loc_urgente",le="+Inf"} 3' in texto
+    assert 'teste_duracao_segundos_sum{script="loc_urgente"} 13.5' in texto
+    assert 'teste_duracao_segundos_count{script="loc_urgente"} 3' in texto
+
+
+def test_contador_valida_rotulos_e_valor():
+    contador = Counter('teste_total', 'Teste.', ('script',))
+    contador.inc('a', valor=3)
+    assert contador.valor('a') == 3
+    with pytest.raises(ValueError):
+        contador.inc()
+    with pytest.raises(ValueError):
+        contador.inc('a', valor=-1)
+
+
+def test_registrar_execucao_inclui_fases():
+    timings = {
+        'nome': 'loc_urgente',
+        'duracao_s': 12.0,
+        'filhos': [{'nome': 'login', 'duracao_s': 2.0}],
+    }
+    registrar_execucao('loc_urgente', True, 12.0, timings)
+
+    texto = registro.expor()
+    assert (
+        'eproc_execucao_duracao_segundos_count{script="loc_urgente",resultado="sucesso"} 1' in texto
+    )
+    assert 'eproc_fase_duracao_segundos_count{script="loc_urgente",fase="login"} 1' in texto
+
+
+def test_medir_google_registra_erro():
+    with pytest.raises(RuntimeError), medir_google('sheets', 'ler_dados'):
+        raise RuntimeError('quota')
+    with medir_google('sheets', 'ler_dados'):
+        pass
+
+    assert GOOGLE_API_DURACAO.contagem('sheets', 'ler_dados', 'erro') == 1
+    assert GOOGLE_API_DURACAO.contagem('sheets', 'ler_dados', 'sucesso') == 1
+
+
+def test_endpoint_metrics(monkeypatch):
+    LINHAS_EXTRAIDAS.inc('relatorio_conclusos', valor=42)
+    client = TestClient(app)
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'eproc_linhas_extraidas_total{script="relatorio_conclusos"} 42' in response.text
+
+    monkeypatch.setattr(settings, 'METRICS_REQUIRE_API_KEY', True)
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'X-API-Key': settings.API_KEY}).status_code == 200
@@ -0,0 +1,87 @@
+import io
+import re
+
+import pandas as pd
+import pyotp
+from fastapi.testclient import TestClient
+
+from benchmarks.mock_eproc import PREFIXO, MockConfig, criar_app
+from src.scripts.base import SELETOR_PAINEL
+
+REGEX_PROCESSO = re.compile(r'\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}')
+
+
+def _logar(client: TestClient, config: MockConfig):
+    return client.post(f'{PREFIXO}/', data={'txtUsuario': config.login, 'pwdSenha': config.senha})
+
+
+def test_login_com_2fa_e_perfil():
+    config = MockConfig(segredo_2fa=pyotp.random_base32(), perfil='DIRETOR DE SECRETARIA')
+    client = TestClient(criar_app(config))
+
+    assert 'txtUsuario' in client.get(f'{PREFIXO}/').text
+    assert 'txtAcessoCodigo' in _logar(client, config).text
+
+    codigo = pyotp.TOTP(config.segredo_2fa).now()
+    pagina = client.post(f'{PREFIXO}/2fa', data={'txtAcessoCodigo': codigo}).text
+    assert 'DIRETOR DE SECRETARIA' in pagina
+
+    painel = client.post(f'{PREFIXO}/perfil', data={'perfil': config.perfil}).text
+    assert SELETOR_PAINEL.lstrip('#') in painel
+    assert 'txtUsuario' not in painel
+
+
+def test_senha_invalida_exibe_erro():
+    client = TestClient(criar_app())
+    pagina = client.post(f'{PREFIXO}/', data={'txtUsuario': 'mock', 'pwdSenha': 'errada'}).text
+    assert 'divInfraExcecao' in pagina
+
+
+def test_planilha_do_localizador_no_formato_do_eproc():
+    config = MockConfig(localizadores={'URGENTE': 25})
+    client = TestClient(criar_app(config))
+    _logar(client, config)
+
+    tabela = client.get(
+        f'{PREFIXO}/controlador.php',
+        params={'acao': 'localizador_orgao_listar', 'txtSiglaDescricaoLocalizador': 'urgente'},
+    ).text
+    assert 'localizador_processos_listar' in tabela
+    assert '>25</a>' in tabela
+
+    resposta = client.post(f'{PREFIXO}/controlador.php?acao=localizador_processos_listar&id=0', data={'sbmExcel': '1'})
+    assert resposta.headers['content-disposition'].startswith('attachment')
+    df = pd.read_excel(io.BytesIO(resposta.content), header=1, dtype=str)
+    assert len(df) == 25
+    assert 'Inclusão no Localizador' in df.columns
+    assert all(REGEX_PROCESSO.fullmatch(p) for p in df['Número Processo'])
+
+
+def test_relatorio_conclusos_gera_excel():
+    config = MockConfig(linhas_conclusos=30)
+    client = TestClient(criar_app(config))
+    _logar(client, config)
+
+    resposta = client.post(f'{PREFIXO}/controlador.php?acao=relatorio_estatistico', data={'sbmExcel': '1'})
+    df = pd.read_excel(io.BytesIO(resposta.content), dtype=str)
+    assert len(df) == 30
+    assert {'PROCESSO', 'DIAS', 'MAGISTRADO'} <= set(df.columns)
+
+
+def test_paginas_internas_exigem_sessao():
+    client = TestClient(criar_app())
+    pagina = client.get(f'{PREFIXO}/controlador.php', params={'acao': 'relatorio_alvara'}).text
+    assert 'txtUsuario' in pagina
+
+
+def test_e2e_detecta_regressao_por_fase():
+    from benchmarks.e2e import fases, medianas, regressoes
+
+    timings = {'nome': 'loc_urgente', 'duracao_s': 12.0, 'filhos': [{'nome': 'login', 'duracao_s': 4.0}]}
+    atual = {'loc_urgente': medianas([fases(timings), fases({**timings, 'duracao_s': 10.0})])}
+    assert atual == {'loc_urgente': {'login': 4.0, 'total': 11.0}}
+
+    assert regressoes(atual, {'loc_urgente': {'total': 10.0, 'login': 1.0}}) == [
+        'loc_urgente/login: 4.00s (baseline 1.00s)'
+    ]
+    assert regressoes(atual, {'loc_urgente': {'total': 9.0}}) == []
@@ -0,0 +1,72 @@
+import pytest
+
+from src.config import settings
+from src.utils.pipeline import CheckpointedPipeline
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+FASES = ['download', 'persistir', 'upload_drive', 'enviar_legalmind']
+
+
+@pytest.mark.asyncio
+async def test_retomada_a_partir_da_fase_pendente():
+    pipeline = CheckpointedPipeline.retomar_ou_iniciar('relatorio', FASES)
+    assert not pipeline.retomada
+
+    pipeline.registrar('download', {'incremental': False})
+    await pipeline.executar('persistir', _async({'caminho': 'relatorio.xlsx'}))
+    with pytest.raises(RuntimeError):
+        await pipeline.executar('upload_drive', _falha)
+
+    retomado = CheckpointedPipeline.retomar_ou_iniciar('relatorio', FASES)
+    assert retomado.run_id == pipeline.run_id
+    assert retomado.retomada
+    assert retomado.proxima_fase == 'upload_drive'
+
+    # Fases concluídas não são executadas novamente
+    assert await retomado.executar('persistir', _falha) == {'caminho': 'relatorio.xlsx'}
+    await retomado.executar('upload_drive', _async('drive-id'))
+    await retomado.executar('enviar_legalmind', _async({'total': 10}))
+    assert retomado.proxima_fase is None
+    retomado.finalizar()
+
+    novo = CheckpointedPipeline.retomar_ou_iniciar('relatorio', FASES)
+    assert novo.run_id != pipeline.run_id
+    assert not novo.retomada
+
+
+def test_descarta_checkpoint_invalido_ou_esgotado(monkeypatch):
+    monkeypatch.setattr(settings, 'PIPELINE_MAX_TENTATIVAS', 1)
+    descartados = []
+
+    pipeline = CheckpointedPipeline('relatorio', FASES)
+    pipeline.registrar('download')
+
+    # Validação falha (ex: artefato removido do disco): inicia nova execução
+    novo = CheckpointedPipeline.retomar_ou_iniciar(
+        'relatorio', FASES, validar=lambda p: False, ao_descartar=descartados.append
+    )
+    assert novo.run_id != pipeline.run_id
+    assert [p.run_id for p in descartados] == [pipeline.run_id]
+
+    outro = CheckpointedPipeline('relatorio', FASES)
+    outro.registrar('download')
+    assert CheckpointedPipeline.retomar_ou_iniciar('relatorio', FASES).run_id == outro.run_id
+    # Limite de tentativas atingido
+    assert CheckpointedPipeline.retomar_ou_iniciar('relatorio', FASES).run_id != outro.run_id
+
+
+def test_fase_desconhecida():
+    with pytest.raises(ValueError):
+        CheckpointedPipeline('relatorio', FASES).registrar('inexistente')
+
+
+def _async(valor):
+    async def _func():
+        return valor
+
+    return _func
+
+
+async def _falha():
+    raise RuntimeError('falhou')
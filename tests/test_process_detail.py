@@ -0,0 +1,90 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.mock_eproc import PREFIXO, MockConfig, criar_app, detalhe_processo
+from src.utils import process_detail
+from src.utils.process_detail import buscar_detalhes, detalhe_em_cache, extrair_detalhe
+
+PROCESSOS = ['0001234-56.2024.8.27.2729', '0007654-32.2025.8.27.2729']
+
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+
+@pytest.fixture
+def client():
+    config = MockConfig()
+    client = TestClient(criar_app(config))
+    client.post(f'{PREFIXO}/', data={'txtUsuario': config.login, 'pwdSenha': config.senha})
+    return client
+
+
+class PaginaFalsa:
+    """Responde ao page.evaluate do enriquecimento com as páginas do mock, na ordem pedida."""
+
+    def __init__(self, client: TestClient):
+        self.client = client
+        self.pedidos: list[str] = []
+
+    async def evaluate(self, script, argumentos):
+        self.pedidos += argumentos['processos']
+        url = f'{PREFIXO}/controlador.php?acao=processo_selecionar&num_processo='
+        return [self.client.get(url + numero.replace('-', '').replace('.', '')).text for numero in argumentos['processos']]
+
+
+def test_extrai_detalhe_da_pagina_do_processo(client):
+    html = client.get(f'{PREFIXO}/controlador.php', params={'acao': 'processo_selecionar', 'num_processo': PROCESSOS[0]}).text
+
+    esperado = detalhe_processo(MockConfig(), PROCESSOS[0])
+    detalhe = extrair_detalhe(html, max_eventos=2)
+    assert detalhe['classe'] == esperado['classe']
+    assert detalhe['partes'] == esperado['partes']
+    assert detalhe['eventos'] == esperado['eventos'][:2]
+
+
+def test_pagina_sem_detalhes_retorna_none():
+    assert extrair_detalhe('<html><body><div id="divInfraExcecao">Sessão expirada</div></body></html>') is None
+
+
+def test_partes_sem_span_usam_texto_da_celula():
+    html = (
+        '<table id="tblPartesERepresentantes"><tr><th>EXEQUENTE</th><th>EXECUTADO</th></tr>'
+        '<tr><td> MUNICÍPIO DE PALMAS </td><td><table><tr><td>x</td></tr></table></td></tr></table>'
+    )
+    assert extrair_detalhe(html)['partes'] == [
+        {'polo': 'EXEQUENTE', 'nome': 'MUNICÍPIO DE PALMAS'},
+        {'polo': 'EXECUTADO', 'nome': 'x'},
+    ]
+
+
+def test_buscar_detalhes_usa_cache_ate_expirar(client, state_dir):
+    pagina = PaginaFalsa(client)
+
+    detalhes = asyncio.run(buscar_detalhes(pagina, PROCESSOS + PROCESSOS[:1]))
+    assert list(detalhes) == PROCESSOS
+    assert pagina.pedidos == PROCESSOS
+
+    assert asyncio.run(buscar_detalhes(pagina, PROCESSOS)) == detalhes
+    assert pagina.pedidos == PROCESSOS
+
+    # Expira o cache do primeiro processo (a validade vem do mtime): só ele é buscado de novo
+    caminho = state_dir / 'data' / 'state' / process_detail.SUBDIR_CACHE / f'{PROCESSOS[0]}.json'
+    dois_dias_atras = time.time() - 2 * 24 * 3600
+    os.utime(caminho, (dois_dias_atras, dois_dias_atras))
+    assert detalhe_em_cache(PROCESSOS[0]) is None
+
+    asyncio.run(buscar_detalhes(pagina, PROCESSOS))
+    assert pagina.pedidos == PROCESSOS + PROCESSOS[:1]
+
+
+def test_falhas_nao_entram_no_cache(state_dir):
+    class PaginaComErro:
+        async def evaluate(self, script, argumentos):
+            return [None for _ in argumentos['processos']]
+
+    assert asyncio.run(buscar_detalhes(PaginaComErro(), PROCESSOS)) == {}
+    assert not os.path.exists(state_dir / 'data' / 'state' / process_detail.SUBDIR_CACHE)
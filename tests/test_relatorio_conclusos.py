@@ -1,7 +1,16 @@
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, patch
 
+import pandas as pd
 import pytest
 
+from src.config import settings
+from src.scripts import relatorio_conclusos
 from src.scripts.relatorio_conclusos import RelatorioConclusos
+from src.utils.pipeline import CheckpointedPipeline
+from src.utils.report_processing import hash_relatorio
+from src.utils.snapshot_store import load_snapshot, save_snapshot
+from src.utils.state_store import save_state
 
 
 @pytest.fixture
@@ -16,3 +25,268 @@ async def test_relatorio_conclusos_initialization(relatorio_scraper):
 async def test_relatorio_run_method_exists(relatorio_scraper):
     assert hasattr(relatorio_scraper, 'run')
     assert callable(relatorio_scraper.run)
+
+
+def test_hash_relatorio_ignora_dias_e_ordem():
+    ontem = pd.DataFrame({
+        'PROCESSO': ['0001234-56.2024.8.27.2716', '0009999-11.2023.8.27.2716'],
+        'DIAS': ['3', '10'],
+    })
+    hoje = pd.DataFrame({
+        'PROCESSO': ['0009999-11.2023.8.27.2716 ', '0001234-56.2024.8.27.2716'],
+        'DIAS': ['11', '4'],
+    })
+    assert hash_relatorio(ontem) == hash_relatorio(hoje)
+
+
+def test_hash_relatorio_detecta_alteracao():
+    antes = pd.DataFrame({'PROCESSO': ['0001234-56.2024.8.27.2716'], 'MOVIMENTO': ['Conclusos']})
+    depois = pd.DataFrame({'PROCESSO': ['0001234-56.2024.8.27.2716'], 'MOVIMENTO': ['Despacho']})
+    assert hash_relatorio(antes) != hash_relatorio(depois)
+
+
+def test_janela_incremental(relatorio_scraper, monkeypatch):
+    monkeypatch.setattr(settings, 'CONCLUSOS_INCREMENTAL', True)
+    monkeypatch.setattr(settings, 'CONCLUSOS_FULL_REFRESH_DIAS', 7)
+    ontem = datetime.now() - timedelta(days=1)
+    estado = {
+        'ultima_execucao': ontem.isoformat(),
+        'ultima_atualizacao_completa': (datetime.now() - timedelta(days=3)).isoformat(),
+    }
+    snapshot = {'0001234-56.2024.8.27.2716': {'hash': 'x', 'registro': {}}}
+
+    assert relatorio_scraper.inicio_janela_incremental(estado, snapshot) == ontem.date()
+    # Sem snapshot local não há o que mesclar: relatório completo
+    assert relatorio_scraper.inicio_janela_incremental(estado, {}) is None
+
+
+def test_janela_incremental_atualizacao_completa_periodica(relatorio_scraper, monkeypatch):
+    monkeypatch.setattr(settings, 'CONCLUSOS_INCREMENTAL', True)
+    monkeypatch.setattr(settings, 'CONCLUSOS_FULL_REFRESH_DIAS', 7)
+    estado = {
+        'ultima_execucao': datetime.now().isoformat(),
+        'ultima_atualizacao_completa': (datetime.now() - timedelta(days=8)).isoformat(),
+    }
+    snapshot = {'0001234-56.2024.8.27.2716': {'hash': 'x', 'registro': {}}}
+
+    assert relatorio_scraper.inicio_janela_incremental(estado, snapshot) is None
+
+
+@pytest.mark.asyncio
+async def test_run_retoma_sem_gerar_relatorio_novamente(relatorio_scraper, state_dir, monkeypatch):
+    monkeypatch.setattr(settings, 'GOOGLE_DRIVE_FOLDER_ID', None)
+
+    # Run anterior: relatório baixado e persistido, falha no envio ao LegalMind
+    artefato = state_dir / 'relatorio.xlsx'
+    pd.DataFrame({'PROCESSO': ['0001234-56.2024.8.27.2716'], 'DIAS': ['3']}).to_excel(artefato, index=False)
+    anterior = CheckpointedPipeline(relatorio_conclusos.PIPELINE_NAME, relatorio_conclusos.FASES_PIPELINE)
+    anterior.registrar('download', {'incremental': False, 'inicio_execucao': datetime.now().isoformat()})
+    anterior.registrar('persistir', {'caminho': str(artefato)})
+    anterior.registrar('upload_drive', None)
+
+    with (
+        patch.object(RelatorioConclusos, 'baixar_relatorio', new_callable=AsyncMock) as mock_baixar,
+        patch.object(
+            relatorio_conclusos, 'enviar_relatorio_concluso', new_callable=AsyncMock, return_value=True
+        ) as mock_enviar,
+    ):
+        result = await relatorio_scraper.run(AsyncMock())
+
+    assert result.success is True
+    assert result.data['run_id'] == anterior.run_id
+    mock_baixar.assert_not_called()
+    mock_enviar.assert_called_once()
+    assert not artefato.exists()
+
+
+RELATORIO = pd.DataFrame({'PROCESSO': ['0001234-56.2024.8.27.2716'], 'DIAS': ['3']})
+
+
+async def _executar_com_hash_anterior(scraper, hash_anterior: str):
+    """Executa o run() com um relatório completo baixado e o hash informado no estado anterior."""
+    save_state(relatorio_conclusos.STATE_NAME, {'hash': hash_anterior, 'duracao_sincronizacao': 42.5})
+
+    async def baixar(page, inicio_janela, caminho):
+        RELATORIO.to_excel(caminho, index=False)
+        return False
+
+    with (
+        patch.object(RelatorioConclusos, 'baixar_relatorio', new=AsyncMock(side_effect=baixar)),
+        patch.object(RelatorioConclusos, 'enviar_drive', new_callable=AsyncMock, return_value=None) as drive,
+        patch.object(
+            RelatorioConclusos, 'integrar_legalmind', new_callable=AsyncMock, return_value={'total': 1}
+        ) as legalmind,
+    ):
+        result = await scraper.run(AsyncMock())
+    return result, drive, legalmind
+
+
+@pytest.fixture
+def sem_sincronizacao_forcada(monkeypatch):
+    monkeypatch.setattr(settings, 'CONCLUSOS_FORCE_SYNC', False)
+
+
+@pytest.mark.usefixtures('state_dir', 'sem_sincronizacao_forcada')
+async def test_run_com_hash_igual_pula_drive_e_legalmind(relatorio_scraper):
+    result, drive, legalmind = await _executar_com_hash_anterior(relatorio_scraper, hash_relatorio(RELATORIO))
+
+    assert result.success is True
+    assert result.data['relatorio_inalterado'] is True
+    assert result.data['tempo_economizado'] == 42.5
+    drive.assert_not_called()
+    legalmind.assert_not_called()
+
+
+@pytest.mark.usefixtures('state_dir', 'sem_sincronizacao_forcada')
+async def test_run_com_hash_diferente_envia_ao_drive_e_ao_legalmind(relatorio_scraper):
+    result, drive, legalmind = await _executar_com_hash_anterior(relatorio_scraper, 'hash-de-outro-relatorio')
+
+    assert result.success is True
+    assert 'relatorio_inalterado' not in result.data
+    drive.assert_awaited_once()
+    legalmind.assert_awaited_once()
+
+
+def _registro(numero: str, movimento: str = 'Conclusos') -> dict:
+    return {'numero_processo': numero, 'movimento': movimento, 'dias_conclusos': '3'}
+
+
+A, B, C = '0001234-56.2024.8.27.2716', '0009999-11.2023.8.27.2716', '0005555-22.2025.8.27.2716'
+
+
+def _envios(delta=True, completo=True):
+    """Substitui o envio do delta e o envio completo ao LegalMind, com os retornos informados."""
+    return (
+        patch.object(relatorio_conclusos, 'enviar_delta_relatorio_concluso', new_callable=AsyncMock, return_value=delta),
+        patch.object(relatorio_conclusos, 'enviar_relatorio_concluso', new_callable=AsyncMock, return_value=completo),
+    )
+
+
+@pytest.mark.asyncio
+async def test_integrar_envia_apenas_o_delta(relatorio_scraper, state_dir):
+    save_snapshot(relatorio_conclusos.SNAPSHOT_NAME, [_registro(A), _registro(B)])
+    records = [_registro(A, 'Despacho'), _registro(C)]
+
+    mock_delta, mock_completo = _envios()
+    with mock_delta as delta, mock_completo as completo:
+        snapshot = load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)
+        resultado = await relatorio_scraper.integrar_legalmind(records, snapshot, incremental=False)
+
+    delta.assert_awaited_once_with([_registro(C), _registro(A, 'Despacho')], [B])
+    completo.assert_not_called()
+    assert resultado == {'total': 2, 'enviados': 2, 'removidos': 1}
+    assert set(load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)) == {A, C}
+
+
+@pytest.mark.asyncio
+async def test_integrar_sem_suporte_a_delta_envia_o_relatorio_completo(relatorio_scraper, state_dir):
+    save_snapshot(relatorio_conclusos.SNAPSHOT_NAME, [_registro(A)])
+    records = [_registro(A, 'Despacho'), _registro(C)]
+
+    mock_delta, mock_completo = _envios(delta=None)
+    with mock_delta as delta, mock_completo as completo:
+        snapshot = load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)
+        resultado = await relatorio_scraper.integrar_legalmind(records, snapshot, incremental=False)
+
+    delta.assert_awaited_once()
+    completo.assert_awaited_once_with(records)
+    assert resultado == {'total': 2}
+    assert load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)[A]['registro']['movimento'] == 'Despacho'
+
+
+@pytest.mark.asyncio
+async def test_integrar_sem_snapshot_envia_o_relatorio_completo(relatorio_scraper, state_dir):
+    records = [_registro(A)]
+
+    mock_delta, mock_completo = _envios()
+    with mock_delta as delta, mock_completo as completo:
+        await relatorio_scraper.integrar_legalmind(records, {}, incremental=False)
+
+    delta.assert_not_called()
+    completo.assert_awaited_once_with(records)
+    assert set(load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)) == {A}
+
+
+@pytest.mark.asyncio
+async def test_falha_no_envio_nao_atualiza_o_snapshot(relatorio_scraper, state_dir):
+    save_snapshot(relatorio_conclusos.SNAPSHOT_NAME, [_registro(A)])
+    records = [_registro(A, 'Despacho')]
+
+    mock_delta, mock_completo = _envios(delta=False)
+    with mock_delta, mock_completo as completo, pytest.raises(RuntimeError):
+        snapshot = load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)
+        await relatorio_scraper.integrar_legalmind(records, snapshot, incremental=False)
+
+    completo.assert_not_called()
+    assert load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)[A]['registro']['movimento'] == 'Conclusos'
+
+
+@pytest.mark.asyncio
+async def test_integrar_incremental_mescla_a_janela_ao_snapshot(relatorio_scraper, state_dir):
+    save_snapshot(relatorio_conclusos.SNAPSHOT_NAME, [_registro(A), _registro(B)])
+    # A janela só traz os processos movimentados no período: A fica de fora e não é removido
+    records = [_registro(B, 'Despacho'), _registro(C)]
+
+    mock_delta, mock_completo = _envios()
+    with mock_delta as delta, mock_completo:
+        snapshot = load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)
+        resultado = await relatorio_scraper.integrar_legalmind(records, snapshot, incremental=True)
+
+    delta.assert_awaited_once_with([_registro(C), _registro(B, 'Despacho')], [])
+    assert resultado == {'total': 3, 'enviados': 2, 'removidos': 0}
+    snapshot = load_snapshot(relatorio_conclusos.SNAPSHOT_NAME)
+    assert set(snapshot) == {A, B, C}
+    assert snapshot[B]['registro']['movimento'] == 'Despacho'
+
+
+class _Campo:
+    """Campo de data falso do formulário do relatório."""
+
+    def __init__(self, existe: bool = True, tipo: str = 'text'):
+        self.existe = existe
+        self.tipo = tipo
+        self.valor = None
+        self.first = self
+
+    async def count(self):
+        return int(self.existe)
+
+    async def get_attribute(self, nome):
+        return self.tipo if nome == 'type' else None
+
+    async def fill(self, valor):
+        self.valor = valor
+
+
+class _Formulario:
+    def __init__(self, **campo):
+        self.campos = {
+            settings.CONCLUSOS_FILTRO_DATA_INICIO: _Campo(**campo),
+            settings.CONCLUSOS_FILTRO_DATA_FIM: _Campo(**campo),
+        }
+
+    def locator(self, seletor):
+        return self.campos[seletor]
+
+    def valores(self):
+        return [campo.valor for campo in self.campos.values()]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(('tipo', 'esperado'), [
+    ('text', ['01/03/2026', '15/03/2026']),
+    ('date', ['2026-03-01', '2026-03-15']),
+])
+async def test_aplicar_filtro_periodo_preenche_as_datas(relatorio_scraper, tipo, esperado):
+    page = _Formulario(tipo=tipo)
+
+    assert await relatorio_scraper.aplicar_filtro_periodo(page, date(2026, 3, 1), date(2026, 3, 15)) is True
+    assert page.valores() == esperado
+
+
+@pytest.mark.asyncio
+async def test_aplicar_filtro_periodo_sem_campos_de_data(relatorio_scraper):
+    page = _Formulario(existe=False)
+
+    assert await relatorio_scraper.aplicar_filtro_periodo(page, date(2026, 3, 1), date(2026, 3, 15)) is False
+    assert page.valores() == [None, None]
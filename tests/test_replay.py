@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from src.config import settings
+from src.utils.async_io import run_blocking
+from src.utils.replay import NetworkReplay, agora, reproduzindo
+from src.utils.state_store import load_state, save_state
+
+
+@pytest.fixture(autouse=True)
+def diretorios(state_dir, monkeypatch):
+    monkeypatch.setattr(settings, 'REPLAY_DIR', 'replays')
+    monkeypatch.setattr(settings, 'STATE_DIR', 'state')
+    return state_dir
+
+
+class FakeContext:
+    def __init__(self):
+        self.har = None
+        self.handlers = {}
+
+    async def route_from_har(self, har, **kwargs):
+        self.har = (har, kwargs)
+
+    def on(self, evento, handler):
+        self.handlers[evento] = handler
+
+
+class FakeRequest:
+    method = 'POST'
+    url = 'https://eproc/controlador.php?acao=nao_gravada'
+
+
+async def test_gravacao_guarda_horario_e_estado_anterior():
+    save_state('loc_urgente', {'total': '10'})
+    context = FakeContext()
+
+    async with NetworkReplay('loc_urgente', 'record') as gravacao:
+        await gravacao.aplicar(context)
+
+    assert context.har == (gravacao.har_path, {'update': True, 'update_content': 'attach', 'update_mode': 'full'})
+    with open(gravacao.meta_path, encoding='utf-8') as f:
+        assert datetime.fromisoformat(json.load(f)['gravado_em']) <= datetime.now()
+    assert os.path.exists(os.path.join(gravacao.estado_path, 'loc_urgente.json'))
+
+
+async def _gravar(gravado_em: str = '2026-05-18T13:55:07'):
+    save_state('loc_urgente', {'total': '10'})
+    async with NetworkReplay('loc_urgente', 'record') as gravacao:
+        pass
+    open(gravacao.har_path, 'wb').close()
+    with open(gravacao.meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'script': 'loc_urgente', 'gravado_em': gravado_em}, f)
+    save_state('loc_urgente', {'total': '99'})  # Estado alterado depois da gravação
+
+
+async def test_replay_usa_horario_e_estado_da_gravacao(monkeypatch):
+    await _gravar()
+
+    monkeypatch.setattr(settings, 'REPLAY_MODE', 'replay')
+    context = FakeContext()
+    async with NetworkReplay('loc_urgente', 'replay') as replay:
+        await replay.aplicar(context)
+        assert reproduzindo()
+        assert agora() == datetime(2026, 5, 18, 13, 55, 7)
+        assert load_state('loc_urgente')['total'] == '10'
+        save_state('loc_urgente', {'total': '11'})
+        context.handlers['requestfailed'](FakeRequest())
+
+    assert context.har[1] == {'not_found': 'abort'}
+    assert replay.abortadas == ['POST https://eproc/controlador.php?acao=nao_gravada']
+    assert settings.STATE_DIR == 'state'
+    assert load_state('loc_urgente')['total'] == '99'
+
+
+async def test_replay_nao_altera_o_estado_de_execucoes_simultaneas():
+    await _gravar()
+    entrou = asyncio.Event()
+
+    async def execucao_normal():
+        await entrou.wait()
+        save_state('loc_peticoes', {'total': '5'})
+        return load_state('loc_urgente')['total']
+
+    # Criada fora do replay, como uma execução da API em paralelo
+    normal = asyncio.create_task(execucao_normal())
+    async with NetworkReplay('loc_urgente', 'replay'):
+        assert settings.STATE_DIR == 'state'
+        entrou.set()
+        assert await normal == '99'
+        # O pool de threads (run_blocking) também enxerga o estado do replay
+        assert (await run_blocking(load_state, 'loc_urgente'))['total'] == '10'
+        assert load_state('loc_peticoes') == {}
+
+    assert load_state('loc_peticoes')['total'] == '5'
+    assert agora() > datetime(2026, 5, 18, 13, 55, 7)
+
+
+async def test_replay_sem_gravacao():
+    with pytest.raises(FileNotFoundError, match='--record'):
+        async with NetworkReplay('loc_urgente', 'replay'):
+            pass
+    with pytest.raises(ValueError):
+        NetworkReplay('loc_urgente', 'gravar')
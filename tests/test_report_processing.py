@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from src.utils.async_io import run_cpu_bound
+from src.utils.report_processing import mesclar_alvaras, processar_relatorio_conclusos
+
+
+def _salvar_alvaras(path, linhas):
+    # O eproc gera uma linha de título antes do cabeçalho
+    df = pd.DataFrame([['Relatório Alvará Eletrônico', ''], ['Processo', 'Valor'], *linhas])
+    df.to_excel(path, index=False, header=False)
+
+
+def test_processar_relatorio_conclusos(tmp_path):
+    caminho = tmp_path / 'conclusos.xlsx'
+    pd.DataFrame({'PROCESSO': ['0001234-56.2024.8.27.2716'], 'DIAS': ['7']}).to_excel(caminho, index=False)
+
+    resultado = processar_relatorio_conclusos(str(caminho))
+
+    assert resultado['total'] == 1
+    assert resultado['hash']
+    assert resultado['registros'][0]['numero_processo'] == '0001234-56.2024.8.27.2716'
+    assert resultado['registros'][0]['dias_conclusos'] == 7
+    assert processar_relatorio_conclusos(str(caminho), calcular_hash=False)['hash'] is None
+
+
+def test_mesclar_alvaras(tmp_path):
+    novo = tmp_path / 'novo.xlsx'
+    antigo = tmp_path / 'antigo.xlsx'
+    destino = tmp_path / 'dataset.xlsx'
+    _salvar_alvaras(novo, [['0000001-00.2024.8.27.2716', '100,00']])
+    pd.DataFrame({'Processo': ['0000002-00.2023.8.27.2716'], 'Valor': ['50,00']}).to_excel(antigo, index=False)
+
+    contagens = mesclar_alvaras(str(novo), str(antigo), str(destino))
+
+    assert contagens == {'novas': 1, 'total': 2}
+    final = pd.read_excel(destino, dtype=str)
+    assert final['Processo'].tolist() == ['0000002-00.2023.8.27.2716', '0000001-00.2024.8.27.2716']
+
+
+@pytest.mark.asyncio
+async def test_mesclar_alvaras_no_pool_de_processos(tmp_path):
+    novo = tmp_path / 'novo.xlsx'
+    destino = tmp_path / 'dataset.xlsx'
+    _salvar_alvaras(novo, [['0000001-00.2024.8.27.2716', '100,00']])
+
+    contagens = await run_cpu_bound(mesclar_alvaras, str(novo), None, str(destino))
+
+    assert contagens == {'novas': 1, 'total': 1}
+    assert destino.exists()
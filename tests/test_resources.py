@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+from src.utils import resources
+from src.utils.metrics import RSS_PICO, registrar_recursos, registro
+from src.utils.resources import (
+    NAVEGADOR,
+    WORKERS,
+    ResourceMonitor,
+    _classificar,
+    amostrar_filhos,
+    resumo_recursos,
+)
+
+
+def test_classifica_processos_do_navegador():
+    assert _classificar('chrome') == NAVEGADOR
+    assert _classificar('headless_shell') == NAVEGADOR
+    assert _classificar('node') == NAVEGADOR
+    assert _classificar('python3.11') == WORKERS
+
+
+@pytest.mark.skipif(resources.psutil is None and not os.path.isdir('/proc'), reason='Sem psutil nem /proc')
+async def test_monitor_contabiliza_processos_filhos():
+    # Processo filho que consome CPU, no papel de um worker de run_cpu_bound
+    filho = await asyncio.create_subprocess_exec(
+        sys.executable, '-c', 'import time\nfim = time.time() + 0.6\nwhile time.time() < fim: pass'
+    )
+    monitor = ResourceMonitor(intervalo_s=0.1)
+    monitor.start()
+    await filho.wait()
+    recursos = await monitor.stop()
+
+    assert recursos['amostras'] >= 2
+    assert recursos['python']['rss_pico_mb'] > 0
+    assert recursos[WORKERS]['processos'] >= 1  # Pode haver workers de outros testes
+    assert recursos[WORKERS]['rss_pico_mb'] > 0
+    assert recursos[WORKERS]['cpu_s'] > 0
+    assert recursos['rss_pico_total_mb'] >= recursos['python']['rss_pico_mb']
+
+
+async def test_monitor_lista_top_alocacoes():
+    monitor = ResourceMonitor(intervalo_s=10, tracemalloc_top=3)
+    monitor.start()
+    dados = [bytearray(1024) for _ in range(2000)]
+    recursos = await monitor.stop()
+
+    assert len(dados) == 2000
+    assert len(recursos['tracemalloc']['top']) == 3
+    assert recursos['tracemalloc']['top'][0]['tamanho_kb'] > 0
+
+
+async def test_tracemalloc_fica_ativo_ate_o_ultimo_monitor():
+    primeiro = ResourceMonitor(intervalo_s=10, tracemalloc_top=3)
+    segundo = ResourceMonitor(intervalo_s=10, tracemalloc_top=3)
+    primeiro.start()
+    segundo.start()
+
+    # O primeiro a terminar não desliga o tracemalloc da execução simultânea
+    await primeiro.stop()
+    assert tracemalloc.is_tracing()
+    recursos = await segundo.stop()
+
+    assert 'tracemalloc' in recursos
+    assert not tracemalloc.is_tracing()
+
+
+def test_amostrar_filhos_sem_filhos_retorna_dicionario():
+    assert isinstance(amostrar_filhos(), dict)
+
+
+def test_registrar_recursos_nas_metricas():
+    registro.limpar()
+    registrar_recursos(
+        'relatorio_conclusos',
+        {
+            'python': {'rss_pico_mb': 300.0, 'cpu_s': 2.0},
+            'navegador': {'rss_pico_mb': 900.0, 'cpu_s': 10.0, 'processos': 5},
+            'workers': {'rss_pico_mb': 0.0, 'cpu_s': 0.0, 'processos': 0},
+        },
+    )
+    assert RSS_PICO.contagem('relatorio_conclusos', 'navegador') == 1
+    assert 'eproc_execucao_cpu_segundos_total{script="relatorio_conclusos",componente="navegador"} 10' in registro.expor()
+    registro.limpar()
+
+
+async def test_execucoes_simultaneas_sao_indicadas_e_nao_entram_nas_metricas():
+    primeiro = ResourceMonitor(intervalo_s=10)
+    segundo = ResourceMonitor(intervalo_s=10)
+    primeiro.start()
+    segundo.start()
+    recursos_primeiro = await primeiro.stop()
+    recursos_segundo = await segundo.stop()
+
+    assert recursos_primeiro['execucoes_simultaneas'] == 2
+    assert recursos_segundo['execucoes_simultaneas'] == 2
+    assert 'execuções simultâneas' in resumo_recursos(recursos_primeiro)
+
+    isolado = ResourceMonitor(intervalo_s=10)
+    isolado.start()
+    assert (await isolado.stop())['execucoes_simultaneas'] == 1
+
+    registro.limpar()
+    registrar_recursos('loc_urgente', recursos_primeiro)
+    assert RSS_PICO.contagem('loc_urgente', 'python') == 0
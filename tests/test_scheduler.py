@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from src.scheduler import CronExpression, Job, Scheduler, carregar_jobs, ler_historico
+from src.scripts.base import ScraperResult
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+
+def test_cron_proxima_execucao():
+    cron = CronExpression('*/30 7-19 * * 1-5')
+
+    # Sexta-feira 19:45 -> segunda-feira 07:00
+    assert cron.proxima(datetime(2024, 6, 7, 19, 45)) == datetime(2024, 6, 10, 7, 0)
+    assert cron.proxima(datetime(2024, 6, 10, 7, 0)) == datetime(2024, 6, 10, 7, 30)
+    assert cron.confere(datetime(2024, 6, 10, 12, 30))
+    assert not cron.confere(datetime(2024, 6, 9, 12, 30))  # domingo
+
+
+def test_cron_dia_do_mes_ou_dia_da_semana():
+    cron = CronExpression('0 8 1 * 0')  # dia 1 ou domingo
+
+    assert cron.proxima(datetime(2024, 6, 3, 9, 0)) == datetime(2024, 6, 9, 8, 0)
+    assert cron.proxima(datetime(2024, 6, 30, 9, 0)) == datetime(2024, 7, 1, 8, 0)
+
+
+@pytest.mark.parametrize('expressao', ['* * * *', '60 * * * *', 'a * * * *', '* * 0 * *'])
+def test_cron_invalido(expressao):
+    with pytest.raises(ValueError):
+        CronExpression(expressao)
+
+
+def test_carregar_jobs_do_yaml_ignora_invalidos(state_dir, monkeypatch):
+    monkeypatch.setattr('src.config.settings.SCHEDULER_JOBS', {'loc_urgente': '0 7 * * *'})
+    (state_dir / 'schedule.yaml').write_text(
+        'jobs:\n'
+        '  - script: loc_urgente\n    cron: "*/15 * * * *"\n    max_concorrencia: 2\n'
+        '  - script: inexistente\n    cron: "0 7 * * *"\n'
+        '  - script: loc_mandados\n    cron: "invalido"\n',
+        encoding='utf-8',
+    )
+
+    jobs = carregar_jobs()
+
+    assert [(j.script, j.cron.expressao, j.max_concorrencia) for j in jobs] == [('loc_urgente', '*/15 * * * *', 2)]
+
+
+async def test_ignora_execucao_enquanto_anterior_em_andamento():
+    liberar = asyncio.Event()
+
+    async def executar(script_name, headless=True):
+        await liberar.wait()
+        return ScraperResult(success=True, message='ok')
+
+    job = Job(script='loc_urgente', cron=CronExpression('* * * * *'))
+    scheduler = Scheduler([job], executar=executar)
+
+    assert scheduler.disparar(job, agendado_para=datetime.now())
+    await asyncio.sleep(0)
+    assert not scheduler.disparar(job, agendado_para=datetime.now())
+
+    liberar.set()
+    await asyncio.gather(*job.tarefas)
+
+    historico = ler_historico()
+    assert [r['status'] for r in historico] == ['ignorado', 'sucesso']
+    assert job.em_execucao == 0
+
+
+async def test_registra_falha_e_erro_no_historico():
+    async def executar(script_name, headless=True):
+        if script_name == 'loc_mandados':
+            raise RuntimeError('falhou')
+        return ScraperResult(success=False, message='sem dados')
+
+    jobs = [Job(script=s, cron=CronExpression('* * * * *')) for s in ('loc_urgente', 'loc_mandados')]
+    scheduler = Scheduler(jobs, executar=executar)
+    for job in jobs:
+        scheduler.disparar(job, agendado_para=datetime.now())
+    await asyncio.gather(*(t for job in jobs for t in job.tarefas))
+
+    historico = {r['script']: r for r in ler_historico()}
+    assert historico['loc_urgente']['status'] == 'falha'
+    assert historico['loc_mandados']['status'] == 'erro'
+    assert historico['loc_mandados']['mensagem'] == 'falhou'
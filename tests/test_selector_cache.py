@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.utils.selector_cache import SelectorRegistry
+
+
+class FakeLocator:
+    def __init__(self, atraso, erro: Exception | None = None):
+        self.atraso = atraso
+        self.erro = erro
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state, timeout):
+        if self.atraso is None:
+            await asyncio.sleep(timeout / 1000)
+            raise PlaywrightTimeoutError(f'Timeout {timeout}ms')
+        await asyncio.sleep(self.atraso)
+        if self.erro is not None:
+            raise self.erro
+
+
+@pytest.fixture
+def registry(state_dir):
+    return SelectorRegistry()
+
+
+async def test_localizar_usa_alternativa_disponivel_sem_pagar_timeout(registry):
+    primaria, fallback = FakeLocator(None), FakeLocator(0.01)
+
+    encontrado = await registry.localizar('etapa', {'primaria': primaria, 'fallback': fallback}, timeout=2000)
+
+    assert encontrado is fallback
+    stats = registry.estatisticas('etapa')
+    assert stats['fallback']['sucessos'] == 1
+    # A primária ainda aguardava quando a disputa terminou: não é contada como falha
+    assert 'primaria' not in stats
+
+
+async def test_alternativa_aprendida_tem_prioridade_no_empate(registry):
+    registry.registrar('etapa', 'fallback', ['primaria'])
+
+    assert registry.ordenar('etapa', ['primaria', 'fallback']) == ['fallback', 'primaria']
+
+    # Ambas disponíveis ao mesmo tempo: vence a de melhor histórico (persistido entre instâncias)
+    primaria, fallback = FakeLocator(0), FakeLocator(0)
+    encontrado = await SelectorRegistry().localizar('etapa', {'primaria': primaria, 'fallback': fallback}, 1000)
+    assert encontrado is fallback
+
+
+async def test_localizar_timeout_registra_falhas(registry):
+    with pytest.raises(PlaywrightTimeoutError):
+        await registry.localizar('etapa', {'a': FakeLocator(None), 'b': FakeLocator(None)}, timeout=50)
+
+    stats = registry.estatisticas('etapa')
+    assert stats['a'] == {'sucessos': 0, 'falhas': 1}
+    assert stats['b'] == {'sucessos': 0, 'falhas': 1}
+
+
+async def test_perdedora_valida_nao_conta_falha_e_a_com_erro_conta(registry):
+    alternativas = {
+        'quebrada': FakeLocator(0, erro=RuntimeError('seletor inválido')),
+        'rapida': FakeLocator(0.01),
+        'lenta': FakeLocator(0.5),
+    }
+
+    encontrado = await registry.localizar('etapa', alternativas, timeout=2000)
+
+    assert encontrado is alternativas['rapida']
+    stats = registry.estatisticas('etapa')
+    assert stats['quebrada'] == {'sucessos': 0, 'falhas': 1}
+    assert stats['rapida']['sucessos'] == 1
+    assert 'lenta' not in stats
+
+
+async def test_registros_simultaneos_nao_perdem_atualizacoes(registry):
+    await asyncio.gather(
+        *(asyncio.to_thread(registry.registrar, 'etapa', 'a', []) for _ in range(20))
+    )
+
+    assert registry.estatisticas('etapa')['a']['sucessos'] == 20
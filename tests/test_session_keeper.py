@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.config import settings
+from src.utils.session_keeper import SessionKeeper
+from src.utils.session_store import session_store
+
+
+@pytest.fixture
+def keeper(state_dir):
+    keeper = SessionKeeper()
+    keeper._login = AsyncMock()
+    keeper._tocar = AsyncMock(return_value=True)
+    return keeper
+
+
+async def test_login_antecipado_sem_sessao(keeper):
+    assert await keeper.verificar() == 'login'
+    keeper._login.assert_awaited_once()
+
+
+async def test_keepalive_com_sessao_valida(keeper):
+    session_store.save(settings.EPROC_LOGIN, settings.EPROC_PERFIL, {'cookies': []})
+
+    assert await keeper.verificar() == 'keepalive'
+    keeper._tocar.assert_awaited_once()
+    keeper._login.assert_not_awaited()
+
+
+async def test_renova_sessao_proxima_da_expiracao(keeper, monkeypatch):
+    monkeypatch.setattr('src.config.settings.SESSION_MAX_IDADE_MIN', 60)
+    session_store.save(settings.EPROC_LOGIN, settings.EPROC_PERFIL, {'cookies': []}, obtido_em=datetime.now() - timedelta(minutes=61))
+
+    assert await keeper.verificar() == 'login'
+    keeper._tocar.assert_not_awaited()
+
+
+async def test_relogin_quando_sessao_expirada(keeper):
+    session_store.save(settings.EPROC_LOGIN, settings.EPROC_PERFIL, {'cookies': []})
+    keeper._tocar.return_value = False
+
+    assert await keeper.verificar() == 'login'
+    keeper._login.assert_awaited_once()
@@ -0,0 +1,60 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.utils.session_store import SessionStore
+
+STATE = {'cookies': [{'name': 'PHPSESSID', 'value': 'abc'}], 'origins': []}
+
+
+@pytest.fixture
+def store(state_dir):
+    return SessionStore()
+
+
+def test_load_inexistente_retorna_none(store):
+    assert store.load('usuario', None) is None
+
+
+def test_save_e_load_por_perfil(store):
+    assert store.save('usuario', 'DIRETOR DE SECRETARIA', STATE)
+
+    sessao = store.load('usuario', 'DIRETOR DE SECRETARIA')
+    assert sessao['storage_state'] == STATE
+    assert sessao['perfil'] == 'DIRETOR DE SECRETARIA'
+    assert store.idade_segundos(sessao) < 60
+    # Outro perfil do mesmo usuário não compartilha a sessão
+    assert store.load('usuario', 'ASSESSOR') is None
+
+
+def test_save_nao_sobrescreve_sessao_mais_recente(store):
+    agora = datetime.now()
+    store.save('usuario', None, {'cookies': ['nova']}, obtido_em=agora)
+
+    # Uma execução que logou antes, mas terminou depois, não deve sobrescrever
+    assert not store.save('usuario', None, {'cookies': ['antiga']}, obtido_em=agora - timedelta(minutes=5))
+    assert store.load('usuario', None)['storage_state'] == {'cookies': ['nova']}
+
+
+def test_trava_abandonada_e_removida(store, monkeypatch):
+    monkeypatch.setattr('src.config.settings.SESSION_LOCK_TIMEOUT', 1)
+    path = store._path('usuario', None)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.lock', 'w') as f:
+        f.write('999999')
+    antigo = time.time() - 10
+    os.utime(f'{path}.lock', (antigo, antigo))
+
+    assert store.save('usuario', None, STATE)
+    assert not os.path.exists(f'{path}.lock')
+
+
+def test_fallback_para_state_json_legado(store):
+    with open('state.json', 'w', encoding='utf-8') as f:
+        json.dump(STATE, f)
+
+    sessao = store.load('usuario', None)
+    assert sessao['storage_state'] == STATE
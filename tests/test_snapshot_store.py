@@ -0,0 +1,63 @@
+import pytest
+
+from src.utils.snapshot_store import calcular_delta, hash_registro, load_snapshot, save_snapshot
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+
+def _registro(numero, movimento='Conclusos para despacho', dias=1):
+    return {
+        'numero_processo': numero,
+        'movimento': movimento,
+        'dias_conclusos': dias,
+        'dados_snapshot': {'PROCESSO': numero, 'DIAS': str(dias)},
+    }
+
+
+def test_hash_registro_ignora_campos_volateis():
+    assert hash_registro(_registro('1', dias=1)) == hash_registro(_registro('1', dias=30))
+    assert hash_registro(_registro('1')) != hash_registro(_registro('1', movimento='Despacho'))
+
+
+def test_calcular_delta_sem_snapshot_envia_tudo():
+    delta = calcular_delta({}, [_registro('1'), _registro('2')])
+
+    assert [r['numero_processo'] for r in delta.novos] == ['1', '2']
+    assert delta.alterados == []
+    assert delta.removidos == []
+
+
+def test_calcular_delta_novos_alterados_removidos():
+    save_snapshot('conclusos', [_registro('1'), _registro('2'), _registro('3')])
+    anterior = load_snapshot('conclusos')
+
+    atual = [_registro('1', dias=2), _registro('2', movimento='Despacho'), _registro('4')]
+    delta = calcular_delta(anterior, atual)
+
+    assert [r['numero_processo'] for r in delta.novos] == ['4']
+    assert [r['numero_processo'] for r in delta.alterados] == ['2']
+    assert delta.removidos == ['3']
+    assert not delta.vazio
+
+
+def test_calcular_delta_relatorio_identico_e_vazio():
+    save_snapshot('conclusos', [_registro('1')])
+    delta = calcular_delta(load_snapshot('conclusos'), [_registro('1', dias=5)])
+
+    assert delta.vazio
+
+
+def test_calcular_delta_processo_duplicado_mantem_a_ultima_ocorrencia():
+    save_snapshot('conclusos', [_registro('1')])
+    atual = [
+        _registro('1', movimento='Despacho'),
+        _registro('2'),
+        _registro('1'),
+        _registro('2', movimento='Decisão'),
+    ]
+    delta = calcular_delta(load_snapshot('conclusos'), atual)
+
+    # '1' volta ao conteúdo do snapshot na última ocorrência; '2' é novo, uma única vez
+    assert delta.alterados == []
+    assert delta.novos == [_registro('2', movimento='Decisão')]
+    assert delta.removidos == []
@@ -0,0 +1,23 @@
+from benchmarks.startup import STARTUP_BUDGET_S, medir_importacao
+from src.registry import available_scripts, gerar_manifesto
+
+
+def test_importacao_de_src_main_dentro_do_orcamento():
+    # A primeira execução compila os .pyc; mede-se a segunda
+    medir_importacao()
+    total, _, pesados = medir_importacao()
+
+    assert pesados == []
+    assert total <= STARTUP_BUDGET_S
+
+
+def test_manifesto_lista_apenas_scripts_executaveis():
+    manifesto = gerar_manifesto()
+
+    assert manifesto['loc_urgente'] == {'modulo': 'src.scripts.loc_urgente', 'classe': 'LocUrgente'}
+    assert manifesto['relatorio_conclusos']['classe'] == 'RelatorioConclusos'
+    # Classes base e utilitários não são scripts
+    assert 'base' not in manifesto
+    assert 'loc_base' not in manifesto
+    assert 'test_2fa' not in manifesto
+    assert available_scripts() == sorted(manifesto)
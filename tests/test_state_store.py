@@ -0,0 +1,48 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.state_store import fingerprint, load_state, save_state
+
+pytestmark = pytest.mark.usefixtures('state_dir')
+
+
+def test_load_state_inexistente_retorna_vazio():
+    assert load_state('localizador_URGENTE') == {}
+
+
+def test_save_e_load_state(state_dir):
+    path = save_state('localizador_MANDADOS - CITAÇÃO/INTIMAÇÃO', {'total': '42', 'fingerprint': 'abc'})
+
+    estado = load_state('localizador_MANDADOS - CITAÇÃO/INTIMAÇÃO')
+    assert estado['total'] == '42'
+    assert estado['fingerprint'] == 'abc'
+    assert 'atualizado_em' in estado
+    assert path.startswith(str(state_dir))
+    assert os.path.basename(path) == 'localizador_MANDADOS_-_CITAÇÃO_INTIMAÇÃO.json'
+
+
+def test_load_state_corrompido_retorna_vazio(state_dir):
+    path = save_state('corrompido', {'total': '1'})
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{invalido')
+
+    assert load_state('corrompido') == {}
+
+
+def test_fingerprint_independe_da_ordem():
+    a = fingerprint(['0001234-56.2024.8.27.2716', '0009999-11.2023.8.27.2716'])
+    b = fingerprint(['0009999-11.2023.8.27.2716', '0001234-56.2024.8.27.2716'])
+    c = fingerprint(['0001234-56.2024.8.27.2716'])
+
+    assert a == b
+    assert a != c
+
+
+def test_gravacoes_simultaneas_do_mesmo_estado(state_dir):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: save_state('concorrente', {'total': str(i)}), range(200)))
+
+    assert load_state('concorrente')['total'].isdigit()
+    assert os.listdir(state_dir / 'data' / 'state') == ['concorrente.json']
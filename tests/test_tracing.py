@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from src.config import settings
+from src.scripts.base import BaseScraper, ScraperResult
+from src.utils.tracing import PhaseTracer, exportar_timings, medido, resumo_fases
+
+
+def _nomes(no: dict) -> list[str]:
+    return [filho['nome'] for filho in no.get('filhos', [])]
+
+
+def test_spans_aninhados_formam_arvore():
+    tracer = PhaseTracer('script')
+    with tracer.span('download'), tracer.span('requisicao', tentativa=1):
+        pass
+    with tracer.span('upload'):
+        pass
+
+    arvore = tracer.finalizar()
+    assert arvore['nome'] == 'script'
+    assert _nomes(arvore) == ['download', 'upload']
+    requisicao = arvore['filhos'][0]['filhos'][0]
+    assert requisicao['nome'] == 'requisicao'
+    assert requisicao['atributos'] == {'tentativa': 1}
+
+
+def test_fase_sequencial_encerra_a_anterior():
+    tracer = PhaseTracer('script')
+    tracer.fase('navegacao')
+    with tracer.span('login'):
+        pass
+    tracer.fase('download')
+    tracer.registrar('formulario->painel', 0.5)
+
+    arvore = tracer.finalizar()
+    assert _nomes(arvore) == ['navegacao', 'download']
+    navegacao, download = arvore['filhos']
+    assert _nomes(navegacao) == ['login']
+    assert download['filhos'][0]['duracao_s'] == pytest.approx(0.5, abs=0.01)
+
+
+def test_span_registra_erro_e_propaga():
+    tracer = PhaseTracer('script')
+    with pytest.raises(ValueError), tracer.span('processamento'):
+        raise ValueError('falhou')
+
+    arvore = tracer.finalizar()
+    assert arvore['filhos'][0]['atributos'] == {'erro': 'ValueError'}
+
+
+async def test_medido_no_scraper():
+    class FakeScraper(BaseScraper):
+        @medido('download')
+        async def baixar(self):
+            with self.span('salvar'):
+                return 'ok'
+
+        async def run(self, page):
+            self.fase('inicio')
+            await self.baixar()
+            return ScraperResult(success=True, message='ok')
+
+    scraper = FakeScraper()
+    await scraper.run(None)
+    arvore = scraper.tracer.finalizar()
+    assert _nomes(arvore) == ['inicio']
+    assert _nomes(arvore['filhos'][0]) == ['download']
+    assert _nomes(arvore['filhos'][0]['filhos'][0]) == ['salvar']
+    assert resumo_fases(arvore).startswith('inicio=')
+
+
+def test_exportar_timings_grava_jsonl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, 'TRACE_EXPORT_FILE', 'traces/fases.jsonl')
+    tracer = PhaseTracer('loc_urgente')
+    with tracer.span('download'):
+        pass
+
+    exportar_timings('loc_urgente', tracer.finalizar())
+
+    linhas = (tmp_path / 'traces' / 'fases.jsonl').read_text(encoding='utf-8').splitlines()
+    registro = json.loads(linhas[0])
+    assert registro['script'] == 'loc_urgente'
+    assert _nomes(registro['timings']) == ['download']